@@ -1,11 +1,12 @@
 try:
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    import main_plots as main
+    from config import COLOURS_FILE, SWEEP_ALL, DEFAULT_RENDER_WORKERS, read_column, load_time_widths
+    import os
     import customtkinter
     from tkinter import filedialog, messagebox
     from PIL import Image
     import webbrowser
+    import queue
+    import threading
 except ImportError as e:
     messagebox.showerror("Critical Error", f"Missing library: {e}. Make sure you have installed all requirements (e.g., pandas).")
     exit()
@@ -14,6 +15,22 @@ except ImportError as e:
 customtkinter.set_appearance_mode("dark")
 customtkinter.set_default_color_theme("blue")
 
+def load_pipeline():
+    """
+    Import the analysis pipeline on first use.
+
+    pandas, numpy and matplotlib take seconds to import on a slow laptop, so
+    the window is built without them: they are imported in the background
+    once it is shown (see `App.warm_up`), or here when needed first.
+
+    Returns
+    -------
+    module
+        The `main_plots` module.
+    """
+    import main_plots
+    return main_plots
+
 class App(customtkinter.CTk):
     """
     Main application window for NeoPupil.
@@ -37,7 +54,13 @@ class App(customtkinter.CTk):
         Frame displaying credits and a GitHub link.
     Logo_Frame : Logo_Frame
         Frame displaying the NeoPupil logo.
+    session : session.RecordingSession or None
+        Input files loaded in the background, created when the first file is
+        selected (see `get_session`).
     """
+    # Delay before importing the pipeline in the background, once the window is drawn
+    WARM_UP_MS = 200
+
     def __init__(self):
         super().__init__()
 
@@ -78,6 +101,37 @@ class App(customtkinter.CTk):
         self.Logo_Frame = Logo_Frame(self)
         self.Logo_Frame.grid(row=1,column=1, padx=10, pady=(10, 0), sticky="nw")
 
+        self.session = None
+        self.after(self.WARM_UP_MS, self.warm_up)
+
+    def get_session(self):
+        """
+        Return the recording session, created on first use.
+
+        Returns
+        -------
+        session.RecordingSession
+            Session shared by the file selection, the event menus and the
+            generation of the plots.
+        """
+        if self.session is None:
+            from session import RecordingSession
+            self.session = RecordingSession()
+        return self.session
+
+    def warm_up(self):
+        """
+        Import the analysis pipeline in a background thread, so that the first
+        generation does not wait for it. An import error is reported when the
+        plots are generated.
+        """
+        def import_pipeline():
+            try:
+                load_pipeline()
+            except Exception:
+                pass
+        threading.Thread(target=import_pipeline, daemon=True).start()
+
 class Output_Frame(customtkinter.CTkFrame):
     """
     Frame for selecting the output folder.
@@ -137,7 +191,12 @@ class Input_Frame(customtkinter.CTkFrame):
         Path to the gaze data file.
     selected_saccades_file : str
         Path to the saccades data file.
+    checks : dict
+        Pending schema check of the last file picked for each stream, see
+        `session.RecordingSession.open`.
     """
+    POLL_MS = 100
+
     def __init__(self, master):
         super().__init__(master)
 
@@ -186,72 +245,96 @@ class Input_Frame(customtkinter.CTkFrame):
         self.select_saccades_button.grid(row=6, column=1, padx=10, pady=(10, 0), sticky="w")
         self.selected_saccades_file = ""
 
+        self.checks = {}
+
+    def select_file(self, stream, entry, label):
+        """
+        Ask for the file of a stream and open it in the session, which checks
+        and loads it in the background.
+
+        The outcome of the check is polled from the Tk main loop with
+        `after()` (see `poll_check`).
+
+        Parameters
+        ----------
+        stream : str
+            Name of the stream, see `config.RECORDING_FILES`.
+        entry : CTkEntry
+            Entry displaying the path of the file.
+        label : str
+            Name of the file in messages.
+        """
+        file_path = filedialog.askopenfilename()
+        if not file_path:
+            print(f"{label} file: ")
+            return
+        try:
+            self.checks[stream] = self.master.get_session().open(stream, file_path)
+        except Exception as e:
+            messagebox.showerror("Invalid file", f"Could not open {label.lower()} file: {e}")
+            return
+        self.after(self.POLL_MS, self.poll_check, stream, entry, label, self.checks[stream])
+
+    def poll_check(self, stream, entry, label, check):
+        """
+        Show the file of a stream once it passed the schema check, or report
+        why it did not; poll again until the check is done.
+
+        A check superseded by another file picked for the same stream is
+        ignored.
+        """
+        if self.checks.get(stream) is not check:
+            return
+        if not check.done():
+            self.after(self.POLL_MS, self.poll_check, stream, entry, label, check)
+            return
+        del self.checks[stream]
+        try:
+            file_path = check.result()
+        except Exception as e:
+            messagebox.showerror("Invalid file", f"Could not open {label.lower()} file: {e}")
+            return
+        entry.delete(0, customtkinter.END)
+        entry.insert(0, file_path)
+        setattr(self, f"selected_{stream}_file", file_path)
+        print(f"{label} file: {file_path}")
+
     def select_pupil(self):
         """
         Select the pupil data file.
         """
-        file_path = filedialog.askopenfilename()
-        if file_path:
-            self.pupil_file.delete(0, customtkinter.END)
-            self.pupil_file.insert(0, file_path)
-        self.selected_pupil_file = file_path
-        print(f"Pupil file: {self.selected_pupil_file}")
+        self.select_file("pupil", self.pupil_file, "Pupil")
 
     def select_blinks(self):
         """
         Select the blinks data file.
         """
-        file_path = filedialog.askopenfilename()
-        if file_path:
-            self.blinks_file.delete(0, customtkinter.END)
-            self.blinks_file.insert(0, file_path)
-        self.selected_blinks_file = file_path
-        print(f"Blinks file: {self.selected_blinks_file}")
+        self.select_file("blinks", self.blinks_file, "Blinks")
 
     def select_events(self):
         """
         Select the events data file.
         """
-        file_path = filedialog.askopenfilename()
-        if file_path:
-            self.events_file.delete(0, customtkinter.END)
-            self.events_file.insert(0, file_path)
-        self.selected_events_file = file_path
-        print(f"Events file: {self.selected_events_file}")
+        self.select_file("events", self.events_file, "Events")
 
     def select_fixations(self):
         """
         Select the fixations data file.
         """
-        file_path = filedialog.askopenfilename()
-        if file_path:
-            self.fixations_file.delete(0, customtkinter.END)
-            self.fixations_file.insert(0, file_path)
-        self.selected_fixations_file = file_path
-        print(f"Fixations file: {self.selected_fixations_file}")
+        self.select_file("fixations", self.fixations_file, "Fixations")
 
     def select_gaze(self):
         """
         Select the gaze data file.
         """
-        file_path = filedialog.askopenfilename()
-        if file_path:
-            self.gaze_file.delete(0, customtkinter.END)
-            self.gaze_file.insert(0, file_path)
-        self.selected_gaze_file = file_path
-        print(f"Gaze file: {self.selected_gaze_file}")
+        self.select_file("gaze", self.gaze_file, "Gaze")
 
     def select_saccades(self):
         """
         Select the saccades data file.
         """
-        file_path = filedialog.askopenfilename()
-        if file_path:
-            self.saccades_file.delete(0, customtkinter.END)
-            self.saccades_file.insert(0, file_path)
-        self.selected_saccades_file = file_path
-        print(f"Saccades file: {self.selected_saccades_file}")
-        
+        self.select_file("saccades", self.saccades_file, "Saccades")
+
 class Select_Events(customtkinter.CTkFrame):
     """
     Frame for selecting start and end events from the events file.
@@ -262,7 +345,12 @@ class Select_Events(customtkinter.CTkFrame):
         Name of the event to mark the start of the analysis period.
     end_event : str
         Name of the event to mark the end of the analysis period.
+    every_occurrence : customtkinter.BooleanVar
+        Analyse every window between the start and end events instead of the
+        first one only, for protocols repeating their markers.
     """
+    POLL_MS = 100
+
     def __init__(self, master):
         super().__init__(master)
         self.name_selected = customtkinter.CTkLabel(self, text="3 - Select Events")
@@ -281,12 +369,19 @@ class Select_Events(customtkinter.CTkFrame):
         self.load_button = customtkinter.CTkButton(self, text="Load Events", command=self.load_events)
         self.load_button.grid(row=4, column=0, padx=10, pady=(10, 0), sticky="w")
 
+        self.every_occurrence = customtkinter.BooleanVar(value=False)
+        self.occurrence_box = customtkinter.CTkCheckBox(self, text="Every occurrence of the events",
+                                                        variable=self.every_occurrence)
+        self.occurrence_box.grid(row=5, column=0, padx=10, pady=(10, 0), sticky="w")
+
     def load_events(self):
         """
         Load events from the selected events CSV file into the dropdown menus.
 
-        Reads the events file, extracts the unique event names, and populates
-        the start and end event selection menus with these values.
+        Takes the unique event names from the events loaded by the session
+        when the file was selected, and populates the start and end event
+        selection menus with these values. While the file is still loading,
+        the button is disabled and the session is polled with `after()`.
 
         Requires that the user has selected an events file in the `Input_Frame`.
 
@@ -308,11 +403,13 @@ class Select_Events(customtkinter.CTkFrame):
             messagebox.showwarning("Missing file", "Please select an events file first.")
             return
         try:
-            df = pd.read_csv(events_path)
-            if "name" not in df.columns:
-                raise ValueError("Missing 'name' column in events file.")
-
-            unique_events = df["name"].dropna().unique().tolist()
+            session = self.master.get_session()
+            if not session.loaded("events"):
+                self.load_button.configure(state="disabled", text="Loading...")
+                self.after(self.POLL_MS, self.load_events)
+                return
+            self.load_button.configure(state="normal", text="Load Events")
+            unique_events = session.event_names()
 
             self.start_menu.configure(values=unique_events)
             self.start_menu.set(unique_events[0])
@@ -323,6 +420,7 @@ class Select_Events(customtkinter.CTkFrame):
             print("✅ Events loaded in dropdowns.")
 
         except Exception as e:
+            self.load_button.configure(state="normal", text="Load Events")
             messagebox.showerror("Error", f"Could not load events: {e}")
 
     def get_selected_events(self):
@@ -340,6 +438,17 @@ class Select_Events(customtkinter.CTkFrame):
         """
         return self.start_menu.get(), self.end_menu.get()
 
+    def get_occurrences(self):
+        """
+        Get which occurrences of the events delimit the analysed windows.
+
+        Returns
+        -------
+        str
+            "all" when every occurrence is analysed, otherwise "first".
+        """
+        return "all" if self.every_occurrence.get() else "first"
+
 
 class Col_Int_Frame(customtkinter.CTkFrame):
     """
@@ -384,7 +493,7 @@ class Col_Int_Frame(customtkinter.CTkFrame):
 
         self.explanation = customtkinter.CTkLabel(
             self,
-            text="Select a colour for your graphics and a time interval (<=60s)."
+            text="Select a colour for your graphics and a time interval (<=60s), or 'all' to sweep every interval."
         )
         self.explanation.grid(row=1, column=0, padx=10, pady=(10, 0), sticky="w")
         
@@ -397,11 +506,7 @@ class Col_Int_Frame(customtkinter.CTkFrame):
         self.time_menu.grid(row=2, column=1, padx=10, pady=(10, 0), sticky="w")
 
         try:
-            df_colours = pd.read_csv("colours.csv")
-            if "colour" not in df_colours.columns:
-                raise ValueError("Missing 'colour' column in colours file.")
-
-            unique_colour = df_colours["colour"].dropna().unique().tolist()
+            unique_colour = read_column(COLOURS_FILE, "colour")
             self.colour_menu.configure(values=unique_colour)
             self.colour_menu.set(self.colour_name)
 
@@ -409,11 +514,8 @@ class Col_Int_Frame(customtkinter.CTkFrame):
             messagebox.showerror("Error", f"Could not show colours: {e}")
 
         try:
-            df_time = pd.read_csv("time.csv")
-            if "time" not in df_time.columns:
-                raise ValueError("Missing 'time' column in time file.")
-
-            unique_times = [str(t) for t in df_time["time"].dropna().unique().tolist()]
+            unique_times = [str(width) for width in load_time_widths()]
+            unique_times.append(SWEEP_ALL)
             self.time_menu.configure(values=unique_times)
             self.time_menu.set(self.time)
 
@@ -438,14 +540,33 @@ class Col_Int_Frame(customtkinter.CTkFrame):
         Returns
         -------
         str
-            The selected time interval (in seconds) from the dropdown menu.
+            The selected time interval (in seconds) from the dropdown menu,
+            or "all" to generate the time-binned plots for every interval.
         """
         return self.time_menu.get()
 
 class Generate_Frame(customtkinter.CTkFrame):
     """
-    Frame containing the plot generation button.
+    Frame containing the plot generation button, its progress bar and the cancel button.
+
+    The generation runs in a background thread so that the window stays
+    responsive. The thread posts its progress to a queue which is polled
+    from the Tk main loop with `after()`.
+
+    Attributes
+    ----------
+    workers_menu : CTkOptionMenu
+        Number of processes rendering the figures, from 1 to the number of
+        CPUs (default is `config.DEFAULT_RENDER_WORKERS`).
+    worker : threading.Thread or None
+        Thread running the current generation.
+    cancel_event : threading.Event
+        Event set by the Cancel button.
+    messages : queue.Queue
+        Messages posted by the worker thread.
     """
+    POLL_MS = 100
+
     def __init__(self, master):
         super().__init__(master)
         self.name_generate = customtkinter.CTkLabel(self, text="5 - Generate plots")
@@ -454,9 +575,30 @@ class Generate_Frame(customtkinter.CTkFrame):
         self.generate_button = customtkinter.CTkButton(self, text="Generate", command=self.generate_plots)
         self.generate_button.grid(row=1, column=0, padx=10, pady=(10, 0), sticky="w")
 
+        self.cancel_button = customtkinter.CTkButton(self, text="Cancel", command=self.cancel, state="disabled")
+        self.cancel_button.grid(row=1, column=1, padx=10, pady=(10, 0), sticky="w")
+
+        self.workers_label = customtkinter.CTkLabel(self, text="Rendering processes")
+        self.workers_label.grid(row=1, column=2, padx=10, pady=(10, 0), sticky="w")
+        self.workers_menu = customtkinter.CTkOptionMenu(
+            self, values=[str(n) for n in range(1, max(os.cpu_count() or 1, DEFAULT_RENDER_WORKERS) + 1)], width=70)
+        self.workers_menu.set(str(DEFAULT_RENDER_WORKERS))
+        self.workers_menu.grid(row=1, column=3, padx=10, pady=(10, 0), sticky="w")
+
+        self.progress_bar = customtkinter.CTkProgressBar(self)
+        self.progress_bar.set(0)
+        self.progress_bar.grid(row=2, column=0, columnspan=4, padx=10, pady=(10, 0), sticky="ew")
+
+        self.status = customtkinter.CTkLabel(self, text="", wraplength=450, justify="left")
+        self.status.grid(row=3, column=0, columnspan=4, padx=10, pady=(0, 10), sticky="w")
+
+        self.worker = None
+        self.cancel_event = threading.Event()
+        self.messages = queue.Queue()
+
     def generate_plots(self):
         """
-        Generate plots based on the provided input files and settings.
+        Start the generation of the plots in a background thread.
 
         Raises
         ------
@@ -465,6 +607,9 @@ class Generate_Frame(customtkinter.CTkFrame):
         ValueError
             If start or end events are not specified.
         """
+        if self.worker is not None and self.worker.is_alive():
+            return
+
         try:
             output_folder = self.master.Output_Frame.selected_output_folder
             pupil_file = self.master.Input_Frame.selected_pupil_file
@@ -474,6 +619,7 @@ class Generate_Frame(customtkinter.CTkFrame):
             gaze_file = self.master.Input_Frame.selected_gaze_file
             saccades_file = self.master.Input_Frame.selected_saccades_file
             start_event, end_event = self.master.Selected_Frame.get_selected_events()
+            occurrences = self.master.Selected_Frame.get_occurrences()
             color = self.master.Col_Int_Frame.get_colour()
             time = self.master.Col_Int_Frame.get_time()
 
@@ -489,23 +635,97 @@ class Generate_Frame(customtkinter.CTkFrame):
             if not time:
                 raise ValueError("No time selected.")
 
-            # Call the main plotting function
-            main.generate_plots(
-                blinks_file=blinks_file,
-                pupil_file=pupil_file,
-                events_file=events_file,
-                fixations_file=fixations_file,
-                gaze_file=gaze_file,
-                saccades_file=saccades_file,
-                output_folder=output_folder,
-                start_event=start_event,
-                end_event=end_event,
-                colour=color,
-                time=time
-            )
-
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
+            return
+
+        kwargs = dict(
+            output_folder=output_folder,
+            start_event=start_event,
+            end_event=end_event,
+            occurrences=occurrences,
+            colour=color,
+            time=time,
+            workers=int(self.workers_menu.get())
+        )
+        self.cancel_event = threading.Event()
+        self.generate_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progress_bar.set(0)
+        self.status.configure(text="Starting...")
+
+        # Call the main plotting pipeline outside of the Tk main thread
+        self.worker = threading.Thread(target=self.run_pipeline, args=(self.master.get_session(),), kwargs=kwargs,
+                                       daemon=True)
+        self.worker.start()
+        self.after(self.POLL_MS, self.poll)
+
+    def run_pipeline(self, session, **kwargs):
+        """
+        Run the pipeline in the worker thread and post its outcome to the queue.
+
+        No Tk call is made from this thread. The pipeline starts from the
+        streams loaded by the session; it waits for the files still loading.
+        """
+        try:
+            main = load_pipeline()
+        except Exception as e:
+            self.messages.put(("error", e))
+            return
+
+        try:
+            result = session.run_pipeline(
+                **kwargs,
+                progress=lambda stage, total, message: self.messages.put(("progress", stage / total, message)),
+                cancel_event=self.cancel_event
+            )
+            self.messages.put(("done", result))
+        except main.GenerationCancelled:
+            self.messages.put(("cancelled", None))
+        except Exception as e:
+            self.messages.put(("error", e))
+
+    def poll(self):
+        """
+        Apply the messages posted by the worker thread, then poll again until it ends.
+        """
+        while True:
+            try:
+                kind, value, *message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                self.progress_bar.set(value)
+                self.status.configure(text=message[0])
+                continue
+
+            self.generate_button.configure(state="normal")
+            self.cancel_button.configure(state="disabled")
+            if kind == "done":
+                summary = value["report"].summary()
+                self.status.configure(text=f"Done · {summary}")
+                print(f"📊 {summary}")
+                load_pipeline().notify_result(value)
+            elif kind == "cancelled":
+                self.progress_bar.set(0)
+                self.status.configure(text="Cancelled")
+                print("⛔ Generation cancelled.")
+            else:
+                self.status.configure(text="Error")
+                print(f"❌ Error : {value}")
+                messagebox.showerror("Error", f"An error occurred: {value}")
+            return
+
+        self.after(self.POLL_MS, self.poll)
+
+    def cancel(self):
+        """
+        Ask the running generation to stop at the next stage.
+        """
+        self.cancel_event.set()
+        self.cancel_button.configure(state="disabled")
+        self.status.configure(text="Cancelling...")
 
 class Credits_Frame(customtkinter.CTkFrame):
     """
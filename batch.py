@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from loaders import CACHE_DIRNAME, recording_files, reuse_fingerprint, fingerprint_matches
+from config import RECORDING_FILES
+from neopupil import run_recording, EXIT_OK, EXIT_USAGE, EXIT_PARTIAL, EXIT_CANCELLED
+
+SUMMARY_FILE = "batch_summary.json"
+MANIFEST_FILE = "batch_manifest.json"
+MANIFEST_VERSION = 1
+
+# Options that change the generated plots; a recording is redone when one of them changes
+ANALYSIS_PARAMS = ("start", "end", "bin", "colour", "gaze_mode", "gaze_tolerance", "heatmap_sigma",
+                   "heatmap_fixations", "plan", "stats_only", "format", "occurrences", "epochs", "epoch_window")
+
+# Set by SIGINT/SIGTERM inside a batch worker process
+_worker_cancel = threading.Event()
+
+def find_recordings(root, exclude=()):
+    """
+    Find the Pupil Cloud export folders under a root folder.
+
+    A folder is a recording when it contains every file of `RECORDING_FILES`
+    under its standard name.
+
+    Parameters
+    ----------
+    root : str
+        Folder searched recursively.
+    exclude : sequence of str, optional
+        Folders not to search, e.g. the output folder (default is none).
+
+    Returns
+    -------
+    list of str
+        Recording folders, sorted by path.
+    """
+    required = set(RECORDING_FILES.values())
+    excluded = {os.path.abspath(folder) for folder in exclude}
+    recordings = []
+
+    for folder, subfolders, files in os.walk(root):
+        subfolders[:] = [name for name in subfolders
+                         if name != CACHE_DIRNAME and os.path.abspath(os.path.join(folder, name)) not in excluded]
+        if required.issubset(files):
+            recordings.append(folder)
+    return sorted(recordings)
+
+def output_subfolder(output_root, root, recording):
+    """
+    Name the output folder of a recording after its path relative to the root.
+
+    Parameters
+    ----------
+    output_root : str
+        Output folder of the batch.
+    root : str
+        Root folder of the batch.
+    recording : str
+        Recording folder.
+
+    Returns
+    -------
+    str
+        `output_root/relative/path/of/recording`, or `output_root/name` when
+        the root itself is the recording.
+    """
+    relative = os.path.relpath(recording, root)
+    if relative == os.curdir:
+        relative = os.path.basename(os.path.abspath(recording))
+    return os.path.join(output_root, relative)
+
+def analysis_params(args):
+    """
+    Extract the options that change the generated plots.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Options of the `batch` command.
+
+    Returns
+    -------
+    dict
+        Value of every option of `ANALYSIS_PARAMS`.
+    """
+    return {name: getattr(args, name) for name in ANALYSIS_PARAMS}
+
+def load_manifest(output_root):
+    """
+    Read the checkpoint manifest of a batch.
+
+    Parameters
+    ----------
+    output_root : str
+        Output folder of the batch.
+
+    Returns
+    -------
+    dict
+        Manifest with the keys 'version' and 'recordings' (one entry per
+        recording folder). An empty manifest is returned if the file is
+        missing, unreadable or from another version.
+    """
+    try:
+        with open(os.path.join(output_root, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION and isinstance(manifest.get("recordings"), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "recordings": {}}
+
+def save_manifest(output_root, manifest):
+    """
+    Write the checkpoint manifest atomically, so that an interrupted batch
+    never leaves a truncated file behind.
+
+    Parameters
+    ----------
+    output_root : str
+        Output folder of the batch.
+    manifest : dict
+        Manifest as returned by `load_manifest`.
+    """
+    os.makedirs(output_root, exist_ok=True)
+    path = os.path.join(output_root, MANIFEST_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def is_complete(entry, params, recording, output):
+    """
+    Tell whether a recording was already analysed with the same inputs and options.
+
+    Parameters
+    ----------
+    entry : dict or None
+        Manifest entry of the recording.
+    params : dict
+        Options of the current batch, see `analysis_params`.
+    recording : str
+        Recording folder.
+    output : str
+        Output folder of the recording.
+
+    Returns
+    -------
+    bool
+        True if the entry succeeded with the same options and output folder,
+        every input file still matches its fingerprint and every plot is
+        still in the output folder with its recorded size.
+    """
+    if not entry or entry.get("status") != "ok" or entry.get("params") != params:
+        return False
+    if entry.get("output") != os.path.abspath(output):
+        return False
+    for name, fingerprint in entry.get("inputs", {}).items():
+        if not fingerprint_matches(fingerprint, os.path.join(recording, name)):
+            return False
+    for name, size in entry.get("artifacts", {}).items():
+        try:
+            if os.path.getsize(os.path.join(output, name)) != size:
+                return False
+        except OSError:
+            return False
+    return True
+
+def _manifest_entry(result, params, inputs):
+    """Build the manifest entry of an analysed recording."""
+    artifacts = {}
+    for name in result.get("plots", []):
+        try:
+            artifacts[name] = os.path.getsize(os.path.join(result["output"], name))
+        except OSError:
+            pass
+    return {
+        "status": result["status"],
+        "params": params,
+        "output": result["output"],
+        "inputs": inputs,
+        "artifacts": artifacts,
+        "failures": result.get("failures", []),
+        "error": result.get("error"),
+        "completed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def _init_worker():
+    """Stop the running recording at the next stage on SIGINT/SIGTERM."""
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: _worker_cancel.set())
+
+def _run_one(args, previous=None):
+    """
+    Fingerprint the input files of a recording, then analyse it in a batch
+    worker process. Returns `(summary, exit_code, fingerprints)`.
+
+    The fingerprints of the previous manifest entry (`previous`) and of the
+    columnar cache are reused for the files whose size and time did not
+    change, so the large exports are not hashed again on every run.
+    """
+    previous = previous or {}
+    try:
+        inputs = {}
+        for path in recording_files(args.recording).values():
+            name = os.path.basename(path)
+            inputs[name] = reuse_fingerprint(path, previous.get(name))
+    except OSError:
+        inputs = {}
+    return (*run_recording(args, _worker_cancel), inputs)
+
+def run_batch(args, cancel_event=None):
+    """
+    Analyse every recording found under a root folder, in parallel.
+
+    Each recording is analysed in its own process and renders its figures
+    in that process, so `--jobs` recordings run at the same time.
+
+    The batch is resumable: every finished recording is recorded in the
+    checkpoint manifest (`MANIFEST_FILE` in the output folder) with the
+    fingerprints of its input files, the analysis options and its plots.
+    A rerun skips the recordings that are complete according to
+    `is_complete` and analyses the others, in order.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Options of the `batch` command.
+    cancel_event : threading.Event, optional
+        When set, the recordings that have not started yet are skipped
+        (default is None).
+
+    Returns
+    -------
+    tuple
+        `(summary, exit_code)` where `summary` is a JSON-serialisable dict
+        with the keys 'status', 'root', 'output', 'recordings' (the summary
+        of each recording, see `neopupil.run_recording`; recordings skipped
+        after a cancellation have the status 'skipped'), 'succeeded',
+        'failed', 'resumed' (recordings skipped because they were already
+        complete; their status is 'ok' and 'resumed' is true in their
+        summary) and 'elapsed_s'. It is also saved as `SUMMARY_FILE` in the
+        output folder.
+    """
+    t0 = time.perf_counter()
+    output_root = args.output or os.path.join(args.root, "neopupil_plots")
+    recordings = find_recordings(args.root, exclude=[output_root])
+    summary = {
+        "status": "ok",
+        "root": os.path.abspath(args.root),
+        "output": os.path.abspath(output_root),
+        "recordings": [],
+        "succeeded": 0,
+        "failed": 0,
+        "resumed": 0,
+        "elapsed_s": None,
+    }
+
+    if not recordings:
+        print(f"⚠️ No recording found under {args.root}.", file=sys.stderr)
+        summary["status"] = "error"
+        return summary, EXIT_USAGE
+
+    print(f"📂 {len(recordings)} recording(s) found under {args.root}.", file=sys.stderr)
+    params = analysis_params(args)
+    resume = args.resume and not args.force
+    manifest = load_manifest(output_root) if resume else {"version": MANIFEST_VERSION, "recordings": {}}
+    tasks = []
+    previous = {}
+    for recording in recordings:
+        task = argparse.Namespace(**vars(args))
+        task.recording = recording
+        task.output = output_subfolder(output_root, args.root, recording)
+        task.workers = 1
+
+        key = os.path.abspath(recording)
+        entry = manifest["recordings"].get(key)
+        previous[key] = (entry or {}).get("inputs")
+        if is_complete(entry, params, recording, task.output):
+            summary["recordings"].append({"status": "ok", "recording": key, "output": entry["output"],
+                                          "plots": sorted(entry["artifacts"]), "resumed": True})
+            summary["succeeded"] += 1
+            summary["resumed"] += 1
+        else:
+            tasks.append(task)
+
+    if summary["resumed"]:
+        print(f"⏭ {summary['resumed']} recording(s) already complete, {len(tasks)} to analyse.", file=sys.stderr)
+
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker) as pool:
+        futures = {pool.submit(_run_one, task, previous[os.path.abspath(task.recording)]): task
+                   for task in tasks}
+        for future in as_completed(futures):
+            if cancel_event is not None and cancel_event.is_set():
+                for pending in futures:
+                    pending.cancel()
+            task = futures[future]
+            if future.cancelled():
+                summary["recordings"].append({"status": "skipped", "recording": os.path.abspath(task.recording),
+                                              "output": os.path.abspath(task.output)})
+                continue
+
+            try:
+                result, code, inputs = future.result()
+            except Exception as e:
+                result, code, inputs = {"status": "error", "recording": os.path.abspath(task.recording),
+                                        "output": os.path.abspath(task.output), "error": str(e)}, None, {}
+            summary["recordings"].append(result)
+
+            # Checkpoint as soon as a recording ends, so an interrupted batch resumes from here
+            manifest["recordings"][result["recording"]] = _manifest_entry(result, params, inputs)
+            save_manifest(output_root, manifest)
+            if code == EXIT_OK:
+                summary["succeeded"] += 1
+                print(f"✅ {task.recording}", file=sys.stderr)
+            else:
+                summary["failed"] += 1
+                print(f"❌ {task.recording}: {result['status']} {result.get('error') or ''}", file=sys.stderr)
+
+    summary["recordings"].sort(key=lambda result: result["recording"])
+    summary["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    if cancel_event is not None and cancel_event.is_set():
+        summary["status"], code = "cancelled", EXIT_CANCELLED
+    elif summary["failed"]:
+        summary["status"], code = "partial", EXIT_PARTIAL
+    else:
+        code = EXIT_OK
+
+    os.makedirs(output_root, exist_ok=True)
+    with open(os.path.join(output_root, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"📊 {summary['succeeded']} succeeded, {summary['failed']} failed.", file=sys.stderr)
+    return summary, code
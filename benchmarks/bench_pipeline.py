@@ -0,0 +1,210 @@
+"""
+Benchmark the analysis pipeline on synthetic recordings.
+
+Every scenario (duration x number of events) is generated once with
+`synthetic.generate_recording`, then analysed in a fresh process by two runs
+of `main_plots.run_pipeline` on one render process, the first without and the
+second with the columnar cache. The stages are read from the run reports:
+
+- load_cold: the loading stages of the first run, which parse the CSV files
+  and convert the gaze and pupil exports to the columnar cache;
+- load_warm: the same stages of the second run, with the cache already built;
+- filter: the 'event pairs' timer of the second run, which finds the windows
+  and the pairs of events;
+- aggregate: its 'statistics between events' and 'prefix-sum indexes' timers;
+- render: its blink and figure rendering stages, which draw and save the PNG
+  files. The duration of every pipeline stage and timer is kept in the
+  results as well.
+
+Example::
+
+    python benchmarks/bench_pipeline.py --durations 300,1800,7200 --events 10,100,1000 --output bench.json
+    python benchmarks/bench_pipeline.py --baseline bench.json
+
+The second command exits with status 1 when a stage got slower than the
+baseline by more than the tolerance.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import contextlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use("Agg")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import main_plots
+from neopupil import parse_bin
+from synthetic import generate_recording
+from loaders import CACHE_DIRNAME, recording_files
+
+STAGES = ("load_cold", "load_warm", "filter", "aggregate", "render")
+LOAD_STAGES = ("Loading files", "Loading gaze and pupil samples")
+FILTER_TIMERS = ("event pairs",)
+AGGREGATE_TIMERS = ("statistics between events", "prefix-sum indexes")
+RENDER_STAGES = ("Blink plots", "Rendering plots")
+# Differences below this are noise, whatever the relative change
+MIN_REGRESSION_S = 0.05
+
+def parse_list(text, kind=int):
+    """Parse a comma-separated list of numbers."""
+    return [kind(item) for item in text.split(",") if item.strip()]
+
+def recording_folder(workdir, duration_s, n_events, sampling_hz, seed):
+    """Generate a scenario's recording unless it already exists in the work folder."""
+    folder = os.path.join(workdir, f"rec_{duration_s:g}s_{n_events}ev_{sampling_hz:g}hz_seed{seed}")
+    if not os.path.exists(os.path.join(folder, ".complete")):
+        shutil.rmtree(folder, ignore_errors=True)
+        generate_recording(folder, duration_s, sampling_hz, n_events, seed=seed)
+        open(os.path.join(folder, ".complete"), "w").close()
+    return folder
+
+def run(files, output, bin_s):
+    """Run the whole pipeline on one process and return its run report."""
+    result = main_plots.run_pipeline(files["blinks"], files["pupil"], files["events"], files["fixations"],
+                                     files["gaze"], files["saccades"], output, "recording.begin", "recording.end",
+                                     "blue", bin_s, workers=1, force=True)
+    return result["report"].to_dict()
+
+def total(seconds, names):
+    """Sum the stages or timers of a run report."""
+    return sum(seconds.get(name, 0.0) for name in names)
+
+def run_scenario(folder, bin_s):
+    """
+    Benchmark one recording in the current process.
+
+    Returns a dict with the time ('<stage>_s') of every stage of `STAGES`,
+    the duration of each stage ('pipeline_s') and timer ('timers_s') of the
+    warm run, and the peak resident memory of the process.
+    """
+    files = recording_files(folder)
+    for path in files.values():
+        shutil.rmtree(os.path.join(os.path.dirname(path), CACHE_DIRNAME), ignore_errors=True)
+    with tempfile.TemporaryDirectory() as output:
+        cold = run(files, output, bin_s)
+        warm = run(files, output, bin_s)
+
+    report = {
+        "load_cold_s": total(cold["stages"], LOAD_STAGES),
+        "load_warm_s": total(warm["stages"], LOAD_STAGES),
+        "filter_s": total(warm["timers"], FILTER_TIMERS),
+        "aggregate_s": total(warm["timers"], AGGREGATE_TIMERS),
+        "render_s": total(warm["stages"], RENDER_STAGES),
+        "pipeline_s": warm["stages"],
+        "timers_s": warm["timers"],
+        "pipeline_total_s": warm["elapsed_s"],
+    }
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report["max_rss_bytes"] = maxrss if sys.platform == "darwin" else maxrss * 1024
+    report["gaze_rows"] = warm["rows"].get("gaze", 0)
+    report["pairs"] = warm["counters"].get("intervals", 0)
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in report.items()}
+
+def _run_quiet(folder, bin_s):
+    """Run a scenario with the pipeline messages on stderr, keeping stdout for the results."""
+    with contextlib.redirect_stdout(sys.stderr):
+        return run_scenario(folder, bin_s)
+
+def compare(results, baseline, tolerance):
+    """
+    List the stages slower than in a baseline run.
+
+    Parameters
+    ----------
+    results : list of dict
+        Scenarios of the current run.
+    baseline : list of dict
+        Scenarios of the baseline run, matched on duration, events and rate.
+    tolerance : float
+        Allowed relative slowdown, e.g. 0.25 for 25 %.
+
+    Returns
+    -------
+    list of str
+        One message per regression.
+    """
+    key = lambda scenario: (scenario["duration_s"], scenario["events"], scenario["sampling_hz"])
+    reference = {key(scenario): scenario for scenario in baseline}
+    regressions = []
+    for scenario in results:
+        before = reference.get(key(scenario))
+        if before is None:
+            continue
+        for stage in STAGES:
+            old, new = before.get(f"{stage}_s"), scenario.get(f"{stage}_s")
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > MIN_REGRESSION_S:
+                regressions.append(f"{scenario['duration_s']:g}s/{scenario['events']} events: "
+                                   f"{stage} {old:.3f}s -> {new:.3f}s")
+    return regressions
+
+def print_table(results):
+    """Print one line per scenario with the time of every stage and the peak memory."""
+    header = f"{'duration':>9} {'events':>6} " + " ".join(f"{stage:>10}" for stage in STAGES) + f" {'max rss':>9}"
+    print(header)
+    for scenario in results:
+        rss = scenario.get("max_rss_bytes")
+        print(f"{scenario['duration_s']:>8g}s {scenario['events']:>6} "
+              + " ".join(f"{scenario[f'{stage}_s']:>9.3f}s" for stage in STAGES)
+              + (f" {rss / 2**20:>7.0f}MB" if rss else f" {'-':>9}"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NeoPupil pipeline on synthetic recordings.")
+    parser.add_argument("--durations", type=lambda text: parse_list(text, float), default=[300, 1800, 7200],
+                        help="recording durations in seconds (default: 300,1800,7200)")
+    parser.add_argument("--events", type=parse_list, default=[10, 100, 1000],
+                        help="numbers of events (default: 10,100,1000)")
+    parser.add_argument("--rate", type=float, default=200, help="gaze sampling rate in Hz (default: 200)")
+    parser.add_argument("--bin", type=parse_bin, default=10, help="time bin width in seconds (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic recordings (default: 0)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "neopupil_bench"),
+                        help="folder keeping the generated recordings between runs")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative slowdown reported as a regression (default: 0.25)")
+    args = parser.parse_args()
+
+    results = []
+    for duration_s in args.durations:
+        for n_events in args.events:
+            print(f"⏱ {duration_s:g}s, {n_events} events...", file=sys.stderr)
+            folder = recording_folder(args.workdir, duration_s, n_events, args.rate, args.seed)
+            # A fresh process per scenario, so that the peak resident memory is its own
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                report = pool.submit(_run_quiet, folder, args.bin).result()
+            results.append({"duration_s": duration_s, "events": n_events, "sampling_hz": args.rate, **report})
+
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "bin_s": args.bin, "scenarios": results},
+                      f, indent=2)
+        print(f"📄 Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["scenarios"], args.tolerance)
+        for message in regressions:
+            print(f"⚠️ Regression: {message}")
+        if regressions:
+            return 1
+        print("✅ No regression against the baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
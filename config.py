@@ -0,0 +1,152 @@
+import os
+import csv
+
+# Settings shipped next to the application; read without pandas so that the
+# window can fill its menus before the scientific stack is imported.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+COLOURS_FILE = os.path.join(APP_DIR, "colours.csv")
+TIME_FILE = os.path.join(APP_DIR, "time.csv")
+SWEEP_ALL = "all"
+# Gaze plots drawn by the pipeline: simplified paths, a heatmap or both
+GAZE_MODES = ("paths", "heatmap", "both")
+# Default number of rendering processes. Each one holds a matplotlib figure
+# and its data, so a large machine does not start one per CPU
+DEFAULT_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+def read_column(path, column):
+    """
+    Read the distinct values of one column of a small CSV file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file, with a header row.
+    column : str
+        Name of the column.
+
+    Returns
+    -------
+    list of str
+        Non-empty values, without duplicates, in file order.
+
+    Raises
+    ------
+    ValueError
+        If the file has no such column.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        if column not in (reader.fieldnames or []):
+            raise ValueError(f"Missing '{column}' column in {os.path.basename(path)}.")
+        values = (row[column].strip() for row in reader if row[column] is not None)
+        return list(dict.fromkeys(value for value in values if value))
+
+def load_colours(colours_file=COLOURS_FILE):
+    """
+    Read the plot colours offered in `colours.csv`.
+
+    Parameters
+    ----------
+    colours_file : str, optional
+        Path to the CSV file with a 'colour' column (default is `COLOURS_FILE`).
+
+    Returns
+    -------
+    list of str
+        Colour names, in file order.
+    """
+    return read_column(colours_file, "colour")
+
+def load_time_widths(time_file=TIME_FILE):
+    """
+    Read the bin widths offered in `time.csv`.
+
+    Parameters
+    ----------
+    time_file : str, optional
+        Path to the CSV file with a 'time' column (default is `TIME_FILE`).
+
+    Returns
+    -------
+    list of int or float
+        Strictly positive bin widths in seconds, in file order. Whole widths
+        are ints and fractional ones floats, as the `--bin` option parses
+        them, so that the plots are named e.g. "10s" and "2.5s".
+    """
+    widths = (float(value) for value in read_column(time_file, "time"))
+    return [int(width) if width.is_integer() else width for width in dict.fromkeys(widths) if width > 0]
+
+# Columns actually used by the analyses, with compact dtypes
+STREAM_COLUMNS = {
+    "blinks": {
+        "start timestamp [ns]": "int64",
+        "duration [ms]": "float32",
+    },
+    "events": {
+        "timestamp [ns]": "int64",
+        "name": "category",
+    },
+    "fixations": {
+        "start timestamp [ns]": "int64",
+        "duration [ms]": "float32",
+        "fixation x [px]": "float32",
+        "fixation y [px]": "float32",
+    },
+    "saccades": {
+        "start timestamp [ns]": "int64",
+        "duration [ms]": "float32",
+    },
+    "gaze": {
+        "timestamp [ns]": "int64",
+        "gaze x [px]": "float32",
+        "gaze y [px]": "float32",
+    },
+    "pupil": {
+        "timestamp [ns]": "int64",
+        "pupil diameter left [mm]": "float32",
+        "pupil diameter right [mm]": "float32",
+    },
+}
+
+# Standard names of the Pupil Cloud Time Series export files
+RECORDING_FILES = {
+    "blinks": "blinks.csv",
+    "pupil": "3d_eye_states.csv",
+    "events": "events.csv",
+    "fixations": "fixations.csv",
+    "gaze": "gaze.csv",
+    "saccades": "saccades.csv",
+}
+
+def check_schema(path, stream):
+    """
+    Check that a CSV file has the columns of a Neon export stream.
+
+    Only the header row is read.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+    stream : str
+        Name of the stream, a key of `STREAM_COLUMNS`.
+
+    Returns
+    -------
+    list of str
+        Columns of the file.
+
+    Raises
+    ------
+    ValueError
+        If the file is empty or lacks one of the columns of `STREAM_COLUMNS`.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        raise ValueError(f"{os.path.basename(path)} is empty.")
+    missing = [column for column in STREAM_COLUMNS[stream] if column not in header]
+    if missing:
+        raise ValueError(f"{os.path.basename(path)} is not a Neon {stream} export: missing column(s) "
+                         + ", ".join(f"'{column}'" for column in missing) + ".")
+    return header
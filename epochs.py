@@ -0,0 +1,199 @@
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from intervals import NS_PER_S
+
+# Resampling rate of the epochs, and longest gap between two samples bridged by interpolation
+EPOCH_RATE_HZ = 100
+MAX_GAP_S = 0.1
+
+def epoch_grid(before_s, after_s, rate_hz=EPOCH_RATE_HZ):
+    """
+    Build the uniform time grid of the epochs, relative to the event.
+
+    Parameters
+    ----------
+    before_s : float
+        Seconds before the event (the grid starts at `-before_s`).
+    after_s : float
+        Seconds after the event (the grid ends at `+after_s`).
+    rate_hz : float, optional
+        Samples per second (default is `EPOCH_RATE_HZ`).
+
+    Returns
+    -------
+    numpy.ndarray
+        Offsets of the samples in seconds, including 0.
+
+    Raises
+    ------
+    ValueError
+        If the rate is not strictly positive or the window is empty.
+    """
+    if rate_hz <= 0:
+        raise ValueError("The epoch sampling rate must be a positive number of Hz.")
+    first, last = int(np.round(-before_s * rate_hz)), int(np.round(after_s * rate_hz))
+    if last <= first:
+        raise ValueError("The epoch must end after it starts.")
+    return np.arange(first, last + 1) / rate_hz
+
+def event_epochs(ts, values, onsets, offsets_s, max_gap_s=MAX_GAP_S):
+    """
+    Resample a signal onto the same time grid around every event.
+
+    All the epochs are interpolated in one call over the flattened
+    events x samples grid, so the cost grows with the size of the matrix and
+    not with a Python loop over the events.
+
+    Parameters
+    ----------
+    ts : numpy.ndarray
+        Sorted timestamps of the signal in nanoseconds.
+    values : numpy.ndarray
+        Values aligned with `ts`, e.g. the mean pupil diameter. NaN values
+        (blinks) make the neighbouring grid points NaN.
+    onsets : array-like
+        Timestamps of the events in nanoseconds.
+    offsets_s : numpy.ndarray
+        Grid offsets in seconds, as returned by `epoch_grid`.
+    max_gap_s : float, optional
+        Grid points strictly inside a gap longer than this between two
+        samples, or outside the recording, are NaN; a point falling exactly
+        on a sample keeps its value (default is `MAX_GAP_S`).
+
+    Returns
+    -------
+    numpy.ndarray
+        Float32 matrix of shape (events, samples).
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    onsets = np.asarray(onsets, dtype=np.int64)
+    if not len(ts) or not len(onsets):
+        return np.full((len(onsets), len(offsets_s)), np.nan, dtype=np.float32)
+
+    # Relative to the first sample, so that nanoseconds are exact in float64
+    origin = ts[0]
+    x = (ts - origin).astype(np.float64)
+    targets = (onsets - origin).astype(np.float64)[:, None] + np.asarray(offsets_s) * NS_PER_S
+    epochs = np.interp(targets, x, np.asarray(values, dtype=np.float64), left=np.nan, right=np.nan)
+
+    if max_gap_s is not None and len(x) > 1:
+        after = np.searchsorted(x, targets, side="left")
+        on_sample = x[np.minimum(after, len(x) - 1)] == targets
+        after = np.clip(after, 1, len(x) - 1)
+        epochs[((x[after] - x[after - 1]) > max_gap_s * NS_PER_S) & ~on_sample] = np.nan
+    return epochs.astype(np.float32)
+
+def baseline_correct(epochs, offsets_s, baseline_s):
+    """
+    Subtract from every epoch its mean over a baseline period.
+
+    Parameters
+    ----------
+    epochs : numpy.ndarray
+        Matrix of shape (events, samples), as returned by `event_epochs`.
+    offsets_s : numpy.ndarray
+        Grid offsets in seconds.
+    baseline_s : tuple of float
+        `(start, end)` of the baseline in seconds relative to the event,
+        e.g. (-0.5, 0).
+
+    Returns
+    -------
+    numpy.ndarray
+        Corrected float32 matrix. Epochs without any valid sample in the
+        baseline become NaN.
+
+    Raises
+    ------
+    ValueError
+        If no sample of the grid falls in the baseline.
+    """
+    start, end = baseline_s
+    columns = (offsets_s >= start) & (offsets_s <= end)
+    if not columns.any():
+        raise ValueError(f"The baseline ({start} s, {end} s) does not overlap the epoch.")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        baseline = np.nanmean(epochs[:, columns], axis=1, keepdims=True)
+    return (epochs - baseline).astype(np.float32)
+
+def epoch_summary(epochs, offsets_s, ci=0.95):
+    """
+    Average the epochs with a confidence band.
+
+    The band is the normal approximation mean +/- z * standard error, over
+    the epochs valid at each sample.
+
+    Parameters
+    ----------
+    epochs : numpy.ndarray
+        Matrix of shape (events, samples).
+    offsets_s : numpy.ndarray
+        Grid offsets in seconds.
+    ci : float, optional
+        Confidence level of the band (default is 0.95).
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per sample with the columns 'time_s', 'n' (valid epochs),
+        'mean', 'std', 'sem', 'ci_low' and 'ci_high'.
+
+    Raises
+    ------
+    ValueError
+        If the confidence level is not between 0 and 1.
+    """
+    if not 0 < ci < 1:
+        raise ValueError("The confidence level must be between 0 and 1.")
+    n = np.sum(~np.isnan(epochs), axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(epochs, axis=0, dtype=np.float64)
+        std = np.nanstd(epochs, axis=0, ddof=1, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sem = np.where(n > 1, std / np.sqrt(n), np.nan)
+    z = NormalDist().inv_cdf(0.5 + ci / 2)
+    return pd.DataFrame({"time_s": offsets_s, "n": n, "mean": mean, "std": np.where(n > 1, std, np.nan),
+                         "sem": sem, "ci_low": mean - z * sem, "ci_high": mean + z * sem})
+
+def pupil_epochs(ts, diameters, onsets, before_s, after_s, baseline_s=(-0.5, 0.0), rate_hz=EPOCH_RATE_HZ,
+                 max_gap_s=MAX_GAP_S):
+    """
+    Event-locked epochs of the pupil diameter, baseline-corrected.
+
+    Parameters
+    ----------
+    ts : numpy.ndarray
+        Sorted timestamps of the pupil samples in nanoseconds.
+    diameters : numpy.ndarray
+        Pupil diameters aligned with `ts`.
+    onsets : array-like
+        Timestamps of the events in nanoseconds.
+    before_s : float
+        Seconds kept before each event.
+    after_s : float
+        Seconds kept after each event.
+    baseline_s : tuple of float, optional
+        Baseline period relative to the event, see `baseline_correct`; None
+        keeps the raw diameters (default is (-0.5, 0)).
+    rate_hz : float, optional
+        Resampling rate (default is `EPOCH_RATE_HZ`).
+    max_gap_s : float, optional
+        Longest gap bridged by interpolation (default is `MAX_GAP_S`).
+
+    Returns
+    -------
+    tuple
+        `(offsets_s, epochs)`: the grid in seconds and the float32 matrix of
+        shape (events, samples).
+    """
+    offsets_s = epoch_grid(before_s, after_s, rate_hz)
+    epochs = event_epochs(ts, diameters, onsets, offsets_s, max_gap_s)
+    if baseline_s is not None:
+        epochs = baseline_correct(epochs, offsets_s, baseline_s)
+    return offsets_s, epochs
@@ -0,0 +1,144 @@
+import warnings
+
+import numpy as np
+
+from intervals import slice_bounds, gather_positions
+
+# Resolution of the Neon scene camera, in pixels
+SCENE_WIDTH = 1600
+SCENE_HEIGHT = 1200
+CHUNK_SAMPLES = 1_000_000
+
+class HeatmapAccumulator:
+    """
+    Density grid of gaze positions in scene camera pixel space.
+
+    Samples are added chunk by chunk, e.g. as they are read from the export
+    (see `loaders.iter_stream_window`), so the grid can be built over
+    recordings of any length with a memory cost independent of the number of
+    samples.
+
+    Parameters
+    ----------
+    cell_px : int, optional
+        Size of a grid cell in pixels (default is 10).
+    width : int, optional
+        Width of the scene camera image in pixels (default is `SCENE_WIDTH`).
+    height : int, optional
+        Height of the scene camera image in pixels (default is `SCENE_HEIGHT`).
+
+    Attributes
+    ----------
+    grid : numpy.ndarray
+        Accumulated weights, of shape (rows, columns).
+    samples : int
+        Number of samples added inside the image.
+    """
+    def __init__(self, cell_px=10, width=SCENE_WIDTH, height=SCENE_HEIGHT):
+        self.cell_px = cell_px
+        self.width = width
+        self.height = height
+        self.n_cols = int(np.ceil(width / cell_px))
+        self.n_rows = int(np.ceil(height / cell_px))
+        self.grid = np.zeros((self.n_rows, self.n_cols))
+        self.samples = 0
+
+    def add(self, x, y, weights=None):
+        """
+        Accumulate one chunk of positions.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            X coordinates in pixels.
+        y : numpy.ndarray
+            Y coordinates in pixels.
+        weights : numpy.ndarray, optional
+            Weight of each position, e.g. fixation durations (default is 1 per sample).
+            Positions outside the image or with a NaN coordinate are ignored.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        col = (x[inside] // self.cell_px).astype(np.intp)
+        row = (y[inside] // self.cell_px).astype(np.intp)
+        w = None if weights is None else np.asarray(weights, dtype=float)[inside]
+
+        cells = np.bincount(row * self.n_cols + col, weights=w, minlength=self.grid.size)
+        self.grid += cells.reshape(self.grid.shape)
+        self.samples += int(inside.sum())
+
+    def add_windows(self, ts, x, y, starts, ends, weights=None, chunk=CHUNK_SAMPLES):
+        """
+        Accumulate the positions falling in time windows, in fixed-size chunks.
+
+        The arrays may hold a whole recording or one chunk of it: the windows
+        are cut by binary search in `ts`, so a stream read chunk by chunk is
+        accumulated one chunk at a time.
+
+        Parameters
+        ----------
+        ts : numpy.ndarray
+            Sorted timestamps of the positions in nanoseconds.
+        x : numpy.ndarray
+            X coordinates in pixels.
+        y : numpy.ndarray
+            Y coordinates in pixels.
+        starts : array-like
+            Window starts in nanoseconds, inclusive.
+        ends : array-like
+            Window ends in nanoseconds, exclusive. A position in several
+            overlapping windows is added once per window.
+        weights : numpy.ndarray, optional
+            Weight of each position (default is 1 per sample).
+        chunk : int, optional
+            Number of positions accumulated at a time (default is `CHUNK_SAMPLES`).
+        """
+        lo, hi = slice_bounds(ts, starts, ends)
+        _, positions = gather_positions(lo, hi)
+        for start in range(0, len(positions), chunk):
+            rows = positions[start:start + chunk]
+            self.add(x[rows], y[rows], None if weights is None else weights[rows])
+
+    def smoothed(self, sigma_px=None):
+        """
+        Return the grid, optionally blurred by a Gaussian kernel.
+
+        The kernel extends over 3 standard deviations, but no further than
+        half the smaller side of the grid: with a larger `sigma_px` the
+        kernel is truncated and a warning is issued.
+
+        Parameters
+        ----------
+        sigma_px : float, optional
+            Standard deviation of the kernel in pixels (default is None, no smoothing).
+
+        Returns
+        -------
+        numpy.ndarray
+            Smoothed copy of the grid.
+        """
+        if not sigma_px:
+            return self.grid.copy()
+
+        sigma = sigma_px / self.cell_px
+        radius = int(np.ceil(3 * sigma))
+        max_radius = (min(self.grid.shape) - 1) // 2
+        if radius > max_radius:
+            warnings.warn(f"Heatmap smoothing of {sigma_px:g} px truncated: the kernel radius is limited to "
+                          f"{max_radius * self.cell_px} px by the size of the grid.", stacklevel=2)
+        radius = max(1, min(radius, max_radius))
+        offsets = np.arange(-radius, radius + 1)
+        kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+        kernel /= kernel.sum()
+
+        # The Gaussian kernel is separable: blur the rows, then the columns
+        grid = np.apply_along_axis(np.convolve, 1, self.grid, kernel, mode="same")
+        return np.apply_along_axis(np.convolve, 0, grid, kernel, mode="same")
+
+    @property
+    def extent(self):
+        """
+        Image extent `(left, right, bottom, top)` in pixels, for `imshow`.
+        """
+        return (0, self.n_cols * self.cell_px, self.n_rows * self.cell_px, 0)
@@ -0,0 +1,410 @@
+import os
+import io
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from loaders import format_bytes
+
+REPORT_FILE = "neopupil_report.json"
+PROFILE_FILE = "neopupil_profile.prof"
+REPORT_VERSION = 1
+PROFILE_MODES = ("cpu", "memory", "all")
+# Number of functions, allocation sites and figures listed in the report
+TOP_ENTRIES = 25
+SLOWEST_FIGURES = 5
+# From Python 3.12 cProfile runs on sys.monitoring: one profiler follows every
+# thread, and a second one cannot be enabled while it is active
+PROFILER_FOLLOWS_THREADS = sys.version_info >= (3, 12)
+
+class RunReport:
+    """
+    Timers, counters and optional profiles of one analysis run.
+
+    The pipeline marks the start of each stage with `enter`; finer steps are
+    timed with `timer`. Rows read from each stream, figures rendered and
+    bytes written are counted, and the whole report is saved as JSON in the
+    output folder (`REPORT_FILE`). Timers and counters may be updated from
+    several threads.
+
+    Parameters
+    ----------
+    profile : {"cpu", "memory", "all"}, optional
+        Also profile the run: "cpu" runs cProfile on the thread running the
+        pipeline and on the plan tasks (figures rendered in worker processes
+        are not profiled; render on one process to include them), "memory"
+        traces the allocations with tracemalloc, "all" does both (default is
+        None, no profiling).
+
+    Attributes
+    ----------
+    stages : dict
+        Seconds spent in each pipeline stage, in order.
+    timers : dict
+        Seconds spent in each finer step.
+    rows : dict
+        Number of rows read from each stream.
+    counters : dict
+        Other counts, e.g. the number of intervals.
+    figures : dict
+        Figures rendered, skipped and failed, bytes written and rendering
+        times, see `record_figures`.
+
+    Raises
+    ------
+    ValueError
+        If the profile mode is unknown.
+    """
+    def __init__(self, profile=None):
+        if profile is not None and profile not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{profile}', expected one of {PROFILE_MODES}.")
+        self.profile = profile
+        self.status = "running"
+        self.started = None
+        self.elapsed = None
+        self.stages = {}
+        self.timers = {}
+        self.rows = {}
+        self.counters = {}
+        self.figures = {}
+        self._stage = None
+        self._t0 = None
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._thread_profiles = []
+        self._memory = None
+
+    @property
+    def profiles_cpu(self):
+        return self.profile in ("cpu", "all")
+
+    @property
+    def profiles_memory(self):
+        return self.profile in ("memory", "all")
+
+    def start(self):
+        """
+        Start the overall timer and the profilers.
+        """
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._t0 = time.perf_counter()
+        if self.profiles_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profiles_cpu:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                print("⚠️ Another profiling tool is active, the CPU profile is skipped.")
+                self._profiler = None
+
+    def enter(self, stage):
+        """
+        Close the current stage and start a new one.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage. A stage entered twice accumulates its time.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self._close_stage(now)
+            self._stage = (stage, now)
+
+    def _close_stage(self, now):
+        if self._stage is not None:
+            name, t0 = self._stage
+            self.stages[name] = self.stages.get(name, 0.0) + now - t0
+            self._stage = None
+
+    def add_time(self, name, seconds):
+        """
+        Add seconds to a timer.
+
+        Parameters
+        ----------
+        name : str
+            Name of the timer, e.g. 'read gaze'.
+        seconds : float
+            Time to add.
+        """
+        with self._lock:
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Time a block of code with a named timer.
+
+        Parameters
+        ----------
+        name : str
+            Name of the timer.
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def timed(self, name, func):
+        """
+        Wrap a function run in a worker thread so that it is timed, and
+        profiled when CPU profiling is on.
+
+        Before Python 3.12 cProfile only sees the thread that enabled it, so
+        the function gets a profiler of its own, merged into the report.
+        From 3.12 the profiler of the run already follows the worker threads
+        and a second profiler cannot be enabled, so the function is only
+        timed.
+
+        Parameters
+        ----------
+        name : str
+            Name of the timer.
+        func : callable
+            Function to wrap.
+
+        Returns
+        -------
+        callable
+            Function with the same arguments and result.
+        """
+        def wrapper(*args, **kwargs):
+            with self.timer(name):
+                profiler = self._thread_profiler()
+                if profiler is None:
+                    return func(*args, **kwargs)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profiler.disable()
+                    with self._lock:
+                        self._thread_profiles.append(profiler)
+        return wrapper
+
+    def _thread_profiler(self):
+        """Start a profiler for the calling worker thread, or return None."""
+        if not self.profiles_cpu or PROFILER_FOLLOWS_THREADS:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool is active, e.g. the run itself is profiled
+            return None
+        return profiler
+
+    def scanned(self, stream, rows):
+        """
+        Count the rows read from a stream.
+
+        Parameters
+        ----------
+        stream : str
+            Name of the stream, e.g. 'gaze'.
+        rows : int
+            Number of rows read.
+        """
+        with self._lock:
+            self.rows[stream] = self.rows.get(stream, 0) + int(rows)
+
+    def count(self, name, n=1):
+        """
+        Increase a counter.
+
+        Parameters
+        ----------
+        name : str
+            Name of the counter.
+        n : int, optional
+            Increment (default is 1).
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def record_figures(self, scheduler, failures=()):
+        """
+        Record the figures of a rendering scheduler.
+
+        Parameters
+        ----------
+        scheduler : rendering.RenderScheduler
+            Scheduler of the run.
+        failures : sequence of tuple, optional
+            `(name, message)` of the figures that failed (default is none).
+        """
+        stats = scheduler.stats
+        slowest = sorted(stats.items(), key=lambda item: item[1]["seconds"], reverse=True)[:SLOWEST_FIGURES]
+        self.figures = {
+            "rendered": len(stats),
+            "skipped": len(scheduler.skipped),
+            "failed": len(failures),
+            "bytes_written": sum(job["bytes"] for job in stats.values()),
+            "render_s": sum(job["seconds"] for job in stats.values()),
+            "layout_s": sum(job["layout_s"] for job in stats.values()),
+            "save_s": sum(job["save_s"] for job in stats.values()),
+            "slowest": [{"name": name, **job} for name, job in slowest],
+        }
+
+    def finish(self, status="ok"):
+        """
+        Stop the timers and the profilers.
+
+        Parameters
+        ----------
+        status : str, optional
+            Outcome of the run, e.g. 'ok', 'error' or 'cancelled' (default is 'ok').
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self._close_stage(now)
+        self.status = status
+        if self._t0 is not None:
+            self.elapsed = now - self._t0
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.profiles_memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._memory = {
+                "peak_bytes": peak,
+                "top": [{"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                         "bytes": stat.size, "count": stat.count}
+                        for stat in snapshot.statistics("lineno")[:TOP_ENTRIES]],
+            }
+
+    def _cpu_stats(self):
+        """Merge the profile of the main thread and of the worker threads."""
+        profiles = ([self._profiler] if self._profiler is not None else []) + self._thread_profiles
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        return stats
+
+    def to_dict(self):
+        """
+        Return the report as a JSON-serialisable dict.
+
+        Returns
+        -------
+        dict
+            Keys 'version', 'status', 'started', 'elapsed_s', 'stages',
+            'timers', 'rows', 'counters', 'figures' and, when profiling,
+            'profile' with the functions taking the most cumulative time
+            ('cpu') and the allocation sites holding the most memory at the
+            end of the run with the peak traced memory ('memory').
+        """
+        report = {
+            "version": REPORT_VERSION,
+            "status": self.status,
+            "started": self.started,
+            "elapsed_s": round(self.elapsed, 4) if self.elapsed is not None else None,
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "timers": {name: round(seconds, 4) for name, seconds in self.timers.items()},
+            "rows": dict(self.rows),
+            "counters": dict(self.counters),
+            "figures": _rounded(self.figures),
+        }
+        if self.profile:
+            report["profile"] = {}
+            stats = self._cpu_stats()
+            if stats is not None:
+                entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_ENTRIES]
+                report["profile"]["cpu"] = [
+                    {"function": f"{filename}:{line}({name})", "calls": calls, "total_s": round(total, 4),
+                     "cumulative_s": round(cumulative, 4)}
+                    for (filename, line, name), (_, calls, total, cumulative, _) in entries
+                ]
+            if self._memory is not None:
+                report["profile"]["memory"] = self._memory
+        return report
+
+    def save(self, output_folder):
+        """
+        Write the report (and the CPU profile, if any) into the output folder.
+
+        The report is written atomically as `REPORT_FILE`; the raw CPU
+        profile is saved as `PROFILE_FILE`, readable with `pstats` or
+        snakeviz.
+
+        Parameters
+        ----------
+        output_folder : str
+            Output folder of the run. Nothing is written if it does not exist.
+
+        Returns
+        -------
+        str or None
+            Path of the report, or None if it was not written.
+        """
+        if not os.path.isdir(output_folder):
+            return None
+        report = self.to_dict()
+        stats = self._cpu_stats()
+        if stats is not None:
+            stats.dump_stats(os.path.join(output_folder, PROFILE_FILE))
+            report["profile"]["file"] = PROFILE_FILE
+
+        path = os.path.join(output_folder, REPORT_FILE)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+        return path
+
+    def summary(self, stages=3):
+        """
+        Summarise the run in a few words.
+
+        Parameters
+        ----------
+        stages : int, optional
+            Number of slowest stages listed (default is 3).
+
+        Returns
+        -------
+        str
+            E.g. '12.3 s · 26 figures, 3.4 MB written · 2.4 M rows read ·
+            slowest: Rendering plots 9.1 s, Loading files 1.2 s'.
+        """
+        parts = []
+        if self.elapsed is not None:
+            parts.append(f"{self.elapsed:.1f} s")
+        if self.figures:
+            text = f"{self.figures['rendered']} figure(s), {format_bytes(self.figures['bytes_written'])} written"
+            if self.figures["skipped"]:
+                text += f", {self.figures['skipped']} unchanged"
+            parts.append(text)
+        if self.rows:
+            parts.append(f"{_format_count(sum(self.rows.values()))} rows read")
+        slowest = sorted(self.stages.items(), key=lambda item: item[1], reverse=True)[:stages]
+        if slowest:
+            parts.append("slowest: " + ", ".join(f"{name} {seconds:.1f} s" for name, seconds in slowest))
+        return " · ".join(parts)
+
+def _rounded(value):
+    """Round the floats of a nested structure for the report."""
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, dict):
+        return {key: _rounded(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rounded(item) for item in value]
+    return value
+
+def _format_count(n):
+    """Format a count as e.g. 950, 12.3 k or 2.4 M."""
+    for unit, size in (("M", 1e6), ("k", 1e3)):
+        if n >= size:
+            return f"{n / size:.1f} {unit}"
+    return str(n)
@@ -0,0 +1,689 @@
+import numpy as np
+import pandas as pd
+
+NS_PER_S = 1_000_000_000
+
+def sort_by_timestamp(df, ts_col):
+    """
+    Sort a stream by its timestamp column, once.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Stream to sort (blinks, fixations, gaze, 3d_eye_states...).
+    ts_col : str
+        Name of the timestamp column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The same DataFrame if it is already sorted, otherwise a sorted copy
+        with a fresh index. The sort is stable so ties keep their file order.
+    """
+    if df[ts_col].is_monotonic_increasing:
+        return df
+    return df.sort_values(ts_col, kind="mergesort").reset_index(drop=True)
+
+def mean_pupil_diameter(df):
+    """
+    Average the left and right pupil diameters of each sample.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame containing 'pupil diameter left [mm]' and 'pupil diameter right [mm]'.
+
+    Returns
+    -------
+    pandas.Series
+        Mean diameter per sample, NaN when either eye is missing.
+    """
+    return (df["pupil diameter left [mm]"] + df["pupil diameter right [mm]"]) / 2
+
+def duration_stream(df):
+    """
+    Extract the sorted start timestamps and durations of an event stream.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Blinks, fixations or saccades DataFrame.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        `(ts, durations)` sorted by start timestamp.
+    """
+    df = sort_by_timestamp(df, "start timestamp [ns]")
+    return df["start timestamp [ns]"].to_numpy(), df["duration [ms]"].to_numpy()
+
+def pupil_stream(df):
+    """
+    Extract the sorted timestamps and mean pupil diameters of the 3d_eye_states stream.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame containing pupil diameter data and timestamps.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        `(ts, diameters)` sorted by timestamp.
+    """
+    df = sort_by_timestamp(df, "timestamp [ns]")
+    return df["timestamp [ns]"].to_numpy(), mean_pupil_diameter(df).to_numpy()
+
+def event_pairs(events_df, start_ts, end_ts):
+    """
+    List the consecutive pairs of events found between two timestamps.
+
+    Parameters
+    ----------
+    events_df : pandas.DataFrame
+        DataFrame containing event timestamps and names.
+    start_ts : int
+        Start timestamp in nanoseconds (inclusive).
+    end_ts : int
+        End timestamp in nanoseconds (inclusive).
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per pair with the columns 'start', 'end' (timestamps in ns),
+        'start_name', 'end_name' and 'label' ("start ➝ end").
+    """
+    interval_events = events_df[(events_df["timestamp [ns]"] >= start_ts) &
+                                (events_df["timestamp [ns]"] <= end_ts)]
+    ts = interval_events["timestamp [ns]"].to_numpy()
+    names = interval_events["name"].astype(str).to_numpy()
+
+    pairs = pd.DataFrame({
+        "start": ts[:-1],
+        "end": ts[1:],
+        "start_name": names[:-1],
+        "end_name": names[1:],
+    })
+    pairs["label"] = pairs["start_name"] + " ➝ " + pairs["end_name"]
+    return pairs
+
+OCCURRENCES = ("first", "all")
+
+class EventIndex:
+    """
+    Index of the events of a recording, built once, resolving the windows
+    between a start and an end event.
+
+    A protocol may repeat its markers (e.g. `trial_start` and `trial_end`
+    hundreds of times), so a pair of event names can delimit many windows,
+    which may overlap. The events are kept sorted by timestamp with the
+    positions of every name, so the windows are matched by binary search over
+    the occurrences of the two names, and the events inside every window are
+    located for all windows at once the same way.
+
+    Parameters
+    ----------
+    events_df : pandas.DataFrame
+        DataFrame containing event timestamps and names.
+
+    Attributes
+    ----------
+    ts : numpy.ndarray
+        Event timestamps in nanoseconds, sorted (ties keep their file order).
+    names : numpy.ndarray
+        Event names, aligned with `ts`.
+    """
+    def __init__(self, events_df):
+        ts = events_df["timestamp [ns]"].to_numpy(dtype=np.int64)
+        names = events_df["name"].astype(str).to_numpy()
+        order = np.argsort(ts, kind="stable")
+        self.ts = ts[order]
+        self.names = names[order]
+        self._positions = pd.Series(np.arange(len(ts))).groupby(self.names).indices if len(ts) else {}
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def occurrences(self, name):
+        """
+        Return the timestamps of every occurrence of an event.
+
+        Parameters
+        ----------
+        name : str
+            Event name.
+
+        Returns
+        -------
+        numpy.ndarray
+            Sorted timestamps in nanoseconds (empty if the event does not exist).
+        """
+        return self.ts[self._positions.get(name, np.zeros(0, dtype=int))]
+
+    def windows(self, start_name, end_name, occurrences="first"):
+        """
+        Resolve the windows between a start and an end event.
+
+        With "first", the window goes from the first occurrence of the start
+        event to the first occurrence of the end event. With "all", every
+        occurrence of the end event closes the earliest start event still
+        open, so overlapping trials (start 1, start 2, end 1, end 2) give the
+        windows (start 1, end 1) and (start 2, end 2); ends without an open
+        start and starts never closed are ignored. An end at the same time as
+        a start does not close it. When both names are the same, the windows
+        lie between consecutive occurrences.
+
+        Parameters
+        ----------
+        start_name : str
+            Name of the start event.
+        end_name : str
+            Name of the end event.
+        occurrences : {"first", "all"}, optional
+            Which occurrences delimit the windows (default is "first").
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per window, by start timestamp, with the columns 'start'
+            and 'end' (timestamps in ns).
+
+        Raises
+        ------
+        ValueError
+            If the mode is unknown, one of the events does not exist, or no
+            start event is followed by an end event.
+        """
+        if occurrences not in OCCURRENCES:
+            raise ValueError(f"Unknown occurrences '{occurrences}', expected one of {OCCURRENCES}.")
+        if start_name not in self or end_name not in self:
+            raise ValueError("One of the start or end events does not exist.")
+        starts, ends = self.occurrences(start_name), self.occurrences(end_name)
+
+        if occurrences == "first":
+            starts, ends = starts[:1], ends[:1]
+            if starts[0] >= ends[0]:
+                raise ValueError("The start event is after the end event.")
+        elif start_name == end_name:
+            starts, ends = starts[:-1], starts[1:]
+        else:
+            # The j-th end finds `opened[j]` starts before it; the number of
+            # windows closed up to it is min(opened[j], closed[j - 1] + 1), a
+            # running minimum, and each new window takes the next start in order
+            opened = np.searchsorted(starts, ends, side="left")
+            rank = np.arange(len(ends))
+            closed = rank + np.minimum(1, np.minimum.accumulate(opened - rank))
+            closes = np.diff(closed, prepend=0) > 0
+            starts, ends = starts[:int(closes.sum())], ends[closes]
+            if not len(starts):
+                raise ValueError(f"No '{end_name}' event follows a '{start_name}' event.")
+        return pd.DataFrame({"start": starts, "end": ends})
+
+    def pairs(self, windows):
+        """
+        List the consecutive pairs of events inside every window, in one pass.
+
+        Parameters
+        ----------
+        windows : pandas.DataFrame
+            Windows returned by `windows`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The columns of `event_pairs` and 'window', the row of the window
+            of each pair. With several windows, the labels end with the
+            window number, e.g. "cue ➝ target #3", to tell them apart.
+        """
+        lo = np.searchsorted(self.ts, windows["start"].to_numpy(), side="left")
+        hi = np.searchsorted(self.ts, windows["end"].to_numpy(), side="right")
+        ids, positions = gather_positions(lo, np.maximum(lo, hi))
+        follows = ids[:-1] == ids[1:]
+        first, second = positions[:-1][follows], positions[1:][follows]
+
+        pairs = pd.DataFrame({
+            "start": self.ts[first],
+            "end": self.ts[second],
+            "start_name": self.names[first],
+            "end_name": self.names[second],
+        })
+        pairs["label"] = pairs["start_name"] + " ➝ " + pairs["end_name"]
+        pairs["window"] = ids[:-1][follows]
+        if len(windows) > 1:
+            pairs["label"] += " #" + (pairs["window"] + 1).astype(str)
+        return pairs
+
+def slice_bounds(ts, starts, ends):
+    """
+    Locate the rows of a sorted stream falling in each interval [start, end).
+
+    Parameters
+    ----------
+    ts : numpy.ndarray
+        Sorted timestamps of the stream.
+    starts : array-like
+        Interval start timestamps (inclusive).
+    ends : array-like
+        Interval end timestamps (exclusive).
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        `(lo, hi)` positions such that `ts[lo[i]:hi[i]]` is the i-th slice.
+        Intervals whose end precedes their start give empty slices.
+    """
+    lo = np.searchsorted(ts, np.asarray(starts), side="left")
+    hi = np.searchsorted(ts, np.asarray(ends), side="left")
+    return lo, np.maximum(lo, hi)
+
+def gather_positions(lo, hi):
+    """
+    Flatten a list of slices into group ids and row positions.
+
+    Parameters
+    ----------
+    lo : numpy.ndarray
+        Slice starts, as returned by `slice_bounds`.
+    hi : numpy.ndarray
+        Slice ends, as returned by `slice_bounds`.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        `(ids, positions)` where `positions` lists every row of every slice and
+        `ids` gives the slice each of these rows belongs to. Overlapping slices
+        are supported: a row then appears once per slice.
+    """
+    lengths = hi - lo
+    ids = np.repeat(np.arange(len(lo)), lengths)
+    offsets = np.repeat(np.cumsum(lengths) - lengths - lo, lengths)
+    positions = np.arange(int(lengths.sum())) - offsets
+    return ids, positions
+
+def interval_stats(ts, values, starts, ends, percentiles=()):
+    """
+    Compute descriptive statistics of a value for every interval.
+
+    The slices are located by binary search on the sorted timestamps, then all
+    intervals are reduced in a single grouped pass.
+
+    Parameters
+    ----------
+    ts : numpy.ndarray
+        Sorted timestamps of the stream.
+    values : numpy.ndarray
+        Values aligned with `ts`. NaN values are ignored.
+    starts : array-like
+        Interval start timestamps (inclusive).
+    ends : array-like
+        Interval end timestamps (exclusive).
+    percentiles : sequence of int, optional
+        Percentiles to add to the statistics, e.g. (25, 50, 75) (default is none).
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per interval with the columns 'count', 'mean', 'std', 'min',
+        'max' and one 'pXX' column per requested percentile.
+        Empty intervals have a count of 0 and NaN statistics.
+    """
+    lo, hi = slice_bounds(ts, starts, ends)
+    ids, positions = gather_positions(lo, hi)
+
+    grouped = pd.Series(np.asarray(values, dtype=float)[positions]).groupby(ids)
+    stats = grouped.agg(["count", "mean", "std", "min", "max"])
+    if len(percentiles):
+        levels = [p / 100 for p in percentiles]
+        quantiles = grouped.quantile(levels).unstack().reindex(columns=levels)
+        quantiles.columns = [f"p{p}" for p in percentiles]
+        stats = stats.join(quantiles)
+
+    stats = stats.reindex(range(len(lo)))
+    stats["count"] = stats["count"].fillna(0).astype(int)
+    return stats.reset_index(drop=True)
+
+def aggregate_intervals(streams, pairs, percentiles=(25, 50, 75)):
+    """
+    Compute every metric of every stream for every interval in one pass.
+
+    Each stream is scanned once; the mean/std and frequency plots then read
+    their values from the returned table.
+
+    Parameters
+    ----------
+    streams : dict
+        Mapping of stream label to a `(ts, values)` tuple of sorted timestamps
+        and aligned values (e.g. blink durations or pupil diameters).
+    pairs : pandas.DataFrame
+        Intervals to aggregate, as returned by `event_pairs`.
+    percentiles : sequence of int, optional
+        Percentiles to compute (default is (25, 50, 75)).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Tidy table with one row per stream and interval and the columns
+        'stream', 'interval', 'label', 'start', 'end', 'count', 'mean', 'std',
+        'min', 'max', 'frequency' (occurrences per second) and 'pXX', plus
+        'window' when the pairs come from `EventIndex.pairs`.
+    """
+    delta_s = (pairs["end"] - pairs["start"]).to_numpy() / NS_PER_S
+    tables = []
+
+    for stream, (ts, values) in streams.items():
+        stats = interval_stats(ts, values, pairs["start"], pairs["end"], percentiles)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stats.insert(5, "frequency", stats["count"].to_numpy() / delta_s)
+        table = pd.DataFrame({
+            "stream": stream,
+            "interval": np.arange(len(pairs)),
+            "label": pairs["label"].to_numpy(),
+            "start": pairs["start"].to_numpy(),
+            "end": pairs["end"].to_numpy(),
+        })
+        if "window" in pairs:
+            table.insert(2, "window", pairs["window"].to_numpy())
+        tables.append(pd.concat([table, stats], axis=1))
+
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
+
+def time_bins(start_ts, end_ts, bin_ns):
+    """
+    Split an interval into consecutive time bins of fixed width.
+
+    Parameters
+    ----------
+    start_ts : int
+        Start timestamp in nanoseconds.
+    end_ts : int
+        End timestamp in nanoseconds.
+    bin_ns : int
+        Width of each bin in nanoseconds. The last bin is truncated at `end_ts`.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        `(bin_starts, bin_ends)` timestamps of every bin.
+
+    Raises
+    ------
+    ValueError
+        If the bin width is not strictly positive.
+    """
+    if bin_ns <= 0:
+        raise ValueError("The time bin must be a positive number of seconds.")
+    bin_starts = np.arange(start_ts, end_ts, bin_ns, dtype=np.int64)
+    bin_ends = np.minimum(bin_starts + bin_ns, end_ts)
+    return bin_starts, bin_ends
+
+def window_bins(window_starts, window_ends, bin_ns):
+    """
+    Split every window into consecutive time bins of fixed width, in one pass.
+
+    Parameters
+    ----------
+    window_starts : array-like
+        Window start timestamps in nanoseconds.
+    window_ends : array-like
+        Window end timestamps in nanoseconds.
+    bin_ns : int
+        Width of each bin in nanoseconds. The last bin of a window is
+        truncated at its end.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        `(ids, numbers, bin_starts, bin_ends)`: the window of every bin, its
+        number within the window and its timestamps.
+
+    Raises
+    ------
+    ValueError
+        If the bin width is not strictly positive.
+    """
+    if bin_ns <= 0:
+        raise ValueError("The time bin must be a positive number of seconds.")
+    window_starts = np.asarray(window_starts, dtype=np.int64)
+    window_ends = np.asarray(window_ends, dtype=np.int64)
+    n_bins = np.maximum(-(-(window_ends - window_starts) // bin_ns), 0)
+    ids, numbers = gather_positions(np.zeros(len(n_bins), dtype=np.int64), n_bins)
+    bin_starts = window_starts[ids] + numbers * bin_ns
+    bin_ends = np.minimum(bin_starts + bin_ns, window_ends[ids])
+    return ids, numbers, bin_starts, bin_ends
+
+def binned_stats(ts, values, bin_starts, bin_ends):
+    """
+    Compute count and mean of a value for every time bin in one pass.
+
+    Each sample receives its bin index from a single vectorized search, then
+    counts and sums are accumulated with `numpy.bincount`.
+
+    Parameters
+    ----------
+    ts : numpy.ndarray
+        Timestamps of the stream (they do not need to be sorted).
+    values : numpy.ndarray
+        Values aligned with `ts`. NaN values are ignored.
+    bin_starts : numpy.ndarray
+        Contiguous bin start timestamps, as returned by `time_bins`.
+    bin_ends : numpy.ndarray
+        Bin end timestamps, as returned by `time_bins`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per bin with the columns 'count' and 'mean'.
+        Empty bins have a count of 0 and a NaN mean.
+    """
+    n_bins = len(bin_starts)
+    values = np.asarray(values, dtype=float)
+    if n_bins == 0:
+        return pd.DataFrame({"count": np.zeros(0, dtype=int), "mean": np.zeros(0)})
+
+    bin_index = np.searchsorted(bin_starts, ts, side="right") - 1
+    keep = (bin_index >= 0) & (ts < bin_ends[-1]) & ~np.isnan(values)
+
+    counts = np.bincount(bin_index[keep], minlength=n_bins)
+    sums = np.bincount(bin_index[keep], weights=values[keep], minlength=n_bins)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    return pd.DataFrame({"count": counts, "mean": means})
+
+class PrefixIndex:
+    """
+    Cumulative count, sum and sum-of-squares index over one stream.
+
+    The index is built once in O(n). Afterwards the count, mean and standard
+    deviation of any window are obtained from two binary searches and a few
+    subtractions, so a set of bins of any width is answered in
+    O(number of bins) without rescanning the data.
+
+    Parameters
+    ----------
+    ts : array-like
+        Timestamps of the stream in nanoseconds.
+    values : array-like
+        Values aligned with `ts`. NaN values are ignored.
+
+    Attributes
+    ----------
+    ts : numpy.ndarray
+        Sorted timestamps.
+    offset : float
+        Mean of the stream, subtracted from the values before accumulating
+        to keep the variance numerically stable.
+    cum_count : numpy.ndarray
+        Number of valid values before each position.
+    cum_sum : numpy.ndarray
+        Sum of the centred values before each position.
+    cum_sq : numpy.ndarray
+        Sum of the squared centred values before each position.
+    """
+    def __init__(self, ts, values):
+        ts = np.asarray(ts)
+        values = np.asarray(values, dtype=float)
+        if len(ts) > 1 and not np.all(ts[1:] >= ts[:-1]):
+            order = np.argsort(ts, kind="stable")
+            ts, values = ts[order], values[order]
+
+        valid = ~np.isnan(values)
+        self.ts = ts
+        self.offset = float(values[valid].mean()) if valid.any() else 0.0
+        centred = np.where(valid, values - self.offset, 0.0)
+
+        self.cum_count = np.concatenate([[0], np.cumsum(valid)])
+        self.cum_sum = np.concatenate([[0.0], np.cumsum(centred)])
+        self.cum_sq = np.concatenate([[0.0], np.cumsum(centred ** 2)])
+
+    def window_stats(self, starts, ends):
+        """
+        Compute count, mean and standard deviation for every window [start, end).
+
+        Parameters
+        ----------
+        starts : array-like
+            Window start timestamps (inclusive).
+        ends : array-like
+            Window end timestamps (exclusive).
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per window with the columns 'count', 'mean' and 'std'.
+            Empty windows have a count of 0 and NaN statistics.
+        """
+        return self._stats(*self._sums(starts, ends))
+
+    def _sums(self, starts, ends):
+        """Count, centred sum and sum of squares of every window."""
+        lo, hi = slice_bounds(self.ts, starts, ends)
+        return (self.cum_count[hi] - self.cum_count[lo], self.cum_sum[hi] - self.cum_sum[lo],
+                self.cum_sq[hi] - self.cum_sq[lo])
+
+    def _stats(self, count, total, squares):
+        """Count, mean and standard deviation from the sums of `_sums`."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, self.offset + total / count, np.nan)
+            var = np.where(count > 1, (squares - total * total / count) / (count - 1), np.nan)
+        return pd.DataFrame({"count": count, "mean": mean, "std": np.sqrt(np.maximum(var, 0.0))})
+
+    def binned(self, start_ts, end_ts, bin_ns):
+        """
+        Compute the window statistics of consecutive time bins.
+
+        Parameters
+        ----------
+        start_ts : int
+            Start timestamp in nanoseconds.
+        end_ts : int
+            End timestamp in nanoseconds.
+        bin_ns : int
+            Width of each bin in nanoseconds.
+
+        Returns
+        -------
+        tuple
+            `(bin_starts, bin_ends, stats)` where `stats` is the DataFrame
+            returned by `window_stats`.
+        """
+        bin_starts, bin_ends = time_bins(start_ts, end_ts, bin_ns)
+        return bin_starts, bin_ends, self.window_stats(bin_starts, bin_ends)
+
+    def binned_windows(self, window_starts, window_ends, bin_ns):
+        """
+        Compute the statistics of time bins pooled across several windows.
+
+        Every window is split into bins from its own start; the n-th bins of
+        all windows are pooled, as if the windows were laid on top of each
+        other. All the bins of all the windows are answered in one pass.
+
+        Parameters
+        ----------
+        window_starts : array-like
+            Window start timestamps in nanoseconds.
+        window_ends : array-like
+            Window end timestamps in nanoseconds.
+        bin_ns : int
+            Width of each bin in nanoseconds.
+
+        Returns
+        -------
+        tuple
+            `(bin_starts, bin_ends, stats)`: the bins in nanoseconds from the
+            window starts, up to the end of the longest window, and a
+            DataFrame with one row per bin and the columns 'count', 'mean' and
+            'std' of the pooled values and 'windows', the number of windows
+            reaching the bin.
+        """
+        ids, numbers, bin_starts, bin_ends = window_bins(window_starts, window_ends, bin_ns)
+        n_bins = int(numbers.max()) + 1 if len(numbers) else 0
+        count, total, squares = (np.bincount(numbers, weights=sums, minlength=n_bins)
+                                 for sums in self._sums(bin_starts, bin_ends))
+        stats = self._stats(count.astype(int), total, squares)
+        stats["windows"] = np.bincount(numbers, minlength=n_bins)
+
+        lengths = np.asarray(window_ends, dtype=np.int64) - np.asarray(window_starts, dtype=np.int64)
+        offsets = np.arange(n_bins, dtype=np.int64) * bin_ns
+        return offsets, np.minimum(offsets + bin_ns, lengths.max() if len(lengths) else 0), stats
+
+def aggregate_bins(indexes, start_ts, end_ts, widths, windows=None):
+    """
+    Compute the statistics of every stream for every time bin of every width.
+
+    Parameters
+    ----------
+    indexes : dict
+        Mapping of stream label to its `PrefixIndex`.
+    start_ts : int
+        Start timestamp in nanoseconds.
+    end_ts : int
+        End timestamp in nanoseconds.
+    widths : sequence of int or float
+        Bin widths in seconds.
+    windows : pandas.DataFrame, optional
+        Windows returned by `EventIndex.windows`. When given, each window is
+        binned from its own start instead of the interval [start_ts, end_ts)
+        (default is None).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Tidy table with one row per stream, width and bin and the columns
+        'stream', 'width_s', 'bin', 'start', 'end' (timestamps in ns),
+        'start_s', 'end_s' (seconds from `start_ts`, or from the window start),
+        'count', 'mean', 'std' and 'frequency' (occurrences per second), plus
+        'window' when windows are given.
+    """
+    if windows is None:
+        windows = pd.DataFrame({"start": [start_ts], "end": [end_ts]})
+        window_column = False
+    else:
+        window_column = True
+    window_starts = windows["start"].to_numpy(dtype=np.int64)
+
+    tables = []
+    for width in widths:
+        ids, numbers, bin_starts, bin_ends = window_bins(window_starts, windows["end"].to_numpy(),
+                                                         int(round(float(width) * NS_PER_S)))
+        delta_s = (bin_ends - bin_starts) / NS_PER_S
+        for stream, index in indexes.items():
+            stats = index.window_stats(bin_starts, bin_ends)
+            table = pd.DataFrame({
+                "stream": stream,
+                "width_s": width,
+                "bin": numbers,
+                "start": bin_starts,
+                "end": bin_ends,
+                "start_s": (bin_starts - window_starts[ids]) / NS_PER_S,
+                "end_s": (bin_ends - window_starts[ids]) / NS_PER_S,
+            })
+            if window_column:
+                table.insert(2, "window", ids)
+            stats["frequency"] = stats["count"].to_numpy() / delta_s
+            tables.append(pd.concat([table, stats], axis=1))
+
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
@@ -0,0 +1,739 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from config import RECORDING_FILES
+
+CACHE_DIRNAME = ".neopupil_cache"
+CACHE_VERSION = 2
+CHUNK_ROWS = 500_000
+HASH_BLOCK = 1 << 20
+# Name of the file pointing to the current build of a cache, and age after
+# which an unfinished build is a left-over of a crashed process
+CURRENT_BUILD = "current.json"
+STALE_BUILD_S = 24 * 3600
+
+class _CacheAbort(Exception):
+    """Raised when a CSV cannot be stored in the columnar cache."""
+
+def recording_files(folder):
+    """
+    Locate the export files of a recording folder.
+
+    Parameters
+    ----------
+    folder : str
+        Folder of a Pupil Cloud Time Series export.
+
+    Returns
+    -------
+    dict
+        Mapping of stream name to the path of its CSV file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If one of the files listed in `RECORDING_FILES` is missing.
+    """
+    paths = {stream: os.path.join(folder, name) for stream, name in RECORDING_FILES.items()}
+    missing = [RECORDING_FILES[stream] for stream, path in paths.items() if not os.path.isfile(path)]
+    if missing:
+        raise FileNotFoundError(f"Missing file(s) in {folder}: {', '.join(missing)}")
+    return paths
+
+def content_hash(path):
+    """
+    Hash the full content of a file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    str
+        BLAKE2b hex digest of the file content.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_fingerprint(path):
+    """
+    Describe the current state of a file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    dict
+        Size in bytes ('size'), modification time in nanoseconds ('mtime_ns')
+        and content hash ('hash').
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash(path)}
+
+def fingerprint_matches(fingerprint, path):
+    """
+    Tell whether a file is unchanged since its fingerprint was taken.
+
+    The file is unchanged when the size matches and either the modification
+    time or the content hash matches (a touched but unchanged file is kept).
+
+    Parameters
+    ----------
+    fingerprint : dict
+        Fingerprint returned by `file_fingerprint`.
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    bool
+        True if the file still matches the fingerprint.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if fingerprint.get("size") != stat.st_size:
+        return False
+    return fingerprint.get("mtime_ns") == stat.st_mtime_ns or fingerprint.get("hash") == content_hash(path)
+
+def reuse_fingerprint(path, previous=None):
+    """
+    Fingerprint a file, reusing a fingerprint already taken when possible.
+
+    Hashing a large export is slow, so a fingerprint whose size and
+    modification time still match the file is returned as is. The
+    candidates are `previous` and the source fingerprint stored in the
+    columnar cache of the file; the file is hashed only when none matches.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    previous : dict, optional
+        Fingerprint taken earlier, e.g. by a previous batch (default is None).
+
+    Returns
+    -------
+    dict
+        Fingerprint of the file, see `file_fingerprint`.
+    """
+    stat = os.stat(path)
+    for candidate in (previous, (_read_meta(path) or {}).get("source")):
+        if (candidate and "hash" in candidate and candidate.get("size") == stat.st_size
+                and candidate.get("mtime_ns") == stat.st_mtime_ns):
+            return dict(candidate)
+    return file_fingerprint(path)
+
+def cache_dir(path):
+    """
+    Folder holding the columnar cache of a CSV export.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+
+    Returns
+    -------
+    str
+        `.neopupil_cache/<file name>` next to the CSV file. It holds the
+        builds of the cache, each in its own folder, and `CURRENT_BUILD`.
+    """
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIRNAME, name)
+
+def _read_meta(path):
+    """
+    Return the cache metadata of a CSV file if its cache is still valid,
+    i.e. if the file still matches the fingerprint stored in the cache.
+    """
+    folder = cache_dir(path)
+    try:
+        with open(os.path.join(folder, CURRENT_BUILD), encoding="utf-8") as f:
+            build = json.load(f)["build"]
+        meta_path = os.path.join(folder, build, "meta.json")
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    source = meta.get("source", {})
+    if meta.get("version") != CACHE_VERSION or not fingerprint_matches(source, path):
+        return None
+    stat = os.stat(path)
+    if source.get("mtime_ns") != stat.st_mtime_ns:
+        source["mtime_ns"] = stat.st_mtime_ns
+        try:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        except OSError:
+            pass
+    return meta
+
+def _encode_chunk(chunk, columns):
+    """
+    Convert one parsed chunk into typed arrays following the column layout
+    fixed by the first chunk. String columns are stored as int32 codes into a
+    growing list of categories.
+    """
+    arrays = []
+    for name, spec in zip(chunk.columns, columns):
+        values = chunk[name]
+        if spec["kind"] == "category":
+            if values.dtype.kind == "f" and values.isna().all():
+                arrays.append(np.full(len(values), -1, dtype=np.int32))
+                continue
+            if values.dtype.kind not in "OSUT":
+                raise _CacheAbort(f"column '{name}' mixes text and numbers")
+            known = spec["categories"]
+            new = pd.Index(values.dropna().unique()).difference(known, sort=False)
+            known.extend(new.tolist())
+            arrays.append(pd.Categorical(values, categories=known).codes.astype(np.int32))
+        else:
+            dtype = np.dtype(spec["dtype"])
+            if values.dtype.kind not in "biuf" or (dtype.kind in "biu" and values.dtype.kind == "f"):
+                raise _CacheAbort(f"column '{name}' changes type along the file")
+            arrays.append(values.to_numpy().astype(dtype, copy=False))
+    return arrays
+
+def _column_specs(chunk):
+    """Fix the storage layout of every column from the first parsed chunk."""
+    specs = []
+    for name in chunk.columns:
+        dtype = chunk[name].dtype
+        if dtype.kind in "biuf":
+            specs.append({"name": name, "kind": "numeric", "dtype": dtype.str})
+        else:
+            specs.append({"name": name, "kind": "category", "dtype": np.dtype(np.int32).str, "categories": []})
+    return specs
+
+def build_cache(path, chunk_rows=CHUNK_ROWS):
+    """
+    Convert a CSV export into the columnar cache, chunk by chunk.
+
+    Every column is written to its own raw binary file with a fixed dtype, so
+    that later loads can memory-map it. Each build is written to a temporary
+    folder, renamed to a folder of its own once complete, then made current
+    by atomically replacing `CURRENT_BUILD`: a crash at any point leaves the
+    previous cache usable. The files of the previous build are never
+    overwritten, so arrays still memory-mapped from it stay valid; the build
+    is removed once it can be (on Windows, not while it is mapped).
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+    chunk_rows : int, optional
+        Number of rows parsed at a time (default is `CHUNK_ROWS`).
+
+    Returns
+    -------
+    dict
+        Metadata of the new cache.
+
+    Raises
+    ------
+    OSError
+        If the cache folder cannot be written.
+    _CacheAbort
+        If a column changes type along the file and cannot be stored.
+    """
+    target = cache_dir(path)
+    token = f"{os.getpid()}-{threading.get_ident()}"
+    tmp = os.path.join(target, f"tmp-{token}")
+    build = f"build-{time.time_ns()}-{token}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    try:
+        fingerprint = file_fingerprint(path)
+        columns, files, rows = None, [], 0
+        try:
+            for chunk in pd.read_csv(path, chunksize=chunk_rows):
+                if columns is None:
+                    columns = _column_specs(chunk)
+                    files = [open(os.path.join(tmp, f"col{i}.bin"), "wb") for i in range(len(columns))]
+                for f, array in zip(files, _encode_chunk(chunk, columns)):
+                    array.tofile(f)
+                rows += len(chunk)
+        finally:
+            for f in files:
+                f.close()
+
+        meta = {"version": CACHE_VERSION, "source": fingerprint, "rows": rows, "columns": columns or [],
+                "build": build}
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        os.rename(tmp, os.path.join(target, build))
+        try:
+            _write_json(os.path.join(target, CURRENT_BUILD), {"build": build})
+        except BaseException:
+            shutil.rmtree(os.path.join(target, build), ignore_errors=True)
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    _remove_old_builds(target)
+    return meta
+
+def _write_json(path, data):
+    """Write a small JSON file atomically."""
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _remove_old_builds(folder):
+    """
+    Remove the builds of a cache other than the current one, and the
+    unfinished builds left by crashed processes. Builds still in use (mapped
+    on Windows) are left for a later rebuild.
+    """
+    try:
+        with open(os.path.join(folder, CURRENT_BUILD), encoding="utf-8") as f:
+            current = json.load(f)["build"]
+        names = os.listdir(folder)
+    except (OSError, ValueError, KeyError, TypeError):
+        return
+    now = time.time()
+    for name in names:
+        entry = os.path.join(folder, name)
+        if name in (current, CURRENT_BUILD) or name.endswith(".tmp"):
+            continue
+        try:
+            if name.startswith("tmp-") and now - os.path.getmtime(entry) < STALE_BUILD_S:
+                continue
+            if os.path.isdir(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                os.remove(entry)
+        except OSError:
+            pass
+
+def _load_column(folder, i, spec, rows):
+    """Memory-map one cached column."""
+    dtype = np.dtype(spec["dtype"])
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(os.path.join(folder, f"col{i}.bin"), dtype=dtype, mode="r", shape=(rows,))
+
+def load_cache(path, meta):
+    """
+    Load a CSV export from its columnar cache.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+    meta : dict
+        Cache metadata, as returned by `build_cache`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The export, with text columns as categoricals.
+    """
+    folder = os.path.join(cache_dir(path), meta["build"])
+    data = {}
+    for i, spec in enumerate(meta["columns"]):
+        array = _load_column(folder, i, spec, meta["rows"])
+        if spec["kind"] == "category":
+            data[spec["name"]] = pd.Categorical.from_codes(np.asarray(array), categories=spec["categories"])
+        else:
+            data[spec["name"]] = np.asarray(array)
+    return pd.DataFrame(data)
+
+def ensure_cache(path):
+    """
+    Build the columnar cache of a CSV file if it is missing or stale.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+
+    Returns
+    -------
+    dict or None
+        Metadata of the valid cache, or None if the cache could not be written
+        (e.g. read-only folder), in which case the CSV has to be parsed directly.
+    """
+    meta = _read_meta(path)
+    if meta is None:
+        try:
+            meta = build_cache(path)
+        except (OSError, _CacheAbort) as e:
+            print(f"⚠️ Could not cache {os.path.basename(path)}: {e}")
+    return meta
+
+def read_csv_cached(path, use_cache=True):
+    """
+    Read a Pupil Cloud CSV export through a transparent columnar cache.
+
+    On first load the CSV is converted to typed binary columns stored in
+    `.neopupil_cache` next to the data. Later loads memory-map these columns
+    instead of parsing the CSV again. The cache is rebuilt automatically when
+    the size, modification time or content of the CSV changes.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+    use_cache : bool, optional
+        Set to False to parse the CSV directly (default is True).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Content of the CSV file. Text columns are returned as categoricals
+        when the cache is used.
+    """
+    if not use_cache:
+        return pd.read_csv(path)
+
+    meta = ensure_cache(path)
+    if meta is None:
+        return pd.read_csv(path)
+    return load_cache(path, meta)
+
+def _cache_window_rows(path, meta, columns, ts_col, start_ts, end_ts):
+    """
+    Locate the rows of a window in the memory-mapped cache. Returns the
+    build folder, the column specs by name and the rows (a slice when the
+    timestamps are sorted, a boolean mask otherwise).
+    """
+    folder = os.path.join(cache_dir(path), meta["build"])
+    specs = {spec["name"]: (i, spec) for i, spec in enumerate(meta["columns"])}
+    missing = [name for name in columns if name not in specs]
+    if missing:
+        raise ValueError(f"Missing column(s) {missing} in {os.path.basename(path)}.")
+
+    ts = _load_column(folder, *specs[ts_col], meta["rows"])
+    if len(ts) > 1 and np.all(ts[1:] >= ts[:-1]):
+        lo = 0 if start_ts is None else np.searchsorted(ts, start_ts, side="left")
+        hi = len(ts) if end_ts is None else np.searchsorted(ts, end_ts, side="right")
+        rows = slice(lo, hi)
+    else:
+        rows = np.ones(len(ts), dtype=bool)
+        if start_ts is not None:
+            rows &= ts >= start_ts
+        if end_ts is not None:
+            rows &= ts <= end_ts
+    return folder, specs, rows
+
+def _cache_frame(folder, specs, n_rows, columns, rows):
+    """Copy some rows of the cached columns into a DataFrame with the requested dtypes."""
+    data = {}
+    for name, dtype in columns.items():
+        array = _load_column(folder, *specs[name], n_rows)[rows]
+        if specs[name][1]["kind"] == "category":
+            data[name] = pd.Categorical.from_codes(array, categories=specs[name][1]["categories"])
+        else:
+            data[name] = array.astype(dtype)
+    return pd.DataFrame(data)
+
+def _window_from_cache(path, meta, columns, ts_col, start_ts, end_ts):
+    """
+    Copy the rows of a window out of the memory-mapped cache.
+
+    Only the timestamp column is scanned over the whole recording; the other
+    columns are read for the selected rows only.
+    """
+    folder, specs, rows = _cache_window_rows(path, meta, columns, ts_col, start_ts, end_ts)
+    return _cache_frame(folder, specs, meta["rows"], columns, rows)
+
+def iter_stream_window(path, columns, ts_col, start_ts=None, end_ts=None, use_cache=True, chunk_rows=CHUNK_ROWS):
+    """
+    Read the rows of a time window of a large export one chunk at a time.
+
+    Unlike `read_stream_window`, the window is never held in memory as a
+    whole: each chunk is copied out of the memory-mapped cache, or parsed
+    from the CSV, only when the previous one has been consumed.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file (e.g. gaze.csv or 3d_eye_states.csv).
+    columns : dict
+        Mapping of the columns to keep to their dtype, e.g. `STREAM_COLUMNS["gaze"]`.
+    ts_col : str
+        Name of the timestamp column used to select the window.
+    start_ts : int, optional
+        Start of the window in nanoseconds, inclusive (default is no limit).
+    end_ts : int, optional
+        End of the window in nanoseconds, inclusive (default is no limit).
+    use_cache : bool, optional
+        Read the window from the columnar cache, building it first if needed
+        (default is True). Otherwise the CSV is streamed directly.
+    chunk_rows : int, optional
+        Largest number of rows of a chunk (default is `CHUNK_ROWS`).
+
+    Yields
+    ------
+    pandas.DataFrame
+        Non-empty chunks of the window, in file order, with the selected
+        columns and their requested dtypes.
+    """
+    meta = ensure_cache(path) if use_cache else None
+    if meta is not None:
+        folder, specs, rows = _cache_window_rows(path, meta, columns, ts_col, start_ts, end_ts)
+        if isinstance(rows, slice):
+            blocks = (slice(start, min(start + chunk_rows, rows.stop))
+                      for start in range(rows.start, rows.stop, chunk_rows))
+        else:
+            blocks = (np.flatnonzero(rows[start:start + chunk_rows]) + start
+                      for start in range(0, len(rows), chunk_rows))
+        for block in blocks:
+            chunk = _cache_frame(folder, specs, meta["rows"], columns, block)
+            if len(chunk):
+                yield chunk
+        return
+
+    for chunk in pd.read_csv(path, usecols=list(columns), dtype=columns, chunksize=chunk_rows):
+        if start_ts is not None:
+            chunk = chunk[chunk[ts_col] >= start_ts]
+        if end_ts is not None:
+            chunk = chunk[chunk[ts_col] <= end_ts]
+        if len(chunk):
+            yield chunk[list(columns)].reset_index(drop=True)
+
+def read_stream_window(path, columns, ts_col, start_ts=None, end_ts=None, use_cache=True,
+                       chunk_rows=CHUNK_ROWS):
+    """
+    Read only the needed columns and the rows of a time window of a large export.
+
+    Rows outside `[start_ts, end_ts]` are dropped chunk by chunk before being
+    kept, so the peak memory scales with the analysed window rather than with
+    the length of the recording.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file (e.g. gaze.csv or 3d_eye_states.csv).
+    columns : dict
+        Mapping of the columns to keep to their dtype, e.g. `STREAM_COLUMNS["gaze"]`.
+    ts_col : str
+        Name of the timestamp column used to select the window.
+    start_ts : int, optional
+        Start of the window in nanoseconds, inclusive (default is no limit).
+    end_ts : int, optional
+        End of the window in nanoseconds, inclusive (default is no limit).
+    use_cache : bool, optional
+        Read the window from the columnar cache, building it first if needed
+        (default is True). Otherwise the CSV is streamed directly.
+    chunk_rows : int, optional
+        Number of rows parsed at a time (default is `CHUNK_ROWS`).
+
+    Returns
+    -------
+    pandas.DataFrame
+        The selected columns and rows, with the requested dtypes.
+    """
+    if use_cache:
+        meta = ensure_cache(path)
+        if meta is not None:
+            return _window_from_cache(path, meta, columns, ts_col, start_ts, end_ts)
+
+    kept = []
+    for chunk in pd.read_csv(path, usecols=list(columns), dtype=columns, chunksize=chunk_rows):
+        if start_ts is not None:
+            chunk = chunk[chunk[ts_col] >= start_ts]
+        if end_ts is not None:
+            chunk = chunk[chunk[ts_col] <= end_ts]
+        kept.append(chunk[list(columns)])
+
+    if not kept:
+        return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in columns.items()})
+    return pd.concat(kept, ignore_index=True)
+
+TABLE_FORMATS = ("csv", "parquet")
+
+def write_table(df, path, fmt="csv"):
+    """
+    Save a statistics table for use in other tools (R, mixed models...).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Table to save.
+    path : str
+        Path of the file, without extension.
+    fmt : {"csv", "parquet"}, optional
+        File format (default is "csv"). Parquet needs pyarrow or fastparquet.
+
+    Returns
+    -------
+    str
+        Path of the written file.
+
+    Raises
+    ------
+    ValueError
+        If the format is unknown.
+    ImportError
+        If Parquet is requested and no Parquet engine is installed.
+    """
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Unknown table format '{fmt}', expected one of {TABLE_FORMATS}.")
+    path = f"{path}.{fmt}"
+    if fmt == "parquet":
+        try:
+            df.to_parquet(path, index=False)
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow or fastparquet (pip install pyarrow), or use CSV.")
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+def _timed(task):
+    """Run a loading task and measure its wall-clock duration."""
+    start = time.perf_counter()
+    result = task()
+    return result, time.perf_counter() - start
+
+def load_parallel(tasks, max_workers=None):
+    """
+    Run loading tasks concurrently and report the time taken by each of them.
+
+    The tasks run in a thread pool: reading the files from disk and the C
+    tokenizer of `pandas.read_csv` can overlap between threads, so the
+    exports are not read strictly one after another. Building the columns
+    and the dtype conversions still hold the GIL, so the loading is not
+    expected to scale with the number of CPU cores.
+
+    Parameters
+    ----------
+    tasks : dict
+        Mapping of a name (usually the file name) to a callable without
+        arguments returning the loaded data.
+    max_workers : int, optional
+        Number of threads (default is one per task).
+
+    Returns
+    -------
+    tuple of dict
+        `(results, timings)`: the value returned by each task and its duration
+        in seconds, both keyed by task name.
+
+    Raises
+    ------
+    Exception
+        The first error raised by a task, once all tasks have finished.
+    """
+    results, timings = {}, {}
+    if not tasks:
+        return results, timings
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(tasks)) as pool:
+        futures = {name: pool.submit(_timed, task) for name, task in tasks.items()}
+        for name, future in futures.items():
+            results[name], timings[name] = future.result()
+
+    for name in tasks:
+        print(f"⏱ {name} loaded in {timings[name]:.2f}s")
+    return results, timings
+
+def compact_stream(df, columns):
+    """
+    Keep only the needed columns of a stream and store them with compact dtypes.
+
+    Timestamps stay int64, coordinates, diameters and durations become float32
+    and event names become categoricals.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Loaded stream.
+    columns : dict
+        Mapping of the columns to keep to their dtype, e.g. `STREAM_COLUMNS["blinks"]`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Compact copy of the stream.
+
+    Raises
+    ------
+    ValueError
+        If one of the needed columns is missing.
+    """
+    missing = [name for name in columns if name not in df.columns]
+    if missing:
+        raise ValueError(f"Missing column(s) {missing}.")
+    return df[list(columns)].astype(columns)
+
+def memory_footprint(df):
+    """
+    Memory used by a DataFrame, including the content of text columns.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame to measure.
+
+    Returns
+    -------
+    int
+        Size in bytes.
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+def format_bytes(size):
+    """
+    Format a size in bytes with a readable unit.
+
+    Parameters
+    ----------
+    size : int
+        Size in bytes.
+
+    Returns
+    -------
+    str
+        Size such as "512 B", "3.4 KB" or "1.2 GB".
+    """
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def memory_report(footprints):
+    """
+    Print the memory footprint of each stream before and after compaction.
+
+    Parameters
+    ----------
+    footprints : dict
+        Mapping of stream name to a `(before, after)` tuple of sizes in bytes.
+        `before` may be None for streams that were loaded compact directly.
+
+    Returns
+    -------
+    None
+    """
+    for name, (before, after) in footprints.items():
+        if before is None:
+            print(f"🧠 {name}: {format_bytes(after)}")
+        else:
+            print(f"🧠 {name}: {format_bytes(before)} ➝ {format_bytes(after)}")
@@ -1,9 +1,22 @@
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
-from tkinter import messagebox
-
-def format_time(sec):
+import numpy as np
+from functools import partial
+from loaders import (read_stream_window, iter_stream_window, ensure_cache, load_parallel, memory_footprint,
+                     memory_report)
+from intervals import (event_pairs, aggregate_intervals, slice_bounds, sort_by_timestamp, time_bins,
+                       binned_stats, PrefixIndex, EventIndex, NS_PER_S, mean_pupil_diameter, duration_stream,
+                       pupil_stream)
+from rendering import (RenderScheduler, render, decimate_path, render_bar_plot, render_line_plot, render_blink_timeline,
+                       render_duration_histogram, render_gaze_path, render_gaze_overview, render_heatmap,
+                       render_epoch_plot)
+from heatmap import HeatmapAccumulator
+from epochs import pupil_epochs, epoch_summary, EPOCH_RATE_HZ
+from memo import MemoCache, source_key
+from instrumentation import RunReport
+from config import SWEEP_ALL, STREAM_COLUMNS, GAZE_MODES, load_time_widths
+from session import SMALL_STREAMS, GenerationCancelled, load_stream
+
+def format_time(sec, decimals=0):
     """
     Format seconds into a string representing minutes and seconds.
 
@@ -11,19 +24,88 @@ def format_time(sec):
     ----------
     sec : float or int
         Time duration in seconds.
+    decimals : int, optional
+        Decimals of the seconds kept, truncated; trailing zeros are dropped
+        (default is 0, whole seconds).
 
     Returns
     -------
     str
-        Formatted time string in "XmYs" or "Xs" format.
+        Formatted time string in "XmYs" or "Xs" format, e.g. "1m2.5s".
     """
+    scale = 10 ** decimals
+    sec = np.floor(sec * scale + 1e-6) / scale
     if sec < 60:
-        return f"{int(sec)}s"
+        return f"{_format_seconds(sec, decimals)}s"
     else:
-        m, s = int(sec // 60), int(sec % 60)
-        return f"{m}m{s}s" if s else f"{m}m"
+        m, s = int(sec // 60), sec % 60
+        s = np.floor(s * scale + 1e-6) / scale
+        return f"{m}m{_format_seconds(s, decimals)}s" if s else f"{m}m"
+
+def _format_seconds(sec, decimals):
+    """Seconds with at most `decimals` decimals and no trailing zero."""
+    text = f"{sec:.{decimals}f}"
+    return text.rstrip("0").rstrip(".") if decimals else text
+
+def format_bin_labels(bin_starts, bin_ends, start_ts):
+    """
+    Build the "start–end" labels of time bins, relative to the interval start.
+
+    Parameters
+    ----------
+    bin_starts : numpy.ndarray
+        Bin start timestamps in nanoseconds.
+    bin_ends : numpy.ndarray
+        Bin end timestamps in nanoseconds.
+    start_ts : int
+        Start timestamp of the analysed interval in nanoseconds.
 
-def generate_mean_std_plot_between_events(df, events_df, start_ts, end_ts, label, output_folder, colour):
+    Returns
+    -------
+    list of str
+        One label per bin, e.g. "10s–15s", "1m–1m5s" or "2.5s–5s".
+    """
+    start_sec = (bin_starts - start_ts) / NS_PER_S
+    end_sec = (bin_ends - start_ts) / NS_PER_S
+    # As many decimals as the bin starts need (e.g. 1 for 2.5 s bins), at most milliseconds
+    decimals = next((d for d in range(3) if np.allclose(start_sec * 10 ** d, np.round(start_sec * 10 ** d))), 3)
+    return [f"{format_time(a, decimals)}–{format_time(b, decimals)}" for a, b in zip(start_sec, end_sec)]
+
+def blink_plots(blinks_df, events_df, output_folder, colour, scheduler=None):
+    """
+    Generate the blink duration over time plot and the histogram of blink durations.
+
+    Parameters
+    ----------
+    blinks_df : pandas.DataFrame
+        DataFrame containing blink durations and timestamps.
+    events_df : pandas.DataFrame
+        DataFrame containing event timestamps and names, used as x ticks.
+    output_folder : str
+        Folder path to save the plot images.
+    colour : str
+        Color used for plotting.
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure jobs. When None the figures are
+        rendered immediately (default is None).
+
+    Returns
+    -------
+    None
+    """
+    unique_event_labels = events_df.drop_duplicates(subset=["timestamp [ns]"])
+
+    name = "blinks_duration_per_event.png"
+    render(scheduler, name, render_blink_timeline, os.path.join(output_folder, name),
+           blinks_df["start timestamp [ns]"].to_numpy(), blinks_df["duration [ms]"].to_numpy(),
+           unique_event_labels["timestamp [ns]"].to_numpy(), unique_event_labels["name"].astype(str).tolist(), colour)
+
+    name = "blink_duration_histogram.png"
+    render(scheduler, name, render_duration_histogram, os.path.join(output_folder, name),
+           blinks_df["duration [ms]"].to_numpy(), colour)
+
+def generate_mean_std_plot_between_events(df, events_df, start_ts, end_ts, label, output_folder, colour, stats=None,
+                                          scheduler=None):
     """
     Generate bar plot of mean and standard deviation of event durations between pairs of events.
 
@@ -43,41 +125,31 @@ def generate_mean_std_plot_between_events(df, events_df, start_ts, end_ts, label
         Folder path to save the plot image.
     colour : str
         Color used for plotting bars.
+    stats : pandas.DataFrame, optional
+        Rows of `intervals.aggregate_intervals` for this stream. When given,
+        `df` is not scanned again (default is None).
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure jobs. When None the figures are
+        rendered immediately (default is None).
 
     Returns
     -------
     None
     """
-    interval_events = events_df[(events_df["timestamp [ns]"] >= start_ts) &
-                                (events_df["timestamp [ns]"] <= end_ts)].reset_index(drop=True)
-    results = []
-
-    for i in range(len(interval_events) - 1):
-        e1, e2 = interval_events.iloc[i], interval_events.iloc[i + 1]
-        mask = (df["start timestamp [ns]"] >= e1["timestamp [ns]"]) & (df["start timestamp [ns]"] < e2["timestamp [ns]"])
-        subset = df[mask]
-
-        results.append({
-            "label": f"{e1['name']} ➝ {e2['name']}",
-            "mean": subset["duration [ms]"].mean(),
-            "std": subset["duration [ms]"].std(),
-        })
-
-    if results:
-        plot_df = pd.DataFrame(results)
-        plt.figure(figsize=(12, 6))
-        plt.bar(plot_df["label"], plot_df["mean"], yerr=plot_df["std"], capsize=5, color=colour, alpha=0.8)
-        plt.xticks(rotation=90)
-        plt.ylabel(f"Mean duration of {label} (ms)")
-        plt.title(f"{label.capitalize()} between events")
-        plt.tight_layout()
-        path = os.path.join(output_folder, f"{label}_means_per_event.png")
-        plt.savefig(path)
-        plt.close()
+    if stats is None:
+        stats = aggregate_intervals({label: duration_stream(df)}, event_pairs(events_df, start_ts, end_ts))
+
+    if not stats.empty:
+        name = f"{label}_means_per_event.png"
+        render(scheduler, name, render_bar_plot, os.path.join(output_folder, name),
+               stats["label"].tolist(), stats["mean"].to_numpy(), colour,
+               f"Mean duration of {label} (ms)", f"{label.capitalize()} between events",
+               figsize=(12, 6), yerr=stats["std"].to_numpy())
     else:
         print(f"⚠️ No {label} detected between events.")
 
-def generate_frequency_plot_between_events(df, events_df, start_ts, end_ts, label, output_folder, colour):
+def generate_frequency_plot_between_events(df, events_df, start_ts, end_ts, label, output_folder, colour, stats=None,
+                                           scheduler=None):
     """
     Generate a line plot showing frequency (occurrences per second) of events between pairs of events.
 
@@ -97,43 +169,30 @@ def generate_frequency_plot_between_events(df, events_df, start_ts, end_ts, labe
         Folder path to save the plot image.
     colour : str
         Color used for plotting lines.
+    stats : pandas.DataFrame, optional
+        Rows of `intervals.aggregate_intervals` for this stream. When given,
+        `df` is not scanned again (default is None).
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure jobs. When None the figures are
+        rendered immediately (default is None).
 
     Returns
     -------
     None
     """
-    interval_events = events_df[(events_df["timestamp [ns]"] >= start_ts) &
-                                (events_df["timestamp [ns]"] <= end_ts)].reset_index(drop=True)
-    results = []
-
-    for i in range(len(interval_events) - 1):
-        e1, e2 = interval_events.iloc[i], interval_events.iloc[i + 1]
-        mask = (df["start timestamp [ns]"] >= e1["timestamp [ns]"]) & (df["start timestamp [ns]"] < e2["timestamp [ns]"])
-        subset = df[mask]
-
-        delta_s = (e2["timestamp [ns]"] - e1["timestamp [ns]"]) / 1_000_000_000
-        freq = subset["duration [ms]"].count() / delta_s
-
-        results.append({
-            "label": f"{e1['name']} ➝ {e2['name']}",
-            "freq": freq
-        })
-
-    if results:
-        plot_df = pd.DataFrame(results)
-        plt.figure(figsize=(12, 6))
-        plt.plot(plot_df["label"], plot_df["freq"], color=colour)
-        plt.xticks(rotation=90)
-        plt.ylabel(f"Frequency of {label} (occurrences/second)")
-        plt.title(f"{label.capitalize()} between events")
-        plt.tight_layout()
-        path= os.path.join(output_folder, f"{label}_frequency_per_event.png")
-        plt.savefig(path)
-        plt.close()
+    if stats is None:
+        stats = aggregate_intervals({label: duration_stream(df)}, event_pairs(events_df, start_ts, end_ts))
+
+    if not stats.empty:
+        name = f"{label}_frequency_per_event.png"
+        render(scheduler, name, render_line_plot, os.path.join(output_folder, name),
+               stats["label"].tolist(), stats["frequency"].to_numpy(), colour,
+               f"Frequency of {label} (occurrences/second)", f"{label.capitalize()} between events")
     else:
         print(f"⚠️ No {label} detected between events.")
 
-def generate_time_binned_plots(df, label, start_ts, end_ts, output_folder, colour, time):
+def generate_time_binned_plots(df, label, start_ts, end_ts, output_folder, colour, time, index=None, scheduler=None,
+                               windows=None):
     """
     Generate bar plots of mean duration and count of events over time bins within a specified interval.
 
@@ -153,55 +212,57 @@ def generate_time_binned_plots(df, label, start_ts, end_ts, output_folder, colou
         Color used for plotting bars.
     time : int or str
         Duration of each time bin in seconds.
+    index : intervals.PrefixIndex, optional
+        Prefix-sum index over the event durations. When given, the bins are
+        answered from the index instead of scanning `df` (default is None).
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure jobs. When None the figures are
+        rendered immediately (default is None).
+    windows : pandas.DataFrame, optional
+        Windows returned by `intervals.EventIndex.windows`. When given, every
+        window is binned from its own start and the bins are pooled across
+        windows: the plots show the mean duration and the mean number of
+        events per window in each bin (default is None, the interval
+        [start_ts, end_ts) is binned).
 
     Returns
     -------
     None
     """
-    interval_ns = int(time) * 1_000_000_000
-    results = []
-    current_start = start_ts
-
-    while current_start < end_ts:
-        current_end = min(current_start + interval_ns, end_ts)
-        mask = (df["start timestamp [ns]"] >= current_start) & (df["start timestamp [ns]"] < current_end)
-        subset = df[mask]
-
-        start_sec = (current_start - start_ts) / 1_000_000_000
-        end_sec = (current_end - start_ts) / 1_000_000_000
-        label_interval = f"{format_time(start_sec)}–{format_time(end_sec)}"
-
-        results.append({
-            "interval": label_interval,
-            "mean_duration": subset["duration [ms]"].mean(),
-            "count": subset["duration [ms]"].count()
-        })
-        current_start = current_end
-
-    if results:
-        plot_df = pd.DataFrame(results)
-
-        plt.figure(figsize=(14, 6))
-        plt.bar(plot_df["interval"], plot_df["mean_duration"], color=colour, alpha=0.8)
-        plt.xticks(rotation=90)
-        plt.ylabel(f"Mean duration of {label} (ms)")
-        plt.title(f"{label.capitalize()} means by tranches of {time}s")
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_folder, f"{label}_means_{time}s.png"))
-        plt.close()
-
-        plt.figure(figsize=(14, 6))
-        plt.bar(plot_df["interval"], plot_df["count"], color=colour, alpha=0.8)
-        plt.xticks(rotation=90)
-        plt.ylabel(f"Number of {label}")
-        plt.title(f"Number of {label} per {time}s increments")
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_folder, f"{label}_count_{time}s.png"))
-        plt.close()
+    count_label = f"Number of {label}"
+    bin_ns = int(round(float(time) * NS_PER_S))
+    if windows is not None:
+        if index is None:
+            index = PrefixIndex(*duration_stream(df))
+        bin_starts, bin_ends, stats = index.binned_windows(windows["start"], windows["end"], bin_ns)
+        stats["count"] = stats["count"] / stats["windows"]
+        start_ts = 0
+        count_label = f"Mean number of {label} per window"
+    else:
+        bin_starts, bin_ends = time_bins(start_ts, end_ts, bin_ns)
+        if index is not None:
+            stats = index.window_stats(bin_starts, bin_ends)
+        else:
+            stats = binned_stats(df["start timestamp [ns]"].to_numpy(), df["duration [ms]"].to_numpy(),
+                                 bin_starts, bin_ends)
+
+    if len(bin_starts):
+        intervals = format_bin_labels(bin_starts, bin_ends, start_ts)
+
+        name = f"{label}_means_{time}s.png"
+        render(scheduler, name, render_bar_plot, os.path.join(output_folder, name),
+               intervals, stats["mean"].to_numpy(), colour,
+               f"Mean duration of {label} (ms)", f"{label.capitalize()} means by tranches of {time}s")
+
+        name = f"{label}_count_{time}s.png"
+        render(scheduler, name, render_bar_plot, os.path.join(output_folder, name),
+               intervals, stats["count"].to_numpy(), colour,
+               count_label, f"Number of {label} per {time}s increments")
     else:
         print(f"⚠️ No {label} detected in the interval.")
 
-def gaze_plot(df, events_df, start_ts, end_ts, label, output_folder, colour):
+def gaze_plot(df, events_df, start_ts, end_ts, label, output_folder, colour, scheduler=None, tolerance=None,
+              pairs=None):
     """
     Generate gaze path plots between pairs of events and aggregate gaze plot over the entire interval.
 
@@ -221,61 +282,138 @@ def gaze_plot(df, events_df, start_ts, end_ts, label, output_folder, colour):
         Folder path to save gaze plots.
     colour : str
         Color used for plotting gaze paths.
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure jobs. When None the figures are
+        rendered immediately (default is None).
+    tolerance : float, optional
+        Simplify the gaze paths before plotting, dropping the samples that stay
+        within the same cell of `tolerance` pixels (default is None, every
+        sample is drawn).
+    pairs : pandas.DataFrame, optional
+        Pairs of events to plot, e.g. from `intervals.EventIndex.pairs`
+        (default is None, the consecutive events between `start_ts` and
+        `end_ts`).
 
     Returns
     -------
     None
     """
-    interval_events = events_df[(events_df["timestamp [ns]"] >= start_ts) &
-                                (events_df["timestamp [ns]"] <= end_ts)].reset_index(drop=True)
+    if pairs is None:
+        pairs = event_pairs(events_df, start_ts, end_ts)
+    df = sort_by_timestamp(df, "timestamp [ns]")
+    lo, hi = slice_bounds(df["timestamp [ns]"].to_numpy(), pairs["start"], pairs["end"])
+    points = df[["gaze x [px]", "gaze y [px]"]]
 
     all_points = []
+    raw_points = 0
 
     gaze_plots_folder = os.path.join(output_folder, f"gaze_plots_{label}")
     os.makedirs(gaze_plots_folder, exist_ok=True)
 
-    for i in range(len(interval_events) - 1):
-        e1, e2 = interval_events.iloc[i], interval_events.iloc[i + 1]
-        mask = (df["timestamp [ns]"] >= e1["timestamp [ns]"]) & (df["timestamp [ns]"] < e2["timestamp [ns]"])
-        subset = df[mask][["gaze x [px]", "gaze y [px]"]].dropna()
+    for pair, i, j in zip(pairs.itertuples(index=False), lo, hi):
+        subset = points.iloc[i:j].dropna()
 
         if not subset.empty:
-            all_points.append(subset)
+            x, y = subset["gaze x [px]"].to_numpy(), subset["gaze y [px]"].to_numpy()
+            raw_points += len(x)
+            if tolerance:
+                x, y = decimate_path(x, y, tolerance)
+            all_points.append((x, y))
+
+            name = f"gaze_path_{pair.label}.png"
+            render(scheduler, os.path.join(f"gaze_plots_{label}", name), render_gaze_path,
+                   os.path.join(gaze_plots_folder, name),
+                   x, y, colour, f"Gaze Path between {pair.start_name} and {pair.end_name}")
+
+    if all_points and tolerance:
+        kept = sum(len(x) for x, _ in all_points)
+        print(f"✂️ Gaze paths simplified from {raw_points} to {kept} points "
+              f"({100 * (1 - kept / raw_points):.1f}% fewer, tolerance {tolerance}px).")
 
-            fig_i, ax_i = plt.subplots()
-            ax_i.plot(subset["gaze x [px]"], subset["gaze y [px]"], alpha=0.7, linewidth=1,color=colour)
-            ax_i.set_title(f"Gaze Path between {e1['name']} and {e2['name']}")
-            ax_i.set_xlabel("Gaze X [px]")
-            ax_i.set_ylabel("Gaze Y [px]")
-            ax_i.set_xlim(subset["gaze x [px]"].min(), subset["gaze x [px]"].max())
-            ax_i.set_ylim(subset["gaze y [px]"].min(), subset["gaze y [px]"].max())
-            ax_i.invert_yaxis()
+    if all_points:
+        os.makedirs(output_folder, exist_ok=True)
+        name = f"gaze_plot_{label}.png"
+        render(scheduler, name, render_gaze_overview, os.path.join(output_folder, name),
+               all_points, f"Gaze plot - {label}")
+    else:
+        print(f"⚠️ No gaze point detected between events ({label}).")
 
-            path_fig = os.path.join(gaze_plots_folder, f"gaze_path_{e1['name']} ➝ {e2['name']}.png")
-            fig_i.savefig(path_fig)
-            plt.close(fig_i)
+def gaze_heatmap(df, events_df, start_ts, end_ts, label, output_folder, fixations_df=None, sigma=None,
+                 cell_px=10, scheduler=None, pairs=None, chunks=None):
+    """
+    Generate a density heatmap of the gaze over all pairs of events of the interval.
 
-    if all_points:
-        fig, ax = plt.subplots()
-        for subset in all_points:
-            ax.plot(subset["gaze x [px]"], subset["gaze y [px]"], alpha=0.6, linewidth=1)
-
-        plot_df = pd.concat(all_points, ignore_index=True)
-        ax.set_title(f"Gaze plot - {label}")
-        ax.set_xlabel("Gaze X [px]")
-        ax.set_ylabel("Gaze Y [px]")
-        ax.set_xlim(plot_df["gaze x [px]"].min(), plot_df["gaze x [px]"].max())
-        ax.set_ylim(plot_df["gaze y [px]"].min(), plot_df["gaze y [px]"].max())
-        ax.invert_yaxis()
+    The positions are accumulated chunk by chunk on a grid in scene camera
+    pixel space, so the cost of the figure does not depend on the number of samples.
 
-        os.makedirs(output_folder, exist_ok=True)
-        fig_path = os.path.join(output_folder, f"gaze_plot_{label}.png")
-        fig.savefig(fig_path)
-        plt.close(fig)
+    Parameters
+    ----------
+    df : pandas.DataFrame or None
+        DataFrame containing gaze data with timestamps and coordinates, or
+        None when the samples are given as `chunks`.
+    events_df : pandas.DataFrame
+        DataFrame containing event timestamps and names.
+    start_ts : int
+        Start timestamp in nanoseconds.
+    end_ts : int
+        End timestamp in nanoseconds.
+    label : str
+        Label used for naming the plot.
+    output_folder : str
+        Folder path to save the heatmap.
+    fixations_df : pandas.DataFrame, optional
+        Fixations with their position and duration. When given, the heatmap
+        accumulates the fixation positions weighted by their duration instead
+        of the raw gaze samples (default is None).
+    sigma : float, optional
+        Standard deviation in pixels of the Gaussian smoothing (default is None,
+        no smoothing).
+    cell_px : int, optional
+        Size of a grid cell in pixels (default is 10).
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure job. When None the figure is
+        rendered immediately (default is None).
+    pairs : pandas.DataFrame, optional
+        Pairs of events accumulated, e.g. from `intervals.EventIndex.pairs`
+        (default is None, the consecutive events between `start_ts` and
+        `end_ts`).
+    chunks : iterable of pandas.DataFrame, optional
+        Gaze samples read chunk by chunk, e.g. from
+        `loaders.iter_stream_window`, used instead of `df`: only one chunk is
+        in memory at a time (default is None).
+
+    Returns
+    -------
+    None
+    """
+    if pairs is None:
+        pairs = event_pairs(events_df, start_ts, end_ts)
+    accumulator = HeatmapAccumulator(cell_px)
+
+    if fixations_df is not None:
+        frames = [fixations_df]
+        ts_col, x_col, y_col = "start timestamp [ns]", "fixation x [px]", "fixation y [px]"
+        colorbar_label = "Fixation duration (ms)"
+    else:
+        frames = chunks if chunks is not None else [df]
+        ts_col, x_col, y_col = "timestamp [ns]", "gaze x [px]", "gaze y [px]"
+        colorbar_label = "Gaze samples"
+
+    for frame in frames:
+        frame = sort_by_timestamp(frame, ts_col)
+        weights = frame["duration [ms]"].to_numpy() if fixations_df is not None else None
+        accumulator.add_windows(frame[ts_col].to_numpy(), frame[x_col].to_numpy(), frame[y_col].to_numpy(),
+                                pairs["start"], pairs["end"], weights)
+
+    if accumulator.samples:
+        name = f"gaze_heatmap_{label}.png"
+        render(scheduler, name, render_heatmap, os.path.join(output_folder, name),
+               accumulator.smoothed(sigma), accumulator.extent, f"Gaze heatmap - {label}", colorbar_label)
     else:
         print(f"⚠️ No gaze point detected between events ({label}).")
 
-def pupils_diameter_time_binned_plot(df, events_df, start_ts, end_ts, label, output_folder, colour, time):
+def pupils_diameter_time_binned_plot(df, events_df, start_ts, end_ts, label, output_folder, colour, time, index=None,
+                                     scheduler=None, windows=None):
     """
     Generate bar plot of mean pupil diameter over time bins within a specified interval.
 
@@ -297,45 +435,46 @@ def pupils_diameter_time_binned_plot(df, events_df, start_ts, end_ts, label, out
         Color used for plotting bars.
     time : int or str
         Duration of each time bin in seconds.
+    index : intervals.PrefixIndex, optional
+        Prefix-sum index over the mean pupil diameter. When given, the bins are
+        answered from the index instead of scanning `df` (default is None).
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure jobs. When None the figures are
+        rendered immediately (default is None).
+    windows : pandas.DataFrame, optional
+        Windows returned by `intervals.EventIndex.windows`. When given, every
+        window is binned from its own start and the samples of the n-th bins
+        of all windows are averaged together (default is None, the interval
+        [start_ts, end_ts) is binned).
 
     Returns
     -------
     None
     """
-    interval_ns = int(time) * 1_000_000_000
-    results = []
-    current_start = start_ts
-
-    while current_start < end_ts:
-        current_end = min(current_start + interval_ns, end_ts)
-        mask = (df["timestamp [ns]"] >= current_start) & (df["timestamp [ns]"] < current_end)
-        subset = df[mask]
-
-        start_sec = (current_start - start_ts) / 1_000_000_000
-        end_sec = (current_end - start_ts) / 1_000_000_000
-        label_interval = f"{format_time(start_sec)}–{format_time(end_sec)}"
-
-        results.append({
-            "interval": label_interval,
-            "mean_diameter": ((subset["pupil diameter left [mm]"] + subset["pupil diameter right [mm]"]) / 2).mean(),
-        })
-        current_start = current_end
-
-    if results:
-        plot_df = pd.DataFrame(results)
-
-        plt.figure(figsize=(14, 6))
-        plt.bar(plot_df["interval"], plot_df["mean_diameter"], color=colour, alpha=0.8)
-        plt.xticks(rotation=90)
-        plt.ylabel(f"Mean diameter of {label} (mm)")
-        plt.title(f"Mean {label} diameter over time ({time}s bins)")
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_folder, f"{label}_diameter_means_{time}s.png"))
-        plt.close()
+    bin_ns = int(round(float(time) * NS_PER_S))
+    if windows is not None:
+        if index is None:
+            index = PrefixIndex(*pupil_stream(df))
+        bin_starts, bin_ends, stats = index.binned_windows(windows["start"], windows["end"], bin_ns)
+        start_ts = 0
+    else:
+        bin_starts, bin_ends = time_bins(start_ts, end_ts, bin_ns)
+        if index is not None:
+            stats = index.window_stats(bin_starts, bin_ends)
+        else:
+            stats = binned_stats(df["timestamp [ns]"].to_numpy(), mean_pupil_diameter(df).to_numpy(),
+                                 bin_starts, bin_ends)
+
+    if len(bin_starts):
+        name = f"{label}_diameter_means_{time}s.png"
+        render(scheduler, name, render_bar_plot, os.path.join(output_folder, name),
+               format_bin_labels(bin_starts, bin_ends, start_ts), stats["mean"].to_numpy(), colour,
+               f"Mean diameter of {label} (mm)", f"Mean {label} diameter over time ({time}s bins)")
     else:
         print(f"⚠️ No {label} detected in the interval.")
 
-def pupils_diameter_plot_between_events(df, events_df, start_ts, end_ts, label, output_folder, colour):
+def pupils_diameter_plot_between_events(df, events_df, start_ts, end_ts, label, output_folder, colour, stats=None,
+                                        scheduler=None):
     """
     Plot mean pupil diameter between consecutive events.
 
@@ -356,6 +495,12 @@ def pupils_diameter_plot_between_events(df, events_df, start_ts, end_ts, label,
         Path to folder where the plot image will be saved.
     colour : str
         Color to be used in the plot.
+    stats : pandas.DataFrame, optional
+        Rows of `intervals.aggregate_intervals` for the mean pupil diameter.
+        When given, `df` is not scanned again (default is None).
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure jobs. When None the figures are
+        rendered immediately (default is None).
 
     Returns
     -------
@@ -363,35 +508,453 @@ def pupils_diameter_plot_between_events(df, events_df, start_ts, end_ts, label,
         Saves a bar plot of mean pupil diameters per event interval to disk.
         Prints a warning if no data is detected between events.
     """
-    interval_events = events_df[(events_df["timestamp [ns]"] >= start_ts) &
-                                (events_df["timestamp [ns]"] <= end_ts)].reset_index(drop=True)
-    results = []
-
-    for i in range(len(interval_events) - 1):
-        e1, e2 = interval_events.iloc[i], interval_events.iloc[i + 1]
-        mask = (df["timestamp [ns]"] >= e1["timestamp [ns]"]) & (df["timestamp [ns]"] < e2["timestamp [ns]"])
-        subset = df[mask]
-
-        results.append({
-            "label": f"{e1['name']} ➝ {e2['name']}",
-            "mean_diameter": ((subset["pupil diameter left [mm]"] + subset["pupil diameter right [mm]"]) / 2).mean(),
-        })
-
-    if results:
-        plot_df = pd.DataFrame(results)
-
-        plt.figure(figsize=(14, 6))
-        plt.bar(plot_df["label"], plot_df["mean_diameter"], color=colour, alpha=0.8)
-        plt.xticks(rotation=90)
-        plt.ylabel(f"Mean diameter of {label} (mm)")
-        plt.title(f"Mean {label} diameter between events")
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_folder, f"{label}_diameter_means_per_event.png"))
-        plt.close()
+    if stats is None:
+        stats = aggregate_intervals({label: pupil_stream(df)}, event_pairs(events_df, start_ts, end_ts))
+
+    if not stats.empty:
+        name = f"{label}_diameter_means_per_event.png"
+        render(scheduler, name, render_bar_plot, os.path.join(output_folder, name),
+               stats["label"].tolist(), stats["mean"].to_numpy(), colour,
+               f"Mean diameter of {label} (mm)", f"Mean {label} diameter between events")
     else:
         print(f"⚠️ No {label} detected between events.")
 
-def generate_plots(blinks_file, pupil_file, events_file, fixations_file, gaze_file, saccades_file, output_folder, start_event=None, end_event=None, colour=None, time=None):
+def pupil_epochs_plot(df, events_df, event, label, output_folder, colour, before_s=1.0, after_s=3.0,
+                      baseline_s=(-0.5, 0.0), rate_hz=EPOCH_RATE_HZ, ci=0.95, scheduler=None):
+    """
+    Plot the mean pupil diameter locked to every occurrence of an event.
+
+    The mean diameter is resampled onto a uniform grid around each
+    occurrence, baseline-corrected, then averaged with a confidence band
+    (see `epochs.pupil_epochs`).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        DataFrame containing pupil diameter data with columns
+        'timestamp [ns]', 'pupil diameter left [mm]', and 'pupil diameter right [mm]',
+        covering the epochs.
+    events_df : pandas.DataFrame
+        DataFrame with events including 'timestamp [ns]' and 'name' columns.
+    event : str
+        Name of the event the epochs are locked to.
+    label : str
+        Label describing the data type (used for plot titles and filenames).
+    output_folder : str
+        Path to folder where the plot image will be saved.
+    colour : str
+        Color to be used in the plot.
+    before_s : float, optional
+        Seconds kept before each event (default is 1.0).
+    after_s : float, optional
+        Seconds kept after each event (default is 3.0).
+    baseline_s : tuple of float, optional
+        Baseline period relative to the event, subtracted from each epoch;
+        None plots the raw diameters (default is (-0.5, 0)).
+    rate_hz : float, optional
+        Resampling rate of the epochs (default is `epochs.EPOCH_RATE_HZ`).
+    ci : float, optional
+        Confidence level of the band (default is 0.95).
+    scheduler : rendering.RenderScheduler, optional
+        Scheduler receiving the figure job. When None the figure is
+        rendered immediately (default is None).
+
+    Returns
+    -------
+    tuple or None
+        `(offsets_s, epochs)`: the grid in seconds and the float32 matrix of
+        shape (events, samples), or None if the event does not exist.
+    """
+    onsets = events_df.loc[events_df["name"] == event, "timestamp [ns]"].to_numpy()
+    if not len(onsets):
+        print(f"⚠️ No '{event}' event found for the {label} epochs.")
+        return None
+
+    offsets_s, epochs = pupil_epochs(*pupil_stream(df), onsets, before_s, after_s, baseline_s, rate_hz)
+    summary = epoch_summary(epochs, offsets_s, ci)
+    valid = int(np.sum(~np.all(np.isnan(epochs), axis=1)))
+    if valid:
+        name = f"{label}_epochs_{event}.png"
+        ylabel = f"Change in {label} diameter (mm)" if baseline_s is not None else f"Diameter of {label} (mm)"
+        render(scheduler, name, render_epoch_plot, os.path.join(output_folder, name),
+               offsets_s, summary["mean"].to_numpy(), summary["ci_low"].to_numpy(), summary["ci_high"].to_numpy(),
+               colour, ylabel, f"Mean {label} diameter around '{event}' ({valid} events, {ci:.0%} CI)")
+    else:
+        print(f"⚠️ No {label} detected around the '{event}' events.")
+    return offsets_s, epochs
+
+PIPELINE_STAGES = (
+    "Loading files",
+    "Blink plots",
+    "Loading gaze and pupil samples",
+    "Statistics between events",
+    "Plots between events",
+    "Time-binned plots",
+    "Gaze plots",
+    "Pupil plots",
+    "Rendering plots",
+)
+
+def _enter_stage(stage, progress=None, cancel_event=None, report=None):
+    """
+    Report the start of a pipeline stage, or stop the pipeline if it was cancelled.
+
+    Parameters
+    ----------
+    stage : int
+        Index of the stage in `PIPELINE_STAGES`.
+    progress : callable, optional
+        Called as `progress(stage, total, message)` (default is None).
+    cancel_event : threading.Event, optional
+        Event set to request the cancellation (default is None).
+    report : instrumentation.RunReport, optional
+        Report timing the stages (default is None).
+
+    Raises
+    ------
+    GenerationCancelled
+        If `cancel_event` is set.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise GenerationCancelled("Generation cancelled.")
+    if report is not None:
+        report.enter(PIPELINE_STAGES[stage])
+    if progress is not None:
+        progress(stage, len(PIPELINE_STAGES), PIPELINE_STAGES[stage])
+
+def run_pipeline(blinks_file, pupil_file, events_file, fixations_file, gaze_file, saccades_file, output_folder, start_event=None, end_event=None, colour=None, time=None, use_cache=True, workers=None, gaze_tolerance=None, gaze_mode="paths", heatmap_sigma=None, heatmap_fixations=False, progress=None, cancel_event=None, memo=None, force=False, profile=None, occurrences="first"):
+    """
+    Run the whole analysis and save the plots, without any dialog.
+
+    The pipeline is split into the stages listed in `PIPELINE_STAGES`. Progress
+    is reported at the start of each stage and the cancellation is checked
+    between stages, so it can run in a background thread. The time of every
+    stage, the rows read and the figures written are saved in a run report
+    in the output folder (see `instrumentation.RunReport`), even when the run
+    fails.
+
+    Parameters
+    ----------
+    blinks_file : str
+        Path to CSV file containing blink data.
+    pupil_file : str
+        Path to CSV file containing pupil diameter data.
+    events_file : str
+        Path to CSV file containing event timestamps and names.
+    fixations_file : str
+        Path to CSV file containing fixation data.
+    gaze_file : str
+        Path to CSV file containing gaze point data.
+    saccades_file : str
+        Path to CSV file containing saccade data.
+    output_folder : str
+        Directory path where generated plots will be saved.
+    start_event : str, optional
+        Name of the starting event for interval-based analyses (default is None).
+    end_event : str, optional
+        Name of the ending event for interval-based analyses (default is None).
+    colour : str, optional
+        Color used in plotting (default is None). Must be provided to generate plots.
+    time : int or float or str, optional
+        Time bin size in seconds for binned plots (default is None).
+        Pass "all" to sweep every width listed in `time.csv` in one run.
+    use_cache : bool, optional
+        Read the CSV files through the columnar cache stored next to them
+        (default is True).
+    workers : int, optional
+        Number of processes rendering the figures; 1 renders in the current
+        process (default is `config.DEFAULT_RENDER_WORKERS`, the number of
+        CPUs up to 4).
+    gaze_tolerance : float, optional
+        Tolerance in pixels used to simplify the gaze paths before plotting
+        (default is None, every sample is drawn).
+    gaze_mode : {"paths", "heatmap", "both"}, optional
+        Draw the gaze paths, a gaze density heatmap, or both (default is "paths").
+    heatmap_sigma : float, optional
+        Standard deviation in pixels of the Gaussian smoothing of the heatmap
+        (default is None, no smoothing).
+    heatmap_fixations : bool, optional
+        Build the heatmap from the fixations weighted by their duration instead
+        of the raw gaze samples (default is False).
+    progress : callable, optional
+        Called as `progress(stage, total, message)` at the start of each stage,
+        then as `progress(total, total, "Done")` (default is None).
+    cancel_event : threading.Event, optional
+        When set, the pipeline stops at the next stage boundary and pending
+        figures are not rendered (default is None).
+    memo : memo.MemoCache, optional
+        Cache shared between runs of the same session. The loaded streams,
+        the statistics between events and the prefix-sum indexes are keyed by
+        the version of their input files and by the event window, so a rerun
+        with another colour only renders again and a rerun with another
+        window only recomputes what depends on it. Time bins of any width are
+        answered from the cached indexes (default is None, nothing is reused).
+    force : bool, optional
+        Render every plot again. By default a plot whose data and parameters
+        did not change since the last run in the same output folder is
+        skipped (default is False).
+    profile : {"cpu", "memory", "all"}, optional
+        Profile the run with cProfile and/or tracemalloc and add the results
+        to the run report (default is None, no profiling).
+    occurrences : {"first", "all"}, optional
+        Analyse the window from the first start event to the first end event,
+        or every window delimited by an occurrence of the start event and the
+        end event closing it, for protocols repeating their markers (see
+        `intervals.EventIndex.windows`). All the windows are analysed in one
+        pass: their pairs of events are shown side by side and the time bins
+        are pooled across windows (default is "first").
+
+    Returns
+    -------
+    dict
+        'plots' lists the file names of the up-to-date plots, 'skipped' those
+        that were unchanged and not rendered again; 'blink_failures' and
+        'failures' list the `(name, message)` of the plots that could not
+        be rendered; 'interval' tells whether the analysis between the start
+        and end events was run; 'report' is the `instrumentation.RunReport`
+        of the run.
+
+    Raises
+    ------
+    GenerationCancelled
+        If the generation was cancelled.
+    NameError
+        If the colour, the events or the time bin are missing.
+    ValueError
+        If the start event is after the end event, or no start event is
+        followed by an end event.
+    """
+    result = {"plots": [], "skipped": [], "blink_failures": [], "failures": [], "interval": False}
+    report = RunReport(profile)
+    result["report"] = report
+    report.start()
+    status = "error"
+    with RenderScheduler(workers, output_folder, force) as scheduler:
+        try:
+            result["plots"] = scheduler.rendered
+            result["skipped"] = scheduler.skipped
+            _enter_stage(0, progress, cancel_event, report)
+            print("📥 Uploading files...")
+            if memo is None:
+                memo = MemoCache(max_entries=0)
+            files = {"blinks": blinks_file, "events": events_file, "fixations": fixations_file,
+                     "saccades": saccades_file, "gaze": gaze_file, "pupil": pupil_file}
+            sources = {name: source_key(path) for name, path in files.items()}
+
+            # The large gaze and pupil exports are converted to the cache while the
+            # small files are loaded; their window is read once the events are known.
+            # The small streams keep only the needed columns, with compact dtypes,
+            # and are sorted once so that intervals are cut by binary search.
+            loaded = {}
+            tasks = {}
+            footprints = {}
+            for name in SMALL_STREAMS:
+                stream = memo.get(("stream", sources[name], use_cache))
+                if stream is not None:
+                    loaded[name] = stream
+                else:
+                    tasks[name] = report.timed(f"read {name}",
+                                               partial(load_stream, files[name], name, use_cache, footprints))
+            if use_cache:
+                tasks["gaze"] = report.timed("cache gaze", partial(ensure_cache, gaze_file))
+                tasks["pupil"] = report.timed("cache pupil", partial(ensure_cache, pupil_file))
+            if loaded:
+                print(f"♻️ Reusing {', '.join(loaded)}, already loaded.")
+            parsed, _ = load_parallel(tasks)
+            for name in SMALL_STREAMS:
+                if name not in loaded:
+                    report.scanned(name, len(parsed[name]))
+                    loaded[name] = parsed[name]
+                    memo.put(("stream", sources[name], use_cache), parsed[name])
+            if footprints:
+                memory_report({name: footprints[name] for name in SMALL_STREAMS if name in footprints})
+            blinks_df = loaded["blinks"]
+            events_df = loaded["events"]
+            fixations_df = loaded["fixations"]
+            saccades_df = loaded["saccades"]
+
+            os.makedirs(output_folder, exist_ok=True)
+            print("📁 Output folder ready.")
+
+            if colour :
+                # Blink plots
+                _enter_stage(1, progress, cancel_event, report)
+                blink_plots(blinks_df, events_df, output_folder, colour, scheduler)
+                result["blink_failures"] = scheduler.run(cancel_event)
+            else :
+                raise NameError("You have not entered a color.")
+
+            if start_event and end_event and colour and time:
+                print(f"⏱ Analyzing data between '{start_event}' and '{end_event}'...")
+
+                event_index = memo.cached(("event_index", sources["events"], use_cache),
+                                          partial(EventIndex, events_df))
+                if start_event not in event_index or end_event not in event_index:
+                    print("⚠️ One of the start or end events does not exist.")
+                    status = "ok"
+                    return result
+
+                # Every window between the events; the samples are read once over their span
+                with report.timer("event pairs"):
+                    event_windows = event_index.windows(start_event, end_event, occurrences)
+                start_ts = event_windows["start"].min()
+                end_ts = event_windows["end"].max()
+                binned_windows = event_windows if len(event_windows) > 1 else None
+                report.count("windows", len(event_windows))
+                if binned_windows is not None:
+                    print(f"🔁 {len(event_windows)} windows between '{start_event}' and '{end_event}'.")
+
+                # Gaze and pupil samples are only loaded inside the selected window. Without
+                # gaze paths the gaze is not loaded: the heatmap streams it chunk by chunk
+                _enter_stage(2, progress, cancel_event, report)
+                window_keys = {name: ("window", sources[name], int(start_ts), int(end_ts), use_cache)
+                               for name in ("gaze", "pupil")}
+                windows = {name: memo.get(key) for name, key in window_keys.items()}
+                loads = [name for name, window in windows.items()
+                         if window is None and (name != "gaze" or gaze_mode in ("paths", "both"))]
+                tasks = {f"{name} window": report.timed(f"read {name} window", partial(
+                             read_stream_window, files[name], STREAM_COLUMNS[name], "timestamp [ns]", start_ts, end_ts,
+                             use_cache))
+                         for name in loads}
+                if tasks:
+                    print("📥 Loading gaze and pupil samples of the interval...")
+                    parsed, _ = load_parallel(tasks)
+                    footprints = {}
+                    for name in loads:
+                        report.scanned(name, len(parsed[f"{name} window"]))
+                        windows[name] = sort_by_timestamp(parsed[f"{name} window"], "timestamp [ns]")
+                        footprints[name] = (None, memory_footprint(windows[name]))
+                        memo.put(window_keys[name], windows[name])
+                    memory_report(footprints)
+                gaze_df = windows["gaze"]
+                pupil_df = windows["pupil"]
+
+                # Every metric of every stream between pairs of events, in one pass
+                _enter_stage(3, progress, cancel_event, report)
+                event_streams = [
+                    (blinks_df, "blinks"),
+                    (fixations_df, "fixations"),
+                    (saccades_df, "saccades")
+                ]
+                with report.timer("event pairs"):
+                    pairs = event_index.pairs(event_windows)
+                report.count("intervals", len(pairs))
+                with report.timer("statistics between events"):
+                    event_stats = memo.cached(
+                        ("event_stats", tuple(sources.values()), tuple(event_windows["start"].tolist()),
+                         tuple(event_windows["end"].tolist())),
+                        lambda: aggregate_intervals({**{label: duration_stream(df) for df, label in event_streams},
+                                                     "pupils": pupil_stream(pupil_df)}, pairs)
+                    )
+
+                # Plots between pairs of events
+                _enter_stage(4, progress, cancel_event, report)
+                for df, label in event_streams:
+                    generate_mean_std_plot_between_events(df, events_df, start_ts, end_ts, label, output_folder,colour,
+                                                          stats=event_stats[event_stats["stream"] == label],
+                                                          scheduler=scheduler)
+                for df, label in event_streams:
+                    generate_frequency_plot_between_events(df, events_df, start_ts, end_ts, label, output_folder,colour,
+                                                           stats=event_stats[event_stats["stream"] == label],
+                                                           scheduler=scheduler)
+
+                # Time-binned plots, answered from prefix-sum indexes built once per stream
+                _enter_stage(5, progress, cancel_event, report)
+                widths = load_time_widths() if str(time) == SWEEP_ALL else [time]
+                binned_streams = [
+                    (fixations_df, "fixation"),
+                    (blinks_df, "blink"),
+                    (saccades_df, "saccade")
+                ]
+                with report.timer("prefix-sum indexes"):
+                    indexes = {label: memo.cached(("index", sources[name], use_cache),
+                                                  lambda: PrefixIndex(*duration_stream(df)))
+                               for (df, label), name in zip(binned_streams, ("fixations", "blinks", "saccades"))}
+                    pupil_index = memo.cached(("index", window_keys["pupil"]), lambda: PrefixIndex(*pupil_stream(pupil_df)))
+                report.count("time bin widths", len(widths))
+
+                for width in widths:
+                    for df, label in binned_streams:
+                        generate_time_binned_plots(df, label, start_ts, end_ts, output_folder,colour,width,
+                                                   index=indexes[label], scheduler=scheduler, windows=binned_windows)
+
+                # Gaze plot
+                _enter_stage(6, progress, cancel_event, report)
+                if gaze_mode not in GAZE_MODES:
+                    raise ValueError(f"Unknown gaze mode '{gaze_mode}', expected one of {GAZE_MODES}.")
+                if gaze_mode in ("paths", "both"):
+                    gaze_plot(gaze_df,events_df,start_ts, end_ts, "gaze", output_folder,colour, scheduler=scheduler,
+                              tolerance=gaze_tolerance, pairs=pairs)
+                if gaze_mode in ("heatmap", "both"):
+                    chunks = None if gaze_df is not None or heatmap_fixations else iter_stream_window(
+                        gaze_file, STREAM_COLUMNS["gaze"], "timestamp [ns]", start_ts, end_ts, use_cache)
+                    gaze_heatmap(gaze_df, events_df, start_ts, end_ts, "gaze", output_folder,
+                                 fixations_df=fixations_df if heatmap_fixations else None, sigma=heatmap_sigma,
+                                 scheduler=scheduler, pairs=pairs, chunks=chunks)
+
+                # Pupil plots
+                _enter_stage(7, progress, cancel_event, report)
+                for width in widths:
+                    pupils_diameter_time_binned_plot(pupil_df,events_df,start_ts, end_ts, "pupils", output_folder,colour,width,
+                                                     index=pupil_index, scheduler=scheduler, windows=binned_windows)
+                pupils_diameter_plot_between_events(pupil_df,events_df,start_ts, end_ts, "pupils", output_folder,colour,
+                                                    stats=event_stats[event_stats["stream"] == "pupils"],
+                                                    scheduler=scheduler)
+
+                _enter_stage(8, progress, cancel_event, report)
+                if scheduler.skipped:
+                    print(f"⏭ {len(scheduler.skipped)} unchanged plot(s) skipped.")
+                print(f"🖼 Rendering {len(scheduler.jobs)} plot(s) on {scheduler.workers} process(es)...")
+                result["failures"] = scheduler.run(cancel_event)
+                result["interval"] = True
+            else :
+                raise NameError("You have not provided the following variable(s): start_event, end_event, colour, time.")
+
+            if cancel_event is not None and cancel_event.is_set():
+                raise GenerationCancelled("Generation cancelled.")
+            status = "ok"
+        except GenerationCancelled:
+            status = "cancelled"
+            raise
+        finally:
+            report.record_figures(scheduler, result["blink_failures"] + result["failures"])
+            report.finish(status)
+            report.save(output_folder)
+    if progress is not None:
+        progress(len(PIPELINE_STAGES), len(PIPELINE_STAGES), "Done")
+    return result
+
+def notify_result(result):
+    """
+    Print and display the outcome of a pipeline run.
+
+    Parameters
+    ----------
+    result : dict
+        Result returned by `run_pipeline`.
+
+    Returns
+    -------
+    None
+    """
+    # Imported here so that the pipeline itself never needs a display
+    from tkinter import messagebox
+
+    if not result["blink_failures"]:
+        messagebox.showinfo("Success","Blink Plots generated successfully.")
+    if not result["interval"]:
+        return
+
+    failures = result["blink_failures"] + result["failures"]
+    if failures:
+        print(f"⚠️ {len(failures)} plot(s) could not be generated.")
+        messagebox.showwarning("Warning", f"{len(failures)} plot(s) could not be generated:\n" +
+                               "\n".join(f"{name}: {message}" for name, message in failures))
+    else:
+        print("✅ All plots have been generated successfully.")
+        messagebox.showinfo("Success", "Plots generated successfully.")
+
+def generate_plots(blinks_file, pupil_file, events_file, fixations_file, gaze_file, saccades_file, output_folder, start_event=None, end_event=None, colour=None, time=None, use_cache=True, workers=None, gaze_tolerance=None, gaze_mode="paths", heatmap_sigma=None, heatmap_fixations=False, progress=None, cancel_event=None, force=False, profile=None, occurrences="first"):
     """
     Generate various plots from eye-tracking data files and save them to an output folder.
 
@@ -417,8 +980,39 @@ def generate_plots(blinks_file, pupil_file, events_file, fixations_file, gaze_fi
         Name of the ending event for interval-based analyses (default is None).
     colour : str, optional
         Color used in plotting (default is None). Must be provided to generate plots.
-    time : int or float, optional
+    time : int or float or str, optional
         Time bin size in seconds for binned plots (default is None).
+        Pass "all" to sweep every width listed in `time.csv` in one run.
+    use_cache : bool, optional
+        Read the CSV files through the columnar cache stored next to them
+        (default is True).
+    workers : int, optional
+        Number of processes rendering the figures; 1 renders in the current
+        process (default is `config.DEFAULT_RENDER_WORKERS`, the number of
+        CPUs up to 4).
+    gaze_tolerance : float, optional
+        Tolerance in pixels used to simplify the gaze paths before plotting
+        (default is None, every sample is drawn).
+    gaze_mode : {"paths", "heatmap", "both"}, optional
+        Draw the gaze paths, a gaze density heatmap, or both (default is "paths").
+    heatmap_sigma : float, optional
+        Standard deviation in pixels of the Gaussian smoothing of the heatmap
+        (default is None, no smoothing).
+    heatmap_fixations : bool, optional
+        Build the heatmap from the fixations weighted by their duration instead
+        of the raw gaze samples (default is False).
+    progress : callable, optional
+        Progress callback, see `run_pipeline` (default is None).
+    cancel_event : threading.Event, optional
+        Event set to cancel the generation between stages (default is None).
+    force : bool, optional
+        Render every plot again instead of skipping the unchanged ones
+        (default is False).
+    profile : {"cpu", "memory", "all"}, optional
+        Profile the run, see `run_pipeline` (default is None).
+    occurrences : {"first", "all"}, optional
+        Analyse the first window or every window between the start and end
+        events, see `run_pipeline` (default is "first").
 
     Returns
     -------
@@ -428,97 +1022,14 @@ def generate_plots(blinks_file, pupil_file, events_file, fixations_file, gaze_fi
         Prints warnings if data or parameters are missing.
     """
     try:
-        print("📥 Uploading files...")
-        blinks_df = pd.read_csv(blinks_file)
-        events_df = pd.read_csv(events_file)
-        fixations_df = pd.read_csv(fixations_file)
-        gaze_df = pd.read_csv(gaze_file)
-        saccades_df = pd.read_csv(saccades_file)
-        pupil_df = pd.read_csv(pupil_file)
-
-        os.makedirs(output_folder, exist_ok=True)
-        print("📁 Output folder ready.")
-
-        if colour :
-            # Blink plots
-            plt.figure(figsize=(15, 7))
-            plt.plot(blinks_df["start timestamp [ns]"], blinks_df["duration [ms]"], "x-",color = colour)
-            plt.title("Blink duration over time")
-            plt.xlabel("Events")
-            plt.ylabel("Duration (ms)")
-            plt.grid(True)
-
-            unique_event_labels = events_df.drop_duplicates(subset=["timestamp [ns]"])
-            plt.xticks(
-                ticks=unique_event_labels["timestamp [ns]"],
-                labels=unique_event_labels["name"],
-                rotation=90,
-                ha="center"
-            )
-            plt.tight_layout()
-            plt.savefig(os.path.join(output_folder, "blinks_duration_per_event.png"))
-            plt.close()
-
-            plt.figure(figsize=(8, 5))
-            plt.hist(
-                blinks_df["duration [ms]"],
-                bins=range(int(blinks_df["duration [ms]"].min()) - 10, int(blinks_df["duration [ms]"].max()) + 10, 10),
-                color=colour,
-                edgecolor='black'
-            )
-            plt.title("Distribution of blink durations")
-            plt.xlabel("Duration (ms)")
-            plt.ylabel("Count")
-            plt.tight_layout()
-            plt.savefig(os.path.join(output_folder, "blink_duration_histogram.png"))
-            plt.close()
-            messagebox.showinfo("Success","Blink Plots generated successfully.")
-        else :
-            raise NameError("You have not entered a color.")
-
-        if start_event and end_event and colour and time:
-            print(f"⏱ Analyzing data between '{start_event}' and '{end_event}'...")
-
-            start_row = events_df[events_df["name"] == start_event]
-            end_row = events_df[events_df["name"] == end_event]
-
-            if start_row.empty or end_row.empty:
-                print("⚠️ One of the start or end events does not exist.")
-                return
-
-            start_ts = start_row["timestamp [ns]"].iloc[0]
-            end_ts = end_row["timestamp [ns]"].iloc[0]
-
-            if start_ts >= end_ts:
-                raise ValueError("The start event is after the end event.")
-
-            # Plots between pairs of events
-            generate_mean_std_plot_between_events(blinks_df, events_df, start_ts, end_ts, "blinks", output_folder,colour)
-            generate_mean_std_plot_between_events(fixations_df, events_df, start_ts, end_ts, "fixations", output_folder,colour)
-            generate_mean_std_plot_between_events(saccades_df, events_df, start_ts, end_ts, "saccades", output_folder,colour)
-
-            generate_frequency_plot_between_events(blinks_df, events_df, start_ts, end_ts, "blinks", output_folder,colour)
-            generate_frequency_plot_between_events(fixations_df, events_df, start_ts, end_ts, "fixations", output_folder,colour)
-            generate_frequency_plot_between_events(saccades_df, events_df, start_ts, end_ts, "saccades", output_folder,colour)
-
-            for df, label in [
-                (fixations_df, "fixation"),
-                (blinks_df, "blink"),
-                (saccades_df, "saccade")
-            ]:
-                generate_time_binned_plots(df, label, start_ts, end_ts, output_folder,colour,time)
-
-            # Gaze plot
-            gaze_plot(gaze_df,events_df,start_ts, end_ts, "gaze", output_folder,colour)
-
-            # Pupil plots
-            pupils_diameter_time_binned_plot(pupil_df,events_df,start_ts, end_ts, "pupils", output_folder,colour,time)
-            pupils_diameter_plot_between_events(pupil_df,events_df,start_ts, end_ts, "pupils", output_folder,colour)
-
-            print("✅ All plots have been generated successfully.")
-            messagebox.showinfo("Success", "Plots generated successfully.")
-        else :
-            raise NameError("You have not provided the following variable(s): start_event, end_event, colour, time.")
-
+        result = run_pipeline(blinks_file, pupil_file, events_file, fixations_file, gaze_file, saccades_file,
+                              output_folder, start_event, end_event, colour, time, use_cache, workers,
+                              gaze_tolerance, gaze_mode, heatmap_sigma, heatmap_fixations, progress, cancel_event,
+                              force=force, profile=profile, occurrences=occurrences)
+    except GenerationCancelled:
+        print("⛔ Generation cancelled.")
     except Exception as e:
-        print(f"❌ Error : {e}")
\ No newline at end of file
+        print(f"❌ Error : {e}")
+    else:
+        print(f"📊 {result['report'].summary()}")
+        notify_result(result)
\ No newline at end of file
@@ -0,0 +1,176 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+MAX_ENTRIES = 64
+MAX_BYTES = 1 << 30
+
+def source_key(path):
+    """
+    Identify the current version of an input file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    tuple
+        `(absolute path, size, modification time in ns)`. Any change of the
+        file gives a different key.
+    """
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+def sizeof(value):
+    """
+    Estimate the memory held by a cached value.
+
+    Parameters
+    ----------
+    value : object
+        DataFrame, array, object holding arrays (e.g. `intervals.PrefixIndex`)
+        or a container of such values.
+
+    Returns
+    -------
+    int
+        Estimated size in bytes.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sum(sizeof(item) for item in value.values())
+    if hasattr(value, "__dict__"):
+        return sum(sizeof(item) for item in vars(value).values())
+    return sys.getsizeof(value)
+
+class MemoCache:
+    """
+    In-process memo of loaded streams and computed aggregates.
+
+    Entries are evicted in least recently used order once the cache holds
+    more than `max_entries` values or more than `max_bytes` bytes. Cached
+    values are shared between runs and must be treated as read-only.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximum number of values kept (default is `MAX_ENTRIES`).
+    max_bytes : int, optional
+        Maximum estimated memory held by the values (default is `MAX_BYTES`).
+        A value larger than this is computed but not kept.
+
+    Attributes
+    ----------
+    hits : int
+        Number of values served from the cache.
+    misses : int
+        Number of lookups of a value that was not cached.
+    nbytes : int
+        Estimated memory currently held.
+    """
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Return a cached value and mark it as recently used.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of the value.
+        default : object, optional
+            Returned when the key is not cached (default is None).
+
+        Returns
+        -------
+        object
+            The cached value, or `default`.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """
+        Store a value, then evict the least recently used ones above the limits.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of the value.
+        value : object
+            Value to store.
+        """
+        if not self.max_entries:
+            return
+        size = sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def cached(self, key, compute):
+        """
+        Return the cached value of a key, computing and storing it on a miss.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of the value.
+        compute : callable
+            Called without arguments to compute the value.
+
+        Returns
+        -------
+        object
+            The cached or computed value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Drop every cached value.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+_MISSING = object()
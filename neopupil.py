@@ -0,0 +1,329 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import contextlib
+
+# Headless entry point: the plotting modules (and matplotlib, with the
+# non-interactive Agg backend, see `rendering`) are only imported by the runs
+# drawing figures, not by `--stats-only`
+from config import SWEEP_ALL, GAZE_MODES, DEFAULT_RENDER_WORKERS
+from session import GenerationCancelled
+from intervals import OCCURRENCES
+from loaders import recording_files
+from plan import ANALYSES, load_plan, run_plan, default_plan, statistics_plan
+from loaders import TABLE_FORMATS
+from instrumentation import PROFILE_MODES, REPORT_FILE
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 3
+EXIT_CANCELLED = 130
+
+def parse_bin(value):
+    """
+    Parse the `--bin` option.
+
+    Parameters
+    ----------
+    value : str
+        Bin width in seconds, or "all".
+
+    Returns
+    -------
+    float or str
+        Positive bin width, or `config.SWEEP_ALL`.
+
+    Raises
+    ------
+    argparse.ArgumentTypeError
+        If the value is neither "all" nor a positive number.
+    """
+    if value == SWEEP_ALL:
+        return value
+    try:
+        width = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid bin width '{value}'")
+    if width <= 0:
+        raise argparse.ArgumentTypeError("the bin width must be a positive number of seconds")
+    return int(width) if width.is_integer() else width
+
+def parse_plan(path):
+    """
+    Parse the `--plan` option.
+
+    Parameters
+    ----------
+    path : str
+        Path to a JSON or YAML analysis plan.
+
+    Returns
+    -------
+    dict
+        Validated plan, see `plan.normalise_plan`.
+
+    Raises
+    ------
+    argparse.ArgumentTypeError
+        If the plan cannot be read or is not valid.
+    """
+    try:
+        # The events and colour may come from the command line
+        return load_plan(path, check_context=False)
+    except (OSError, ValueError, ImportError) as e:
+        raise argparse.ArgumentTypeError(f"invalid plan {path}: {e}")
+
+def epoch_analyses(args):
+    """
+    Build the `pupil_epochs` analyses requested with `--epochs`.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Options of the `run` or `batch` command.
+
+    Returns
+    -------
+    list of dict
+        One analysis per event, over the `--epoch-window` (default is the
+        window of `plan.ANALYSES`).
+    """
+    before, after = args.epoch_window or (ANALYSES["pupil_epochs"]["before"], ANALYSES["pupil_epochs"]["after"])
+    return [{"analysis": "pupil_epochs", "event": event, "before": before, "after": after}
+            for event in args.epochs or []]
+
+def add_analysis_options(parser):
+    """
+    Add the options shared by the `run` and `batch` commands.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser of the command.
+    """
+    parser.add_argument("--start", help="name of the start event")
+    parser.add_argument("--end", help="name of the end event")
+    parser.add_argument("--occurrences", choices=OCCURRENCES,
+                        help="analyse the window from the first start event to the first end event ('first', the "
+                             "default) or every window between an occurrence of the start event and the end event "
+                             "closing it ('all')")
+    parser.add_argument("--bin", type=parse_bin, help="time bin in seconds, or 'all'")
+    parser.add_argument("--colour", help="plot colour (default: blue)")
+    parser.add_argument("--plan", type=parse_plan,
+                        help="JSON or YAML analysis plan: run only the analyses it lists (--start, --end, "
+                             "--occurrences and --colour override the plan; --bin and the gaze options are not used)")
+    parser.add_argument("--epochs", action="append", metavar="EVENT",
+                        help="also plot the pupil diameter locked to every occurrence of EVENT (repeatable)")
+    parser.add_argument("--epoch-window", type=float, nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="seconds kept before and after each event of --epochs (default: 1 3)")
+    parser.add_argument("--no-cache", action="store_true", help="read the CSV files without the columnar cache")
+    parser.add_argument("--gaze-mode", choices=GAZE_MODES, default="paths", help="gaze plots to draw")
+    parser.add_argument("--gaze-tolerance", type=float, help="gaze path simplification tolerance in pixels")
+    parser.add_argument("--heatmap-sigma", type=float, help="Gaussian smoothing of the heatmap in pixels")
+    parser.add_argument("--heatmap-fixations", action="store_true",
+                        help="build the heatmap from fixations weighted by duration")
+    parser.add_argument("--force", action="store_true", help="render every plot again, even the unchanged ones")
+    parser.add_argument("--stats-only", action="store_true",
+                        help="only compute the per-interval and per-bin statistics and save them as tables")
+    parser.add_argument("--format", choices=TABLE_FORMATS, default="csv",
+                        help="format of the statistics tables (default: csv)")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="profile the run with cProfile ('cpu'), tracemalloc ('memory') or both ('all') and add "
+                             "the results to the run report")
+
+def build_parser():
+    """
+    Build the command line parser.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Parser of the `neopupil` command.
+    """
+    parser = argparse.ArgumentParser(prog="neopupil", description="Headless NeoPupil analysis.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="analyse one recording and save its plots")
+    run.add_argument("--recording", required=True, help="folder of the Pupil Cloud Time Series export")
+    run.add_argument("--output", help="output folder (default: RECORDING/plots)")
+    run.add_argument("--workers", type=int,
+                     help="number of rendering processes (default: number of CPUs up to 4, "
+                          f"here {DEFAULT_RENDER_WORKERS})")
+    add_analysis_options(run)
+
+    batch = commands.add_parser("batch", help="analyse every recording found under a root folder")
+    batch.add_argument("--root", required=True, help="folder searched recursively for recordings")
+    batch.add_argument("--output", help="output folder, one subfolder per recording (default: ROOT/neopupil_plots)")
+    batch.add_argument("--jobs", type=int, help="number of recordings analysed in parallel (default: number of CPUs)")
+    batch.add_argument("--no-resume", dest="resume", action="store_false",
+                       help="analyse every recording again, ignoring the checkpoint manifest")
+    add_analysis_options(batch)
+    return parser
+
+def run_recording(args, cancel_event=None):
+    """
+    Analyse one recording without any dialog.
+
+    Every message of the pipeline is written to stderr so that stdout only
+    carries the summary.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Options of the `run` command.
+    cancel_event : threading.Event, optional
+        Event set to stop the pipeline between stages (default is None).
+
+    Returns
+    -------
+    tuple
+        `(summary, exit_code)` where `summary` is a JSON-serialisable dict
+        with the keys 'status', 'recording', 'output', 'start', 'end',
+        'occurrences', 'bin',
+        'plots', 'skipped' (number of unchanged plots not rendered again),
+        'tables' (statistics tables written), 'failures', 'stages' (seconds
+        spent in each stage), 'report' (path of the run report saved in the
+        output folder, see `instrumentation.RunReport`), 'elapsed_s' and
+        'error'.
+    """
+    output = args.output or os.path.join(args.recording, "plots")
+    colour = args.colour or "blue"
+    summary = {
+        "status": "ok",
+        "recording": os.path.abspath(args.recording),
+        "output": os.path.abspath(output),
+        "start": args.start,
+        "end": args.end,
+        "occurrences": args.occurrences or "first",
+        "bin": args.bin,
+        "plots": [],
+        "skipped": 0,
+        "tables": [],
+        "failures": [],
+        "stages": {},
+        "report": None,
+        "elapsed_s": None,
+        "error": None,
+    }
+    code = EXIT_OK
+    t0 = time.perf_counter()
+
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            files = recording_files(args.recording)
+            epochs = epoch_analyses(args)
+            if args.stats_only:
+                result = run_plan(statistics_plan(args.start, args.end, args.bin, args.format, summary["occurrences"]),
+                                  files, output,
+                                  use_cache=not args.no_cache, workers=args.workers, cancel_event=cancel_event,
+                                  profile=args.profile)
+            elif args.plan is not None:
+                plan = dict(args.plan)
+                plan.update({key: value for key, value in (("start_event", args.start), ("end_event", args.end),
+                                                           ("occurrences", args.occurrences),
+                                                           ("colour", args.colour)) if value})
+                plan["analyses"] = plan["analyses"] + epochs
+                summary["occurrences"] = plan["occurrences"]
+                result = run_plan(plan, files, output, use_cache=not args.no_cache, workers=args.workers,
+                                  cancel_event=cancel_event, force=args.force, profile=args.profile)
+            elif epochs:
+                # The default analyses and the epochs, as one plan
+                plan = default_plan(args.start, args.end, colour, args.bin, args.gaze_mode, args.gaze_tolerance,
+                                    args.heatmap_sigma, args.heatmap_fixations, summary["occurrences"])
+                plan["analyses"] += epochs
+                result = run_plan(plan, files, output, use_cache=not args.no_cache, workers=args.workers,
+                                  cancel_event=cancel_event, force=args.force, profile=args.profile)
+            else:
+                import main_plots as main
+                result = main.run_pipeline(
+                    blinks_file=files["blinks"],
+                    pupil_file=files["pupil"],
+                    events_file=files["events"],
+                    fixations_file=files["fixations"],
+                    gaze_file=files["gaze"],
+                    saccades_file=files["saccades"],
+                    output_folder=output,
+                    start_event=args.start,
+                    end_event=args.end,
+                    colour=colour,
+                    time=args.bin,
+                    use_cache=not args.no_cache,
+                    workers=args.workers,
+                    gaze_tolerance=args.gaze_tolerance,
+                    gaze_mode=args.gaze_mode,
+                    heatmap_sigma=args.heatmap_sigma,
+                    heatmap_fixations=args.heatmap_fixations,
+                    cancel_event=cancel_event,
+                    force=args.force,
+                    profile=args.profile,
+                    occurrences=summary["occurrences"]
+                )
+        summary["plots"] = sorted(set(result["plots"]))
+        summary["skipped"] = len(result["skipped"])
+        summary["tables"] = result.get("tables", [])
+        summary["stages"] = result["report"].to_dict()["stages"]
+        print(f"📊 {result['report'].summary()}", file=sys.stderr)
+        summary["failures"] = [{"plot": name, "message": message}
+                               for name, message in result.get("blink_failures", []) + result["failures"]]
+        if not result.get("interval", True):
+            summary["status"], code = "error", EXIT_ERROR
+            summary["error"] = "One of the start or end events does not exist."
+        elif summary["failures"]:
+            summary["status"], code = "partial", EXIT_PARTIAL
+    except GenerationCancelled as e:
+        summary["status"], summary["error"], code = "cancelled", str(e), EXIT_CANCELLED
+    except FileNotFoundError as e:
+        summary["status"], summary["error"], code = "error", str(e), EXIT_USAGE
+    except Exception as e:
+        summary["status"], summary["error"], code = "error", f"{type(e).__name__}: {e}", EXIT_ERROR
+
+    if os.path.exists(os.path.join(output, REPORT_FILE)):
+        summary["report"] = os.path.abspath(os.path.join(output, REPORT_FILE))
+    summary["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    return summary, code
+
+def main_cli(argv=None):
+    """
+    Entry point of `python -m neopupil`.
+
+    Prints a one-line JSON summary on stdout. SIGINT and SIGTERM stop the
+    pipeline at the next stage (in batch mode, pending recordings are skipped).
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        Command line arguments (default is `sys.argv[1:]`).
+
+    Returns
+    -------
+    int
+        Exit code: 0 on success, 1 on analysis error, 2 on usage error or
+        missing input, 3 if some plots (or, in batch mode, some recordings)
+        failed, 130 if cancelled.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.plan is None or args.stats_only) and not (args.start and args.end and args.bin):
+        parser.error("--start, --end and --bin are required unless a --plan is given")
+    if args.epochs and args.stats_only:
+        parser.error("--epochs draws plots and cannot be combined with --stats-only")
+
+    cancel_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: cancel_event.set())
+
+    if args.command == "batch":
+        from batch import run_batch
+        summary, code = run_batch(args, cancel_event)
+    else:
+        summary, code = run_recording(args, cancel_event)
+    print(json.dumps(summary, ensure_ascii=False))
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
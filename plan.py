@@ -0,0 +1,619 @@
+import os
+import json
+import contextlib
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import SWEEP_ALL, STREAM_COLUMNS, load_time_widths
+from loaders import write_table, iter_stream_window, TABLE_FORMATS
+from intervals import (aggregate_intervals, aggregate_bins, PrefixIndex, EventIndex, OCCURRENCES,
+                       NS_PER_S, duration_stream, pupil_stream)
+from instrumentation import RunReport
+from session import GenerationCancelled, load_stream, load_window
+from epochs import EPOCH_RATE_HZ
+
+EVENT_STREAMS = ("blinks", "fixations", "saccades")
+# Streams of the statistics tables: the event streams and the mean pupil diameter
+TABLE_STREAMS = EVENT_STREAMS + ("pupils",)
+# Label used in the file names of the time-binned plots
+BINNED_LABELS = {"blinks": "blink", "fixations": "fixation", "saccades": "saccade"}
+
+# Options of every analysis, with their default value (None: required)
+ANALYSES = {
+    "blink_plots": {},
+    "mean_std": {"streams": list(EVENT_STREAMS)},
+    "frequency": {"streams": list(EVENT_STREAMS)},
+    "time_binned": {"streams": list(EVENT_STREAMS), "bins": None},
+    "gaze_paths": {"tolerance": None},
+    "gaze_heatmap": {"sigma": None, "fixations": False, "cell_px": 10},
+    "pupil_binned": {"bins": None},
+    "pupil_events": {},
+    "interval_table": {"streams": list(TABLE_STREAMS), "format": "csv"},
+    "binned_table": {"streams": list(TABLE_STREAMS), "bins": None, "format": "csv"},
+    "pupil_epochs": {"event": None, "before": 1.0, "after": 3.0, "baseline": [-0.5, 0.0], "rate": EPOCH_RATE_HZ,
+                     "ci": 0.95},
+}
+# Statistics tables written by the table analyses, without the extension
+TABLE_FILES = {"interval_table": "interval_statistics", "binned_table": "binned_statistics"}
+REQUIRED_OPTIONS = {"time_binned": ("bins",), "pupil_binned": ("bins",), "binned_table": ("bins",),
+                    "pupil_epochs": ("event",)}
+# Analyses computed between the start and end events, and those using the plot colour
+INTERVAL_ANALYSES = {"mean_std", "frequency", "time_binned", "gaze_paths", "gaze_heatmap", "pupil_binned",
+                     "pupil_events", "interval_table", "binned_table"}
+COLOURED_ANALYSES = {"blink_plots", "mean_std", "frequency", "time_binned", "gaze_paths", "pupil_binned",
+                     "pupil_events", "pupil_epochs"}
+
+def load_plan(path, check_context=True):
+    """
+    Read an analysis plan from a JSON or YAML file.
+
+    Parameters
+    ----------
+    path : str
+        Path to a `.json`, `.yaml` or `.yml` file.
+    check_context : bool, optional
+        Check that the plan gives the events and colour its analyses need
+        (default is True). Disable it when they are filled in afterwards.
+
+    Returns
+    -------
+    dict
+        The plan, validated by `normalise_plan`.
+
+    Raises
+    ------
+    ImportError
+        If the file is YAML and PyYAML is not installed.
+    ValueError
+        If the plan is not valid.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required to read YAML plans (pip install pyyaml), or use JSON.")
+            plan = yaml.safe_load(f)
+        else:
+            plan = json.load(f)
+    return normalise_plan(plan, check_context)
+
+def normalise_plan(plan, check_context=True):
+    """
+    Validate an analysis plan and fill in the default options.
+
+    A plan is a dict with the optional keys 'start_event', 'end_event',
+    'occurrences' ("first" or "all", see `intervals.EventIndex.windows`) and
+    'colour', and an 'analyses' list. Each analysis is either a name of
+    `ANALYSES` or a dict with an 'analysis' name and its options, e.g.::
+
+        {"start_event": "recording.begin", "end_event": "recording.end", "colour": "blue",
+         "analyses": ["blink_plots",
+                      {"analysis": "time_binned", "streams": ["fixations"], "bins": [5, 10]},
+                      {"analysis": "gaze_heatmap", "sigma": 20}]}
+
+    Parameters
+    ----------
+    plan : dict
+        Plan to validate.
+    check_context : bool, optional
+        Check that the events and colour needed by the analyses are given
+        (default is True).
+
+    Returns
+    -------
+    dict
+        A new plan where every analysis is a dict with all its options.
+
+    Raises
+    ------
+    ValueError
+        If an analysis, an option, a stream or the occurrences are unknown, a
+        required option is missing, or the events or colour needed by an
+        analysis are missing.
+    """
+    if not isinstance(plan, dict) or not isinstance(plan.get("analyses"), list):
+        raise ValueError("A plan must be a mapping with an 'analyses' list.")
+    unknown = set(plan) - {"start_event", "end_event", "occurrences", "colour", "analyses"}
+    if unknown:
+        raise ValueError(f"Unknown plan key(s): {', '.join(sorted(unknown))}.")
+    occurrences = plan.get("occurrences") or "first"
+    if occurrences not in OCCURRENCES:
+        raise ValueError(f"Unknown occurrences '{occurrences}', expected one of {OCCURRENCES}.")
+
+    analyses = []
+    for item in plan["analyses"]:
+        item = {"analysis": item} if isinstance(item, str) else dict(item)
+        name = item.pop("analysis", None)
+        if name not in ANALYSES:
+            raise ValueError(f"Unknown analysis '{name}', expected one of {', '.join(ANALYSES)}.")
+        extra = set(item) - set(ANALYSES[name])
+        if extra:
+            raise ValueError(f"Unknown option(s) for '{name}': {', '.join(sorted(extra))}.")
+        options = {**ANALYSES[name], **item}
+        for option in REQUIRED_OPTIONS.get(name, ()):
+            if options[option] is None:
+                raise ValueError(f"The analysis '{name}' requires the option '{option}'.")
+        streams = TABLE_STREAMS if name in TABLE_FILES else EVENT_STREAMS
+        for stream in options.get("streams", ()):
+            if stream not in streams:
+                raise ValueError(f"Unknown stream '{stream}' for '{name}', expected one of {', '.join(streams)}.")
+        if options.get("format", "csv") not in TABLE_FORMATS:
+            raise ValueError(f"Unknown table format '{options['format']}', expected one of {TABLE_FORMATS}.")
+        if "bins" in options:
+            bins = options["bins"]
+            options["bins"] = bins if bins == SWEEP_ALL else [bins] if not isinstance(bins, list) else bins
+        analyses.append({"analysis": name, **options})
+
+    names = {item["analysis"] for item in analyses} if check_context else set()
+    if names & INTERVAL_ANALYSES and not (plan.get("start_event") and plan.get("end_event")):
+        raise ValueError("The start and end events must be given for the analyses between events.")
+    if names & COLOURED_ANALYSES and not plan.get("colour"):
+        raise ValueError("A colour must be given to draw the plots.")
+    return {"start_event": plan.get("start_event"), "end_event": plan.get("end_event"),
+            "occurrences": occurrences, "colour": plan.get("colour"), "analyses": analyses}
+
+def default_plan(start_event, end_event, colour, time, gaze_mode="paths", gaze_tolerance=None,
+                 heatmap_sigma=None, heatmap_fixations=False, occurrences="first"):
+    """
+    Describe the analyses run by `main_plots.run_pipeline` as a plan.
+
+    Parameters
+    ----------
+    start_event : str
+        Name of the starting event.
+    end_event : str
+        Name of the ending event.
+    colour : str
+        Plot colour.
+    time : int or float or str
+        Time bin size in seconds, or "all".
+    gaze_mode : {"paths", "heatmap", "both"}, optional
+        Gaze plots to draw (default is "paths").
+    gaze_tolerance : float, optional
+        Gaze path simplification tolerance in pixels (default is None).
+    heatmap_sigma : float, optional
+        Gaussian smoothing of the heatmap in pixels (default is None).
+    heatmap_fixations : bool, optional
+        Build the heatmap from the fixations (default is False).
+    occurrences : {"first", "all"}, optional
+        Analyse the first window or every window between the events
+        (default is "first").
+
+    Returns
+    -------
+    dict
+        Validated plan.
+    """
+    analyses = ["blink_plots", "mean_std", "frequency", {"analysis": "time_binned", "bins": time}]
+    if gaze_mode in ("paths", "both"):
+        analyses.append({"analysis": "gaze_paths", "tolerance": gaze_tolerance})
+    if gaze_mode in ("heatmap", "both"):
+        analyses.append({"analysis": "gaze_heatmap", "sigma": heatmap_sigma, "fixations": heatmap_fixations})
+    analyses += [{"analysis": "pupil_binned", "bins": time}, "pupil_events"]
+    return normalise_plan({"start_event": start_event, "end_event": end_event, "occurrences": occurrences,
+                           "colour": colour, "analyses": analyses})
+
+def statistics_plan(start_event, end_event, time, fmt="csv", occurrences="first"):
+    """
+    Plan computing the statistics behind every plot, without any figure.
+
+    Parameters
+    ----------
+    start_event : str
+        Name of the starting event.
+    end_event : str
+        Name of the ending event.
+    time : int or float or str
+        Time bin size in seconds, or "all".
+    fmt : {"csv", "parquet"}, optional
+        Format of the tables (default is "csv").
+    occurrences : {"first", "all"}, optional
+        Analyse the first window or every window between the events
+        (default is "first").
+
+    Returns
+    -------
+    dict
+        Validated plan writing the per-interval and per-bin tables.
+    """
+    return normalise_plan({"start_event": start_event, "end_event": end_event, "occurrences": occurrences,
+                           "analyses": [{"analysis": "interval_table", "format": fmt},
+                                        {"analysis": "binned_table", "bins": time, "format": fmt}]})
+
+def draws_plots(plan):
+    """
+    Tell whether a plan draws figures, or only writes statistics tables.
+
+    Parameters
+    ----------
+    plan : dict
+        Plan returned by `normalise_plan`.
+
+    Returns
+    -------
+    bool
+        True if one of its analyses is not a table analysis.
+    """
+    return any(item["analysis"] not in TABLE_FILES for item in plan["analyses"])
+
+def run_graph(tasks, max_workers=None, cancel_event=None):
+    """
+    Run a set of tasks with dependencies, the independent ones concurrently.
+
+    Parameters
+    ----------
+    tasks : dict
+        Mapping of task name to a `(dependencies, func)` tuple. `func` is
+        called with the dict of the results of the tasks finished so far,
+        once all its dependencies are finished.
+    max_workers : int, optional
+        Number of threads (default is chosen by `ThreadPoolExecutor`).
+    cancel_event : threading.Event, optional
+        When set, no new task is started and `session.GenerationCancelled`
+        is raised (default is None).
+
+    Returns
+    -------
+    dict
+        Result of every task, by name.
+
+    Raises
+    ------
+    ValueError
+        If a dependency is unknown or the dependencies form a cycle.
+    Exception
+        The first exception raised by a task; the tasks not started yet are
+        cancelled.
+    """
+    for name, (deps, _) in tasks.items():
+        missing = set(deps) - set(tasks)
+        if missing:
+            raise ValueError(f"Task '{name}' depends on unknown task(s): {', '.join(sorted(missing))}.")
+
+    results = {}
+    pending = dict(tasks)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            if cancel_event is not None and cancel_event.is_set():
+                for future in running:
+                    future.cancel()
+                raise GenerationCancelled("Generation cancelled.")
+
+            ready = [name for name, (deps, _) in pending.items() if all(dep in results for dep in deps)]
+            for name in ready:
+                _, func = pending.pop(name)
+                running[pool.submit(func, results)] = name
+            if not running:
+                raise ValueError(f"Cyclic dependencies between task(s): {', '.join(sorted(pending))}.")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+    return results
+
+def _interval(r):
+    """Span of the windows between the events, from the first start to the last end."""
+    windows = r["windows"]
+    return windows["start"].min(), windows["end"].max()
+
+def _binned_windows(r):
+    """Windows binned from their own start, or None for a single window binned over the interval."""
+    return r["windows"] if len(r["windows"]) > 1 else None
+
+def _window(path, name, use_cache, r):
+    """Read the gaze or pupil samples of the interval."""
+    start_ts, end_ts = r["interval"]
+    return load_window(path, name, start_ts, end_ts, use_cache)
+
+def _epoch_samples(path, epochs, use_cache, r):
+    """Read the pupil samples around every occurrence of the events of the epoch analyses, at once."""
+    bounds = []
+    for item in epochs:
+        onsets = r["event_index"].occurrences(item["event"])
+        if len(onsets):
+            bounds += [onsets[0] - int(item["before"] * NS_PER_S), onsets[-1] + int(item["after"] * NS_PER_S)]
+    start_ts, end_ts = (min(bounds), max(bounds)) if bounds else (0, 0)
+    return load_window(path, "pupil", start_ts, end_ts, use_cache)
+
+def _event_stats(streams, r):
+    """Aggregate the requested streams between every pair of events, in one pass."""
+    data = {stream: duration_stream(r[f"load:{stream}"]) for stream in streams if stream != "pupils"}
+    if "pupils" in streams:
+        data["pupils"] = pupil_stream(r["window:pupil"])
+    return aggregate_intervals(data, r["pairs"])
+
+def build_tasks(plan, files, output_folder, scheduler, use_cache=True):
+    """
+    Translate a plan into the tasks it needs, and only those.
+
+    Shared work (file loads, the event index and windows, the statistics
+    between events and the prefix-sum indexes) becomes one task that every
+    analysis using it depends on.
+
+    Parameters
+    ----------
+    plan : dict
+        Plan returned by `normalise_plan`.
+    files : dict
+        Path of every input file by stream, see `config.RECORDING_FILES`.
+    output_folder : str
+        Folder where the plots are saved.
+    scheduler : rendering.RenderScheduler or None
+        Scheduler receiving the figure jobs; None when the plan only
+        writes tables.
+    use_cache : bool, optional
+        Read the CSV files through the columnar cache (default is True).
+
+    Returns
+    -------
+    dict
+        Tasks in the format of `run_graph`. Analysis tasks are named
+        'analysis:<index>:<name>'; the table analyses return the path of
+        the file they wrote and the epoch analyses the shape of their
+        events x samples matrix.
+    """
+    if draws_plots(plan):
+        # The plotting functions bring in matplotlib: tables-only plans never import them
+        import main_plots as main
+    colour = plan["colour"]
+    tasks = {}
+
+    def need(name, deps, func):
+        tasks.setdefault(name, (tuple(deps), func))
+        return name
+
+    def load(stream):
+        return need(f"load:{stream}", (), lambda r: load_stream(files[stream], stream, use_cache))
+
+    def event_index():
+        return need("event_index", (load("events"),), lambda r: EventIndex(r["load:events"]))
+
+    def windows():
+        return need("windows", (event_index(),),
+                    lambda r: r["event_index"].windows(plan["start_event"], plan["end_event"], plan["occurrences"]))
+
+    def interval():
+        return need("interval", (windows(),), _interval)
+
+    def window(stream):
+        return need(f"window:{stream}", (interval(),), partial(_window, files[stream], stream, use_cache))
+
+    def pairs():
+        return need("pairs", (event_index(), windows()), lambda r: r["event_index"].pairs(r["windows"]))
+
+    def index(stream):
+        if stream in ("pupil", "pupils"):
+            return need("index:pupil", (window("pupil"),), lambda r: PrefixIndex(*pupil_stream(r["window:pupil"])))
+        return need(f"index:{stream}", (load(stream),),
+                    lambda r: PrefixIndex(*duration_stream(r[f"load:{stream}"])))
+
+    # Streams aggregated between events, shared by every analysis that uses them
+    stats_streams = []
+    for item in plan["analyses"]:
+        if item["analysis"] in ("mean_std", "frequency"):
+            stats_streams += [s for s in item["streams"] if s not in stats_streams]
+        elif item["analysis"] == "pupil_events" and "pupils" not in stats_streams:
+            stats_streams.append("pupils")
+        elif item["analysis"] == "interval_table":
+            stats_streams += [s for s in item["streams"] if s not in stats_streams]
+
+    def event_stats():
+        deps = [pairs()] + [load(s) if s != "pupils" else window("pupil") for s in stats_streams]
+        return need("event_stats", deps, partial(_event_stats, stats_streams))
+
+    epochs = [item for item in plan["analyses"] if item["analysis"] == "pupil_epochs"]
+
+    def epoch_samples():
+        return need("epoch_samples", (event_index(),), partial(_epoch_samples, files["pupil"], epochs, use_cache))
+
+    def widths(bins):
+        return load_time_widths() if bins == SWEEP_ALL else bins
+
+    for i, item in enumerate(plan["analyses"]):
+        kind = item["analysis"]
+        name = f"analysis:{i}:{kind}"
+
+        if kind == "blink_plots":
+            need(name, (load("blinks"), load("events")),
+                 lambda r: main.blink_plots(r["load:blinks"], r["load:events"], output_folder, colour, scheduler))
+
+        elif kind in ("mean_std", "frequency"):
+            plot = (main.generate_mean_std_plot_between_events if kind == "mean_std"
+                    else main.generate_frequency_plot_between_events)
+            deps = [event_stats(), interval()] + [load(s) for s in item["streams"]]
+
+            def run(r, plot=plot, streams=item["streams"]):
+                stats = r["event_stats"]
+                for stream in streams:
+                    plot(r[f"load:{stream}"], r["load:events"], *r["interval"], stream, output_folder, colour,
+                         stats=stats[stats["stream"] == stream], scheduler=scheduler)
+            need(name, deps, run)
+
+        elif kind == "time_binned":
+            deps = [interval()] + [load(s) for s in item["streams"]] + [index(s) for s in item["streams"]]
+
+            def run(r, item=item):
+                for width in widths(item["bins"]):
+                    for stream in item["streams"]:
+                        main.generate_time_binned_plots(r[f"load:{stream}"], BINNED_LABELS[stream], *r["interval"],
+                                                        output_folder, colour, width, index=r[f"index:{stream}"],
+                                                        scheduler=scheduler, windows=_binned_windows(r))
+            need(name, deps, run)
+
+        elif kind == "gaze_paths":
+            need(name, (window("gaze"), load("events"), interval(), pairs()),
+                 lambda r, item=item: main.gaze_plot(r["window:gaze"], r["load:events"], *r["interval"], "gaze",
+                                                     output_folder, colour, scheduler=scheduler,
+                                                     tolerance=item["tolerance"], pairs=r["pairs"]))
+
+        elif kind == "gaze_heatmap":
+            # The gaze window is shared with the gaze paths; without them the samples are streamed
+            in_memory = not item["fixations"] and any(other["analysis"] == "gaze_paths" for other in plan["analyses"])
+            deps = [load("events"), interval(), pairs()]
+            deps += [load("fixations")] if item["fixations"] else [window("gaze")] if in_memory else []
+
+            def run(r, item=item, in_memory=in_memory):
+                chunks = None
+                if not item["fixations"] and not in_memory:
+                    chunks = iter_stream_window(files["gaze"], STREAM_COLUMNS["gaze"], "timestamp [ns]",
+                                                *r["interval"], use_cache)
+                main.gaze_heatmap(r.get("window:gaze"), r["load:events"], *r["interval"], "gaze", output_folder,
+                                  fixations_df=r["load:fixations"] if item["fixations"] else None,
+                                  sigma=item["sigma"], cell_px=item["cell_px"], scheduler=scheduler, pairs=r["pairs"],
+                                  chunks=chunks)
+            need(name, deps, run)
+
+        elif kind == "pupil_binned":
+            def run(r, item=item):
+                for width in widths(item["bins"]):
+                    main.pupils_diameter_time_binned_plot(r["window:pupil"], r["load:events"], *r["interval"],
+                                                          "pupils", output_folder, colour, width,
+                                                          index=r["index:pupil"], scheduler=scheduler,
+                                                          windows=_binned_windows(r))
+            need(name, (window("pupil"), load("events"), interval(), index("pupil")), run)
+
+        elif kind == "interval_table":
+            def run(r, item=item):
+                stats = r["event_stats"]
+                table = stats[stats["stream"].isin(item["streams"])]
+                return write_table(table, os.path.join(output_folder, TABLE_FILES["interval_table"]), item["format"])
+            need(name, (event_stats(),), run)
+
+        elif kind == "binned_table":
+            def run(r, item=item):
+                indexes = {stream: r["index:pupil" if stream == "pupils" else f"index:{stream}"]
+                           for stream in item["streams"]}
+                table = aggregate_bins(indexes, *r["interval"], widths(item["bins"]), windows=r["windows"])
+                return write_table(table, os.path.join(output_folder, TABLE_FILES["binned_table"]), item["format"])
+            need(name, [interval()] + [index(s) for s in item["streams"]], run)
+
+        elif kind == "pupil_epochs":
+            def run(r, item=item):
+                baseline = tuple(item["baseline"]) if item["baseline"] is not None else None
+                result = main.pupil_epochs_plot(r["epoch_samples"], r["load:events"], item["event"], "pupils",
+                                                output_folder, colour, item["before"], item["after"], baseline,
+                                                item["rate"], item["ci"], scheduler=scheduler)
+                return None if result is None else result[1].shape
+            need(name, (epoch_samples(), load("events")), run)
+
+        elif kind == "pupil_events":
+            def run(r):
+                stats = r["event_stats"]
+                main.pupils_diameter_plot_between_events(r["window:pupil"], r["load:events"], *r["interval"],
+                                                         "pupils", output_folder, colour,
+                                                         stats=stats[stats["stream"] == "pupils"],
+                                                         scheduler=scheduler)
+            need(name, (window("pupil"), load("events"), interval(), event_stats()), run)
+
+    return tasks
+
+def run_plan(plan, files, output_folder, use_cache=True, workers=None, threads=None, cancel_event=None, force=False,
+             profile=None):
+    """
+    Run the analyses of a plan and save their plots.
+
+    Only the loads and aggregates needed by the requested analyses are
+    computed; independent tasks run concurrently in threads and the figures
+    are rendered on the process pool of a `rendering.RenderScheduler`. A
+    plan writing only tables (see `draws_plots`) never imports matplotlib.
+
+    Parameters
+    ----------
+    plan : dict
+        Plan to run, see `normalise_plan`.
+    files : dict
+        Path of every input file by stream, see `config.RECORDING_FILES`.
+    output_folder : str
+        Directory path where generated plots will be saved.
+    use_cache : bool, optional
+        Read the CSV files through the columnar cache (default is True).
+    workers : int, optional
+        Number of rendering processes (default is
+        `config.DEFAULT_RENDER_WORKERS`, the number of CPUs up to 4).
+    threads : int, optional
+        Number of threads running the tasks (default is chosen by
+        `ThreadPoolExecutor`).
+    cancel_event : threading.Event, optional
+        When set, no new task is started and pending figures are not
+        rendered (default is None).
+    force : bool, optional
+        Render every plot again instead of skipping the unchanged ones
+        (default is False).
+    profile : {"cpu", "memory", "all"}, optional
+        Profile the run, see `main_plots.run_pipeline` (default is None).
+
+    Returns
+    -------
+    dict
+        'plots', 'skipped', 'failures' and 'report' as in
+        `main_plots.run_pipeline`, 'tables', the paths of the statistics
+        tables written, and 'tasks', the names of the tasks that were run.
+        Every task is timed in the run report.
+
+    Raises
+    ------
+    session.GenerationCancelled
+        If the generation was cancelled.
+    ValueError
+        If the plan is not valid or its events are not found.
+    """
+    plan = normalise_plan(plan)
+    os.makedirs(output_folder, exist_ok=True)
+    report = RunReport(profile)
+    report.start()
+    status = "error"
+    failures = []
+    if draws_plots(plan):
+        from rendering import RenderScheduler
+        rendering = RenderScheduler(workers, output_folder, force)
+    else:
+        rendering = contextlib.nullcontext()
+    with rendering as scheduler:
+        try:
+            report.enter("Running tasks")
+            tasks = build_tasks(plan, files, output_folder, scheduler, use_cache)
+            tasks = {name: (deps, report.timed(f"task {name}", func)) for name, (deps, func) in tasks.items()}
+            print(f"🧩 Running {len(tasks)} task(s) for {len(plan['analyses'])} analysis(es)...")
+            results = run_graph(tasks, threads, cancel_event)
+            for name, value in results.items():
+                kind, _, stream = name.partition(":")
+                if kind in ("load", "window"):
+                    report.scanned(stream, len(value))
+                elif kind == "epoch_samples":
+                    report.scanned("pupil", len(value))
+                elif name.endswith(":pupil_epochs") and value is not None:
+                    report.count("epochs", value[0])
+            if "windows" in results:
+                report.count("windows", len(results["windows"]))
+            if "pairs" in results:
+                report.count("intervals", len(results["pairs"]))
+            tables = [results[name] for name in sorted(tasks) if name.split(":")[-1] in TABLE_FILES]
+            for path in tables:
+                print(f"📄 Statistics saved to {path}")
+
+            if scheduler is not None and scheduler.jobs:
+                report.enter("Rendering plots")
+                print(f"🖼 Rendering {len(scheduler.jobs)} plot(s) on {scheduler.workers} process(es)...")
+                failures = scheduler.run(cancel_event)
+            if cancel_event is not None and cancel_event.is_set():
+                raise GenerationCancelled("Generation cancelled.")
+            status = "ok"
+        except GenerationCancelled:
+            status = "cancelled"
+            raise
+        finally:
+            if scheduler is not None:
+                report.record_figures(scheduler, failures)
+            report.finish(status)
+            report.save(output_folder)
+        return {"plots": list(scheduler.rendered) if scheduler is not None else [],
+                "skipped": list(scheduler.skipped) if scheduler is not None else [], "failures": failures,
+                "tables": tables, "tasks": sorted(tasks), "report": report}
@@ -0,0 +1,607 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+import matplotlib
+# Figures are only written to files, and may be drawn in a worker thread of the
+# GUI: select the non-interactive backend before pyplot is imported
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import DEFAULT_RENDER_WORKERS
+
+INDEX_FILE = ".neopupil_index.json"
+# Bump when a rendering function changes, so that every image is rebuilt
+INDEX_VERSION = 1
+
+def _feed(digest, value):
+    """Feed a job argument into a hash, recursively for containers."""
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        digest.update(f"ndarray{value.dtype.str}{value.shape}".encode())
+        digest.update(value.data if value.dtype != object else repr(value.tolist()).encode())
+    elif isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        digest.update(f"{type(value).__name__}{list(getattr(value, 'columns', []))}".encode())
+        digest.update(pd.util.hash_pandas_object(value, index=not isinstance(value, pd.Index)).to_numpy().data)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _feed(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+def job_digest(func, args, kwargs):
+    """
+    Hash a figure job: its rendering function, its data and its parameters.
+
+    Parameters
+    ----------
+    func : callable
+        Rendering function.
+    args : tuple
+        Positional arguments of `func`.
+    kwargs : dict
+        Keyword arguments of `func`.
+
+    Returns
+    -------
+    str
+        BLAKE2b hex digest. Two jobs with the same digest draw the same image.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    _feed(digest, (INDEX_VERSION, func.__module__, func.__qualname__, args, kwargs))
+    return digest.hexdigest()
+
+def _finish_figure(path, fig=None, layout=True):
+    """
+    Lay out, save and close a figure (the current one by default). Returns
+    the seconds spent in `tight_layout` ('layout_s') and `savefig` ('save_s').
+    """
+    fig = fig if fig is not None else plt.gcf()
+    t0 = time.perf_counter()
+    if layout:
+        fig.tight_layout()
+    t1 = time.perf_counter()
+    fig.savefig(path)
+    t2 = time.perf_counter()
+    plt.close(fig)
+    return {"layout_s": t1 - t0, "save_s": t2 - t1}
+
+def _run_job(func, args, kwargs):
+    """
+    Render a figure job and measure it. Returns its duration, the time spent
+    in `tight_layout` and `savefig` (as returned by the rendering function),
+    and the size of the image written.
+    """
+    t0 = time.perf_counter()
+    phases = func(*args, **kwargs) or {}
+    seconds = time.perf_counter() - t0
+    try:
+        size = os.path.getsize(args[0])
+    except (OSError, IndexError, TypeError):
+        size = 0
+    return {"seconds": seconds, "layout_s": phases.get("layout_s", 0.0), "save_s": phases.get("save_s", 0.0),
+            "bytes": size}
+
+def decimate_path(x, y, tolerance):
+    """
+    Simplify a path by dropping the samples that stay in the same pixel cell.
+
+    The plane is cut into square cells of `tolerance` pixels and a sample is
+    kept only when it enters a new cell. The path therefore never moves away
+    from the original by more than one cell, which is invisible at PNG
+    resolution for a tolerance of a few pixels, while fixations collapse to a
+    handful of vertices.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        X coordinates in pixels.
+    y : numpy.ndarray
+        Y coordinates in pixels.
+    tolerance : float
+        Size of the cells in pixels.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Simplified `(x, y)`. The first and last samples are always kept.
+
+    Raises
+    ------
+    ValueError
+        If the tolerance is not strictly positive.
+    """
+    if tolerance <= 0:
+        raise ValueError("The gaze simplification tolerance must be a positive number of pixels.")
+    if len(x) < 3:
+        return x, y
+
+    cell_x = np.floor(x / tolerance)
+    cell_y = np.floor(y / tolerance)
+    keep = np.empty(len(x), dtype=bool)
+    keep[0] = keep[-1] = True
+    keep[1:-1] = (cell_x[1:-1] != cell_x[:-2]) | (cell_y[1:-1] != cell_y[:-2])
+    return x[keep], y[keep]
+
+def render_bar_plot(path, x, heights, colour, ylabel, title, figsize=(14, 6), yerr=None):
+    """
+    Draw and save a bar plot with rotated category labels.
+
+    Parameters
+    ----------
+    path : str
+        Path of the PNG file to write.
+    x : list of str
+        Bar labels.
+    heights : array-like
+        Bar heights.
+    colour : str
+        Color used for the bars.
+    ylabel : str
+        Label of the y axis.
+    title : str
+        Title of the plot.
+    figsize : tuple of float, optional
+        Size of the figure in inches (default is (14, 6)).
+    yerr : array-like, optional
+        Error bars drawn on top of each bar (default is None).
+
+    Returns
+    -------
+    dict
+        Seconds spent laying out and saving the figure, see `_finish_figure`.
+    """
+    plt.figure(figsize=figsize)
+    if yerr is not None:
+        plt.bar(x, heights, yerr=yerr, capsize=5, color=colour, alpha=0.8)
+    else:
+        plt.bar(x, heights, color=colour, alpha=0.8)
+    plt.xticks(rotation=90)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    return _finish_figure(path)
+
+def render_line_plot(path, x, y, colour, ylabel, title, figsize=(12, 6)):
+    """
+    Draw and save a line plot with rotated category labels.
+
+    Parameters
+    ----------
+    path : str
+        Path of the PNG file to write.
+    x : list of str
+        Category labels.
+    y : array-like
+        Values.
+    colour : str
+        Color used for the line.
+    ylabel : str
+        Label of the y axis.
+    title : str
+        Title of the plot.
+    figsize : tuple of float, optional
+        Size of the figure in inches (default is (12, 6)).
+
+    Returns
+    -------
+    dict
+        Seconds spent laying out and saving the figure, see `_finish_figure`.
+    """
+    plt.figure(figsize=figsize)
+    plt.plot(x, y, color=colour)
+    plt.xticks(rotation=90)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    return _finish_figure(path)
+
+def render_blink_timeline(path, ts, durations, tick_ts, tick_labels, colour):
+    """
+    Draw and save the blink durations over time, with events as x ticks.
+
+    Parameters
+    ----------
+    path : str
+        Path of the PNG file to write.
+    ts : array-like
+        Blink start timestamps in nanoseconds.
+    durations : array-like
+        Blink durations in milliseconds.
+    tick_ts : array-like
+        Event timestamps used as x ticks.
+    tick_labels : list of str
+        Event names used as x tick labels.
+    colour : str
+        Color used for the line.
+
+    Returns
+    -------
+    dict
+        Seconds spent laying out and saving the figure, see `_finish_figure`.
+    """
+    plt.figure(figsize=(15, 7))
+    plt.plot(ts, durations, "x-",color = colour)
+    plt.title("Blink duration over time")
+    plt.xlabel("Events")
+    plt.ylabel("Duration (ms)")
+    plt.grid(True)
+    plt.xticks(
+        ticks=tick_ts,
+        labels=tick_labels,
+        rotation=90,
+        ha="center"
+    )
+    return _finish_figure(path)
+
+def render_duration_histogram(path, durations, colour):
+    """
+    Draw and save the histogram of blink durations, with 10 ms bins.
+
+    Parameters
+    ----------
+    path : str
+        Path of the PNG file to write.
+    durations : array-like
+        Blink durations in milliseconds.
+    colour : str
+        Color used for the bars.
+
+    Returns
+    -------
+    dict
+        Seconds spent laying out and saving the figure, see `_finish_figure`.
+    """
+    plt.figure(figsize=(8, 5))
+    plt.hist(
+        durations,
+        bins=range(int(np.nanmin(durations)) - 10, int(np.nanmax(durations)) + 10, 10),
+        color=colour,
+        edgecolor='black'
+    )
+    plt.title("Distribution of blink durations")
+    plt.xlabel("Duration (ms)")
+    plt.ylabel("Count")
+    return _finish_figure(path)
+
+def render_gaze_path(path, x, y, colour, title):
+    """
+    Draw and save one gaze path in scene camera coordinates.
+
+    Parameters
+    ----------
+    path : str
+        Path of the PNG file to write.
+    x : array-like
+        Gaze x coordinates in pixels.
+    y : array-like
+        Gaze y coordinates in pixels.
+    colour : str
+        Color used for the path.
+    title : str
+        Title of the plot.
+
+    Returns
+    -------
+    dict
+        Seconds spent laying out and saving the figure, see `_finish_figure`.
+    """
+    fig, ax = plt.subplots()
+    ax.plot(x, y, alpha=0.7, linewidth=1,color=colour)
+    ax.set_title(title)
+    ax.set_xlabel("Gaze X [px]")
+    ax.set_ylabel("Gaze Y [px]")
+    ax.set_xlim(np.nanmin(x), np.nanmax(x))
+    ax.set_ylim(np.nanmin(y), np.nanmax(y))
+    ax.invert_yaxis()
+    return _finish_figure(path, fig, layout=False)
+
+def render_gaze_overview(path, segments, title):
+    """
+    Draw and save several gaze paths on the same axes.
+
+    Parameters
+    ----------
+    path : str
+        Path of the PNG file to write.
+    segments : list of tuple
+        One `(x, y)` tuple of coordinate arrays per path.
+    title : str
+        Title of the plot.
+
+    Returns
+    -------
+    dict
+        Seconds spent laying out and saving the figure, see `_finish_figure`.
+    """
+    fig, ax = plt.subplots()
+    for x, y in segments:
+        ax.plot(x, y, alpha=0.6, linewidth=1)
+
+    ax.set_title(title)
+    ax.set_xlabel("Gaze X [px]")
+    ax.set_ylabel("Gaze Y [px]")
+    xs = np.concatenate([x for x, _ in segments])
+    ys = np.concatenate([y for _, y in segments])
+    ax.set_xlim(np.nanmin(xs), np.nanmax(xs))
+    ax.set_ylim(np.nanmin(ys), np.nanmax(ys))
+    ax.invert_yaxis()
+    return _finish_figure(path, fig, layout=False)
+
+def render_heatmap(path, grid, extent, title, colorbar_label):
+    """
+    Draw and save a density grid over the scene camera image.
+
+    Parameters
+    ----------
+    path : str
+        Path of the PNG file to write.
+    grid : numpy.ndarray
+        Density values of shape (rows, columns).
+    extent : tuple of float
+        `(left, right, bottom, top)` of the grid in pixels.
+    title : str
+        Title of the plot.
+    colorbar_label : str
+        Label of the colour bar.
+
+    Returns
+    -------
+    dict
+        Seconds spent laying out and saving the figure, see `_finish_figure`.
+    """
+    fig, ax = plt.subplots(figsize=(8, 6))
+    image = ax.imshow(grid, extent=extent, origin="upper", cmap="inferno", interpolation="bilinear")
+    fig.colorbar(image, ax=ax, label=colorbar_label)
+    ax.set_title(title)
+    ax.set_xlabel("Gaze X [px]")
+    ax.set_ylabel("Gaze Y [px]")
+    return _finish_figure(path, fig)
+
+def render_epoch_plot(path, offsets_s, mean, low, high, colour, ylabel, title):
+    """
+    Draw and save the average of event-locked epochs with its confidence band.
+
+    Parameters
+    ----------
+    path : str
+        Path of the PNG file to write.
+    offsets_s : numpy.ndarray
+        Time of every sample relative to the event, in seconds.
+    mean : numpy.ndarray
+        Mean of the epochs.
+    low : numpy.ndarray
+        Lower bound of the confidence band.
+    high : numpy.ndarray
+        Upper bound of the confidence band.
+    colour : str
+        Color used for the line and the band.
+    ylabel : str
+        Label of the y axis.
+    title : str
+        Title of the plot.
+
+    Returns
+    -------
+    dict
+        Seconds spent laying out and saving the figure, see `_finish_figure`.
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.fill_between(offsets_s, low, high, color=colour, alpha=0.3, linewidth=0)
+    ax.plot(offsets_s, mean, color=colour)
+    ax.axvline(0, color="grey", linestyle="--", linewidth=1)
+    ax.set_xlim(offsets_s[0], offsets_s[-1])
+    ax.set_xlabel("Time from event (s)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    return _finish_figure(path, fig)
+
+class RenderScheduler:
+    """
+    Collect independent figure jobs and render them, optionally on a process pool.
+
+    Each job is a rendering function and its arguments, the first one being
+    the path of the image. Failures are collected per plot instead of aborting
+    the whole run.
+
+    When an output folder is given, the output is incremental: the digest of
+    every rendered job (see `job_digest`) is stored in a sidecar index
+    (`INDEX_FILE`) and a job whose image exists with the same digest is
+    skipped.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of rendering processes. 1 renders in the current process
+        (default is `config.DEFAULT_RENDER_WORKERS`, the number of CPUs up
+        to 4).
+    output_folder : str, optional
+        Folder holding the sidecar index (default is None, every job is rendered).
+    force : bool, optional
+        Render every job even if its image is up to date (default is False).
+
+    Attributes
+    ----------
+    workers : int
+        Number of rendering processes.
+    jobs : dict
+        Pending `(func, args, kwargs, digest)` jobs by name. A job replaces a
+        pending job of the same name, which would write the same file.
+    rendered : list of str
+        Names of the jobs whose image is up to date, rendered or skipped.
+    skipped : list of str
+        Names of the jobs skipped because their image was unchanged.
+    stats : dict
+        Measures of every job rendered, by name: its duration ('seconds'),
+        the time spent in `tight_layout` ('layout_s') and `savefig`
+        ('save_s'), and the size of its image ('bytes').
+    """
+    def __init__(self, workers=None, output_folder=None, force=False):
+        self.workers = max(1, workers or DEFAULT_RENDER_WORKERS)
+        self.jobs = {}
+        self.rendered = []
+        self.skipped = []
+        self.stats = {}
+        self.force = force
+        self.index_path = os.path.join(output_folder, INDEX_FILE) if output_folder else None
+        self.index = self._load_index()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_index(self):
+        """Read the sidecar index, or start an empty one."""
+        if self.index_path is None:
+            return None
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION and isinstance(index.get("images"), dict):
+                return index["images"]
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_index(self):
+        """Write the sidecar index atomically."""
+        folder = os.path.dirname(self.index_path)
+        if not os.path.isdir(folder):
+            return
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "images": self.index}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+
+    def submit(self, name, func, *args, **kwargs):
+        """
+        Queue a figure job, unless its image is already up to date.
+
+        Parameters
+        ----------
+        name : str
+            Name of the job, used as key of the index and reported if the job
+            fails (the path of the image relative to the output folder).
+        func : callable
+            Module-level rendering function (it must be picklable).
+        *args, **kwargs
+            Arguments passed to `func`; the first one is the path of the image.
+            Jobs may be submitted from several threads.
+        """
+        digest = job_digest(func, args, kwargs) if self.index is not None else None
+        with self._lock:
+            self.jobs.pop(name, None)
+            if digest is not None and not self.force and self.index.get(name) == digest and os.path.exists(args[0]):
+                if name not in self.skipped:
+                    self.skipped.append(name)
+                    self.rendered.append(name)
+                return
+            self.jobs[name] = (func, args, kwargs, digest)
+
+    def run(self, cancel_event=None):
+        """
+        Render every queued job.
+
+        Parameters
+        ----------
+        cancel_event : threading.Event, optional
+            When set, the jobs that have not started yet are dropped
+            (default is None).
+
+        Returns
+        -------
+        list of tuple
+            `(name, message)` of each job that failed. Failures are also printed.
+        """
+        jobs, self.jobs = self.jobs, {}
+        failures = []
+        done = []
+
+        if self.workers == 1 or len(jobs) <= 1:
+            for name, (func, args, kwargs, _) in jobs.items():
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                try:
+                    self.stats[name] = _run_job(func, args, kwargs)
+                    done.append(name)
+                except Exception as e:
+                    failures.append((name, str(e)))
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            futures = [(name, self._pool.submit(_run_job, func, args, kwargs))
+                       for name, (func, args, kwargs, _) in jobs.items()]
+            for name, future in futures:
+                if cancel_event is not None and cancel_event.is_set():
+                    for _, pending in futures:
+                        pending.cancel()
+                if future.cancelled():
+                    continue
+                try:
+                    self.stats[name] = future.result()
+                    done.append(name)
+                except BrokenProcessPool as e:
+                    failures.append((name, f"rendering process died ({e})"))
+                except Exception as e:
+                    failures.append((name, str(e)))
+            if any(not future.cancelled() and isinstance(future.exception(), BrokenProcessPool)
+                   for _, future in futures):
+                self.close()
+
+        self.rendered += done
+        if self.index is not None and jobs:
+            for name in done:
+                self.index[name] = jobs[name][3]
+            for name, _ in failures:
+                self.index.pop(name, None)
+            self._save_index()
+
+        for name, message in failures:
+            print(f"❌ Could not render {name}: {message}")
+        return failures
+
+    def close(self):
+        """
+        Shut the rendering processes down.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+def render(scheduler, name, func, *args, **kwargs):
+    """
+    Render a figure now, or queue it on a scheduler.
+
+    Parameters
+    ----------
+    scheduler : RenderScheduler or None
+        Scheduler receiving the job. When None the figure is rendered
+        immediately and errors are raised.
+    name : str
+        Name of the job (usually the output file name).
+    func : callable
+        Rendering function.
+    *args, **kwargs
+        Arguments passed to `func`.
+
+    Returns
+    -------
+    None
+    """
+    if scheduler is None:
+        func(*args, **kwargs)
+    else:
+        scheduler.submit(name, func, *args, **kwargs)
@@ -0,0 +1,344 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import RECORDING_FILES, STREAM_COLUMNS, check_schema
+
+# pandas, the loaders and the pipeline are imported by the methods running in
+# the background, so that opening a file from the window does not wait for them.
+
+# Streams loaded whole; the gaze and pupil samples are only read inside the analysed window
+SMALL_STREAMS = ("blinks", "events", "fixations", "saccades")
+
+def load_stream(path, name, use_cache=True, footprints=None):
+    """
+    Read, compact and sort one of the small streams.
+
+    This is the loading step of `main_plots.run_pipeline`, of the plans and
+    of the session, so that they all get the same dtypes and order.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+    name : str
+        Name of the stream, one of `SMALL_STREAMS`.
+    use_cache : bool, optional
+        Read the file through the columnar cache (default is True).
+    footprints : dict, optional
+        Receives the memory footprint of the stream before and after
+        compaction, as `footprints[name] = (before, after)` in bytes (default
+        is None, not measured).
+
+    Returns
+    -------
+    pandas.DataFrame
+        The columns of `config.STREAM_COLUMNS` with compact dtypes, sorted by
+        start timestamp (events keep their file order).
+    """
+    from loaders import read_csv_cached, compact_stream, memory_footprint
+    from intervals import sort_by_timestamp
+
+    raw = read_csv_cached(path, use_cache)
+    stream = compact_stream(raw, STREAM_COLUMNS[name])
+    if footprints is not None:
+        footprints[name] = (memory_footprint(raw), memory_footprint(stream))
+    if name != "events":
+        stream = sort_by_timestamp(stream, "start timestamp [ns]")
+    return stream
+
+def load_window(path, name, start_ts, end_ts, use_cache=True):
+    """
+    Read the gaze or pupil samples of a window, sorted by timestamp.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+    name : str
+        Name of the stream, 'gaze' or 'pupil'.
+    start_ts : int
+        First timestamp of the window in nanoseconds.
+    end_ts : int
+        Last timestamp of the window in nanoseconds.
+    use_cache : bool, optional
+        Read the file through the columnar cache (default is True).
+
+    Returns
+    -------
+    pandas.DataFrame
+        The columns of `config.STREAM_COLUMNS` of the samples in the window.
+    """
+    from loaders import read_stream_window
+    from intervals import sort_by_timestamp
+
+    window = read_stream_window(path, STREAM_COLUMNS[name], "timestamp [ns]", start_ts, end_ts, use_cache)
+    return sort_by_timestamp(window, "timestamp [ns]")
+
+class GenerationCancelled(Exception):
+    """
+    Raised between two stages of the pipeline when the generation is cancelled.
+    """
+
+class RecordingSession:
+    """
+    Input files of a recording, loaded once in the background and shared
+    by the event picker and the pipeline.
+
+    A file is checked against the Neon schema in a background thread as
+    soon as it is opened, then loaded by the same thread: the small streams
+    are parsed into the session memo under the keys used by
+    `main_plots.run_pipeline`, and the gaze and pupil exports are converted
+    to the columnar cache. A run of the pipeline then starts from the loaded
+    streams instead of the files.
+
+    Parameters
+    ----------
+    use_cache : bool, optional
+        Read the files through the columnar cache (default is True).
+    memo : memo.MemoCache, optional
+        Cache holding the loaded streams, passed to the pipeline (default is
+        a new `MemoCache`, created by the first load).
+
+    Attributes
+    ----------
+    files : dict
+        Path of every opened file, by stream (see `config.RECORDING_FILES`).
+    memo : memo.MemoCache
+        Cache shared with the pipeline runs of the session.
+    """
+    def __init__(self, use_cache=True, memo=None):
+        self.use_cache = use_cache
+        self._memo = memo
+        self.files = {}
+        self._loads = {}
+        self._checks = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=len(RECORDING_FILES), thread_name_prefix="neopupil-load")
+
+    @property
+    def memo(self):
+        with self._lock:
+            if self._memo is None:
+                from memo import MemoCache
+                self._memo = MemoCache()
+            return self._memo
+
+    def open(self, stream, path):
+        """
+        Check a file and load it in the background.
+
+        Parameters
+        ----------
+        stream : str
+            Name of the stream, a key of `config.RECORDING_FILES`.
+        path : str
+            Path to the CSV file. It replaces the file previously opened for
+            the stream.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Outcome of the check, done before the file is loaded: its result
+            is the path, or it raises the ValueError of a file without the
+            columns of the stream (or the OSError of a file that cannot be
+            read), in which case the previous file of the stream is put back.
+
+        Raises
+        ------
+        ValueError
+            If the stream is unknown.
+        """
+        if stream not in RECORDING_FILES:
+            raise ValueError(f"Unknown stream '{stream}', expected one of {', '.join(RECORDING_FILES)}.")
+        checked = Future()
+        with self._lock:
+            previous = (self.files.get(stream), self._loads.get(stream))
+            load = self._pool.submit(self._load, stream, path, checked, previous)
+            self.files[stream] = path
+            self._loads[stream] = load
+            self._checks[stream] = checked
+        # A load cancelled by `close` never checks its file
+        load.add_done_callback(lambda load: checked.cancel() if load.cancelled() else None)
+        return checked
+
+    def _load(self, stream, path, checked=None, previous=(None, None)):
+        """
+        Check a file, then load a small stream into the memo, or build the
+        columnar cache of a large one. Returns the memo key and the stream
+        (None for large ones).
+
+        A file failing the check is replaced by the previous file of the
+        stream, unless another file was opened since.
+        """
+        try:
+            check_schema(path, stream)
+        except Exception as e:
+            with self._lock:
+                if checked is not None and self._checks.get(stream) is checked:
+                    del self._checks[stream]
+                    previous_path, previous_load = previous
+                    if previous_path is None:
+                        del self.files[stream], self._loads[stream]
+                    else:
+                        self.files[stream], self._loads[stream] = previous_path, previous_load
+            if checked is not None:
+                checked.set_exception(e)
+            raise
+        if checked is not None:
+            checked.set_result(path)
+
+        from loaders import ensure_cache
+        from memo import source_key
+
+        key = ("stream", source_key(path), self.use_cache)
+        if stream in SMALL_STREAMS:
+            return key, self.memo.cached(key, lambda: load_stream(path, stream, self.use_cache))
+        if self.use_cache:
+            ensure_cache(path)
+        return key, None
+
+    def missing(self):
+        """
+        List the streams whose file was not opened yet.
+
+        Returns
+        -------
+        list of str
+            Streams of `config.RECORDING_FILES` without a file.
+        """
+        return [stream for stream in RECORDING_FILES if stream not in self.files]
+
+    def loaded(self, stream):
+        """
+        Tell whether the file of a stream is done loading, without waiting.
+
+        Parameters
+        ----------
+        stream : str
+            Name of the stream.
+
+        Returns
+        -------
+        bool
+            True once the file is loaded or failed to load.
+
+        Raises
+        ------
+        KeyError
+            If no file was opened for the stream.
+        """
+        with self._lock:
+            if stream not in self._loads:
+                raise KeyError(f"No {stream} file was opened.")
+            return self._loads[stream].done()
+
+    def wait(self, streams=None):
+        """
+        Wait until files are loaded.
+
+        Parameters
+        ----------
+        streams : sequence of str, optional
+            Streams to wait for (default is every opened file).
+
+        Raises
+        ------
+        Exception
+            The error raised while loading one of the files.
+        """
+        with self._lock:
+            loads = [self._loads[stream] for stream in (streams or list(self._loads)) if stream in self._loads]
+        for load in loads:
+            load.result()
+
+    def get(self, stream):
+        """
+        Return a loaded small stream, waiting for its file if needed.
+
+        Parameters
+        ----------
+        stream : str
+            One of `SMALL_STREAMS`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The stream, as returned by `load_stream`.
+
+        Raises
+        ------
+        ValueError
+            If the stream is not one of `SMALL_STREAMS`.
+        KeyError
+            If no file was opened for the stream.
+        """
+        if stream not in SMALL_STREAMS:
+            raise ValueError(f"Only {', '.join(SMALL_STREAMS)} are loaded whole.")
+        with self._lock:
+            if stream not in self._loads:
+                raise KeyError(f"No {stream} file was opened.")
+            load = self._loads[stream]
+        return load.result()[1]
+
+    def event_names(self):
+        """
+        List the names of the events of the recording.
+
+        Returns
+        -------
+        list of str
+            Distinct event names, in order of first occurrence.
+        """
+        return self.get("events")["name"].dropna().unique().tolist()
+
+    def run_pipeline(self, output_folder, **options):
+        """
+        Run `main_plots.run_pipeline` on the files of the session.
+
+        Parameters
+        ----------
+        output_folder : str
+            Directory path where generated plots will be saved.
+        **options
+            Other arguments of `main_plots.run_pipeline` (events, colour,
+            time, progress, cancel_event...).
+
+        Returns
+        -------
+        dict
+            Result of `main_plots.run_pipeline`.
+
+        Raises
+        ------
+        FileNotFoundError
+            If a file of the recording was not opened.
+        """
+        import main_plots as main
+
+        missing = self.missing()
+        if missing:
+            raise FileNotFoundError(f"Missing required file(s): {', '.join(missing)}.")
+        self.wait()
+        # Streams evicted from the memo since they were loaded are put back
+        for stream in SMALL_STREAMS:
+            key, value = self._loads[stream].result()
+            if key not in self.memo:
+                self.memo.put(key, value)
+        return main.run_pipeline(
+            blinks_file=self.files["blinks"],
+            pupil_file=self.files["pupil"],
+            events_file=self.files["events"],
+            fixations_file=self.files["fixations"],
+            gaze_file=self.files["gaze"],
+            saccades_file=self.files["saccades"],
+            output_folder=output_folder,
+            use_cache=self.use_cache,
+            memo=self.memo,
+            **options
+        )
+
+    def close(self):
+        """
+        Stop the background loading; the loads already running finish first.
+        """
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,223 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from config import RECORDING_FILES
+from intervals import NS_PER_S
+from heatmap import SCENE_WIDTH, SCENE_HEIGHT
+
+T0 = 1_700_000_000_000_000_000
+CHUNK_SAMPLES = 1_000_000
+
+def _eye_movements(rng, duration_ns, fixation_ms=250.0, saccade_ms=40.0):
+    """
+    Draw an alternation of fixations and saccades covering the recording.
+
+    Returns the fixation table (start, end, x, y) and the saccade table
+    (start, end, from/to positions); saccade i goes from fixation i to i + 1.
+    """
+    n = int(duration_ns / ((fixation_ms + saccade_ms) * 1e6) * 1.2) + 2
+    fix_dur = rng.gamma(4.0, fixation_ms / 4.0, n) * 1e6
+    sac_dur = rng.gamma(6.0, saccade_ms / 6.0, n) * 1e6
+    starts = T0 + np.concatenate([[0], np.cumsum(fix_dur + sac_dur)[:-1]]).astype(np.int64)
+    keep = starts < T0 + duration_ns
+    starts, fix_dur, sac_dur = starts[keep], fix_dur[keep], sac_dur[keep]
+
+    # Fixation targets wander around the centre of the scene
+    x = np.clip(rng.normal(SCENE_WIDTH / 2, SCENE_WIDTH / 5, len(starts)), 0, SCENE_WIDTH - 1)
+    y = np.clip(rng.normal(SCENE_HEIGHT / 2, SCENE_HEIGHT / 5, len(starts)), 0, SCENE_HEIGHT - 1)
+    fixations = pd.DataFrame({
+        "start": starts,
+        "end": starts + fix_dur.astype(np.int64),
+        "x": x,
+        "y": y,
+    })
+    saccades = pd.DataFrame({
+        "start": fixations["end"].to_numpy()[:-1],
+        "end": fixations["end"].to_numpy()[:-1] + sac_dur[:-1].astype(np.int64),
+        "x0": x[:-1], "y0": y[:-1], "x1": x[1:], "y1": y[1:],
+    })
+    return fixations, saccades
+
+def _blinks(rng, duration_ns, rate_per_min=15.0, blink_ms=150.0):
+    """Draw non-overlapping blinks with exponential gaps and log-normal durations."""
+    n = int(rate_per_min * duration_ns / NS_PER_S / 60 * 1.5) + 1
+    durations = (rng.lognormal(np.log(blink_ms), 0.35, n) * 1e6).astype(np.int64)
+    gaps = (rng.exponential(60 / rate_per_min, n) * NS_PER_S).astype(np.int64)
+    starts = T0 + np.cumsum(gaps) + np.concatenate([[0], np.cumsum(durations)[:-1]])
+    keep = starts + durations < T0 + duration_ns
+    return pd.DataFrame({"start": starts[keep], "end": (starts + durations)[keep]})
+
+def _events(rng, duration_ns, n_events, n_names):
+    """Place the begin/end events and `n_events` named events in between."""
+    inner = np.sort(rng.integers(T0 + 1, T0 + duration_ns, n_events))
+    names = [f"event_{i % max(1, n_names)}" for i in range(n_events)]
+    return pd.DataFrame({
+        "timestamp [ns]": np.concatenate([[T0], inner, [T0 + duration_ns]]),
+        "name": ["recording.begin"] + names + ["recording.end"],
+    })
+
+def _samples(rng, ts, fixations, saccades, blinks):
+    """Gaze positions, pupil diameters and segment ids of one chunk of samples."""
+    n = len(ts)
+    fix_i = np.searchsorted(fixations["start"].to_numpy(), ts, side="right") - 1
+    fix_i = np.clip(fix_i, 0, len(fixations) - 1)
+    in_fixation = ts < fixations["end"].to_numpy()[fix_i]
+
+    # Fixations: target plus microsaccadic noise; saccades: linear sweep to the next target
+    gx = fixations["x"].to_numpy()[fix_i] + rng.normal(0, 4, n)
+    gy = fixations["y"].to_numpy()[fix_i] + rng.normal(0, 4, n)
+    sac_i = np.clip(fix_i, 0, max(len(saccades) - 1, 0))
+    if len(saccades):
+        moving = ~in_fixation & (fix_i < len(saccades))
+        s = saccades.iloc[sac_i[moving]]
+        progress = np.clip((ts[moving] - s["start"].to_numpy()) / np.maximum(s["end"] - s["start"], 1).to_numpy(), 0, 1)
+        gx[moving] = s["x0"].to_numpy() + progress * (s["x1"] - s["x0"]).to_numpy()
+        gy[moving] = s["y0"].to_numpy() + progress * (s["y1"] - s["y0"]).to_numpy()
+
+    blink_i = np.searchsorted(blinks["start"].to_numpy(), ts, side="right") - 1
+    blinking = (blink_i >= 0) & (ts < blinks["end"].to_numpy()[np.maximum(blink_i, 0)])
+
+    # Pupil: slow drift and hippus around 3.5 mm, lost during blinks
+    t_s = (ts - T0) / NS_PER_S
+    base = 3.5 + 0.4 * np.sin(2 * np.pi * t_s / 300) + 0.1 * np.sin(2 * np.pi * t_s / 7)
+    left = base + rng.normal(0, 0.03, n)
+    right = base + 0.05 + rng.normal(0, 0.03, n)
+    left[blinking] = np.nan
+    right[blinking] = np.nan
+
+    return {
+        "gaze x [px]": gx.round(3),
+        "gaze y [px]": gy.round(3),
+        "fixation id": np.where(in_fixation, fix_i + 1, np.nan),
+        "blink id": np.where(blinking, blink_i + 1, np.nan),
+        "pupil diameter left [mm]": left.round(4),
+        "pupil diameter right [mm]": right.round(4),
+    }
+
+def generate_recording(folder, duration_s=600, sampling_hz=200, n_events=50, n_names=8, seed=0,
+                       chunk_samples=CHUNK_SAMPLES):
+    """
+    Write a synthetic Pupil Cloud Time Series export with the Neon schema.
+
+    Fixations and saccades alternate with gamma-distributed durations, the
+    gaze follows them with noise, blinks follow a Poisson process and hide
+    the pupil, and the pupil diameter drifts slowly. Gaze and eye state
+    samples are written chunk by chunk, so multi-hour recordings can be
+    generated with a bounded memory.
+
+    Parameters
+    ----------
+    folder : str
+        Folder receiving the six CSV files (created if needed).
+    duration_s : float, optional
+        Duration of the recording in seconds (default is 600).
+    sampling_hz : float, optional
+        Sampling rate of the gaze and eye state samples (default is 200).
+    n_events : int, optional
+        Number of events between 'recording.begin' and 'recording.end'
+        (default is 50).
+    n_names : int, optional
+        Number of distinct event names, reused cyclically (default is 8).
+    seed : int, optional
+        Seed of the random generator (default is 0).
+    chunk_samples : int, optional
+        Number of samples generated at a time (default is `CHUNK_SAMPLES`).
+
+    Returns
+    -------
+    dict
+        Path of every file by stream, as `loaders.recording_files`.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    paths = {stream: os.path.join(folder, name) for stream, name in RECORDING_FILES.items()}
+    duration_ns = int(duration_s * NS_PER_S)
+    ids = {"section id": "synthetic-section", "recording id": "synthetic-recording"}
+
+    fixations, saccades = _eye_movements(rng, duration_ns)
+    blinks = _blinks(rng, duration_ns)
+
+    pd.DataFrame({
+        **ids,
+        "blink id": np.arange(1, len(blinks) + 1),
+        "start timestamp [ns]": blinks["start"],
+        "end timestamp [ns]": blinks["end"],
+        "duration [ms]": ((blinks["end"] - blinks["start"]) / 1e6).round().astype(int),
+    }).to_csv(paths["blinks"], index=False)
+
+    pd.DataFrame({
+        **ids,
+        "fixation id": np.arange(1, len(fixations) + 1),
+        "start timestamp [ns]": fixations["start"],
+        "end timestamp [ns]": fixations["end"],
+        "duration [ms]": ((fixations["end"] - fixations["start"]) / 1e6).round().astype(int),
+        "fixation x [px]": fixations["x"].round(3),
+        "fixation y [px]": fixations["y"].round(3),
+        "azimuth [deg]": ((fixations["x"] - SCENE_WIDTH / 2) * 0.06).round(4),
+        "elevation [deg]": ((SCENE_HEIGHT / 2 - fixations["y"]) * 0.06).round(4),
+    }).to_csv(paths["fixations"], index=False)
+
+    amplitude = np.hypot(saccades["x1"] - saccades["x0"], saccades["y1"] - saccades["y0"])
+    seconds = (saccades["end"] - saccades["start"]) / NS_PER_S
+    pd.DataFrame({
+        **ids,
+        "saccade id": np.arange(1, len(saccades) + 1),
+        "start timestamp [ns]": saccades["start"],
+        "end timestamp [ns]": saccades["end"],
+        "duration [ms]": (seconds * 1000).round().astype(int),
+        "amplitude [px]": amplitude.round(3),
+        "amplitude [deg]": (amplitude * 0.06).round(4),
+        "mean velocity [px/s]": (amplitude / seconds).round(3),
+        "peak velocity [px/s]": (1.6 * amplitude / seconds).round(3),
+    }).to_csv(paths["saccades"], index=False)
+
+    events = _events(rng, duration_ns, n_events, n_names)
+    events.insert(0, "recording id", ids["recording id"])
+    events["type"] = "recording"
+    events.to_csv(paths["events"], index=False)
+
+    step_ns = NS_PER_S / sampling_hz
+    n_samples = int(duration_s * sampling_hz)
+    for first in range(0, max(n_samples, 1), chunk_samples):
+        ts = T0 + (np.arange(first, min(first + chunk_samples, n_samples)) * step_ns).astype(np.int64)
+        samples = _samples(rng, ts, fixations, saccades, blinks)
+        mode, header = ("w", True) if first == 0 else ("a", False)
+
+        pd.DataFrame({
+            **ids,
+            "timestamp [ns]": ts,
+            "gaze x [px]": samples["gaze x [px]"],
+            "gaze y [px]": samples["gaze y [px]"],
+            "worn": 1,
+            "fixation id": samples["fixation id"],
+            "blink id": samples["blink id"],
+            "azimuth [deg]": ((samples["gaze x [px]"] - SCENE_WIDTH / 2) * 0.06).round(4),
+            "elevation [deg]": ((SCENE_HEIGHT / 2 - samples["gaze y [px]"]) * 0.06).round(4),
+        }).to_csv(paths["gaze"], mode=mode, header=header, index=False)
+
+        pd.DataFrame({
+            **ids,
+            "timestamp [ns]": ts,
+            "pupil diameter left [mm]": samples["pupil diameter left [mm]"],
+            "pupil diameter right [mm]": samples["pupil diameter right [mm]"],
+            "eyeball center left x [mm]": -30.0, "eyeball center left y [mm]": 10.0, "eyeball center left z [mm]": -35.0,
+            "eyeball center right x [mm]": 30.0, "eyeball center right y [mm]": 10.0, "eyeball center right z [mm]": -35.0,
+            "optical axis left x": 0.0, "optical axis left y": 0.0, "optical axis left z": 1.0,
+            "optical axis right x": 0.0, "optical axis right y": 0.0, "optical axis right z": 1.0,
+        }).to_csv(paths["pupil"], mode=mode, header=header, index=False)
+
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic Neon Time Series export.")
+    parser.add_argument("folder", help="output folder")
+    parser.add_argument("--duration", type=float, default=600, help="duration in seconds (default: 600)")
+    parser.add_argument("--rate", type=float, default=200, help="gaze sampling rate in Hz (default: 200)")
+    parser.add_argument("--events", type=int, default=50, help="number of events (default: 50)")
+    parser.add_argument("--names", type=int, default=8, help="number of distinct event names (default: 8)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+    generate_recording(args.folder, args.duration, args.rate, args.events, args.names, args.seed)
+    print(f"✅ Synthetic recording written to {args.folder}")
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use("Agg")
+
+from synthetic import generate_recording
+
+@pytest.fixture(scope="session")
+def recording(tmp_path_factory):
+    """A short synthetic Neon export, shared by the tests."""
+    folder = tmp_path_factory.mktemp("recording")
+    generate_recording(str(folder), duration_s=30, sampling_hz=50, n_events=6, n_names=3, seed=1)
+    return str(folder)
@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import loaders
+import neopupil
+from batch import MANIFEST_FILE, load_manifest, is_complete, analysis_params
+from loaders import file_fingerprint, reuse_fingerprint
+
+def run_batch_cli(capsys, root, output, *extra):
+    code = neopupil.main_cli(["batch", "--root", str(root), "--output", str(output), "--jobs", "1",
+                              "--start", "recording.begin", "--end", "recording.end", *extra])
+    return code, json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+
+@pytest.fixture
+def batch(recording, tmp_path):
+    """Two copies of the synthetic recording under a root folder, and a plan drawing the blink plots."""
+    root = tmp_path / "root"
+    for name in ("a", "b"):
+        shutil.copytree(recording, root / name, ignore=shutil.ignore_patterns("plots", loaders.CACHE_DIRNAME))
+    plan = tmp_path / "plan.json"
+    plan.write_text(json.dumps({"colour": "blue", "analyses": ["blink_plots"]}), encoding="utf-8")
+    return root, tmp_path / "out", ["--plan", str(plan)]
+
+def test_batch_resumes_complete_recordings(batch, capsys):
+    root, output, plan = batch
+    code, summary = run_batch_cli(capsys, root, output, *plan)
+    assert code == 0
+    assert (summary["succeeded"], summary["resumed"]) == (2, 0)
+    manifest = load_manifest(str(output))
+    entry = manifest["recordings"][str(root / "a")]
+    assert entry["status"] == "ok" and entry["artifacts"]
+    assert set(entry["inputs"]) == set(os.listdir(root / "a")) - {loaders.CACHE_DIRNAME}
+
+    code, summary = run_batch_cli(capsys, root, output, *plan)
+    assert code == 0
+    assert summary["resumed"] == 2
+    assert all(result.get("resumed") for result in summary["recordings"])
+
+    # A touched but unchanged input keeps the recording complete, a modified one does not
+    os.utime(root / "a" / "events.csv")
+    with open(root / "b" / "blinks.csv", "a", encoding="utf-8") as f:
+        f.write("\n")
+    code, summary = run_batch_cli(capsys, root, output, *plan)
+    assert code == 0
+    assert {result["recording"]: bool(result.get("resumed")) for result in summary["recordings"]} == {
+        str(root / "a"): True, str(root / "b"): False}
+
+    # Other options redo every recording, and so does --no-resume
+    code, summary = run_batch_cli(capsys, root, output, *plan, "--colour", "green")
+    assert summary["resumed"] == 0
+    code, summary = run_batch_cli(capsys, root, output, *plan, "--colour", "green", "--no-resume")
+    assert summary["resumed"] == 0
+    assert json.loads((output / MANIFEST_FILE).read_text(encoding="utf-8"))["recordings"]
+
+def test_is_complete_checks_the_artifacts(batch, capsys):
+    root, output, plan = batch
+    run_batch_cli(capsys, root, output, *plan)
+    recording = str(root / "a")
+    entry = load_manifest(str(output))["recordings"][recording]
+    args = neopupil.build_parser().parse_args(["batch", "--root", str(root), "--start", "recording.begin",
+                                               "--end", "recording.end", *plan])
+    params = analysis_params(args)
+    folder = entry["output"]
+    assert is_complete(entry, params, recording, folder)
+    assert not is_complete(entry, dict(params, bin=5), recording, folder)
+    assert not is_complete(dict(entry, status="partial"), params, recording, folder)
+    assert not is_complete(entry, params, recording, str(output / "elsewhere"))
+    assert not is_complete(None, params, recording, folder)
+
+    os.remove(os.path.join(folder, sorted(entry["artifacts"])[0]))
+    assert not is_complete(entry, params, recording, folder)
+
+def test_reuse_fingerprint_hashes_only_changed_files(recording, tmp_path, monkeypatch):
+    path = str(tmp_path / "gaze.csv")
+    shutil.copy(os.path.join(recording, "gaze.csv"), path)
+    previous = file_fingerprint(path)
+    hashed = []
+    content_hash = loaders.content_hash
+    monkeypatch.setattr(loaders, "content_hash", lambda p: hashed.append(p) or content_hash(p))
+
+    assert reuse_fingerprint(path, previous) == previous
+    # Without a previous fingerprint, the one of the columnar cache is reused
+    loaders.ensure_cache(path)
+    hashed.clear()
+    assert reuse_fingerprint(path) == previous
+    assert not hashed
+
+    os.utime(path, ns=(previous["mtime_ns"] + 10**9,) * 2)
+    hashed.clear()
+    fingerprint = reuse_fingerprint(path, previous)
+    assert hashed
+    assert fingerprint["hash"] == previous["hash"] and fingerprint["mtime_ns"] == previous["mtime_ns"] + 10**9
@@ -0,0 +1,98 @@
+import json
+import os
+import pstats
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import config
+import main_plots
+import neopupil
+
+def run_cli(capsys, *argv):
+    code = neopupil.main_cli(list(argv))
+    return code, json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+
+def test_fractional_bin_width(recording, tmp_path, capsys, monkeypatch):
+    labels = {}
+    render = main_plots.render
+
+    def record(scheduler, name, func, *args, **kwargs):
+        if name.endswith("_2.5s.png"):
+            labels[name] = list(args[1])
+        render(scheduler, name, func, *args, **kwargs)
+    monkeypatch.setattr(main_plots, "render", record)
+
+    code, summary = run_cli(capsys, "run", "--recording", recording, "--start", "recording.begin",
+                            "--end", "recording.end", "--bin", "2.5", "--workers", "1",
+                            "--output", str(tmp_path / "plots"))
+    assert code == 0, summary["error"]
+    assert "fixation_means_2.5s.png" in summary["plots"]
+    assert labels["fixation_means_2.5s.png"][:3] == ["0s–2.5s", "2.5s–5s", "5s–7.5s"]
+    assert labels["pupils_diameter_means_2.5s.png"][:2] == ["0s–2.5s", "2.5s–5s"]
+
+    # The statistics tables of the same options cut the same bins
+    code, summary = run_cli(capsys, "run", "--recording", recording, "--start", "recording.begin",
+                            "--end", "recording.end", "--bin", "2.5", "--stats-only",
+                            "--output", str(tmp_path / "stats"))
+    assert code == 0, summary["error"]
+    binned = pd.read_csv(tmp_path / "stats" / "binned_statistics.csv")
+    fixations = binned[binned["stream"] == "fixations"]
+    assert fixations["start_s"].tolist()[:3] == [0.0, 2.5, 5.0]
+    assert len(fixations) == len(labels["fixation_means_2.5s.png"])
+
+@pytest.mark.parametrize("plan", [None, {"colour": "green", "analyses": ["blink_plots", {"analysis": "mean_std", "streams": ["fixations"]}]}])
+def test_cpu_profile_with_threaded_stages(recording, tmp_path, capsys, plan):
+    argv = ["run", "--recording", recording, "--start", "recording.begin", "--end", "recording.end", "--bin", "10",
+            "--workers", "1", "--profile", "cpu", "--output", str(tmp_path / "out")]
+    if plan is not None:
+        (tmp_path / "plan.json").write_text(json.dumps(plan), encoding="utf-8")
+        argv += ["--plan", str(tmp_path / "plan.json")]
+    code, summary = run_cli(capsys, *argv)
+    assert code == 0, summary["error"]
+
+    with open(summary["report"], encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["profile"]["cpu"]
+    # The stages run in worker threads are part of the profile
+    stats = pstats.Stats(str(tmp_path / "out" / report["profile"]["file"]))
+    assert "read_csv_cached" in {name for _, _, name in stats.stats}
+
+def test_epochs_option(recording, tmp_path, capsys):
+    argv = ["run", "--recording", recording, "--start", "recording.begin", "--end", "recording.end", "--bin", "10",
+            "--workers", "1", "--epochs", "event_0", "--epochs", "event_1", "--epoch-window", "0.5", "2"]
+    code, summary = run_cli(capsys, *argv, "--output", str(tmp_path / "out"))
+    assert code == 0, summary["error"]
+    assert {"pupils_epochs_event_0.png", "pupils_epochs_event_1.png", "blink_duration_histogram.png"} <= set(
+        summary["plots"])
+
+    with pytest.raises(SystemExit):
+        neopupil.main_cli(argv + ["--stats-only"])
+
+def test_sweep_keeps_fractional_widths(recording, tmp_path, capsys, monkeypatch):
+    time_file = tmp_path / "time.csv"
+    time_file.write_text("time\n0\n2.5\n5.0\n5\n10\n", encoding="utf-8")
+    widths = config.load_time_widths(str(time_file))
+    assert widths == [2.5, 5, 10]
+    assert [str(width) for width in widths] == ["2.5", "5", "10"]
+
+    monkeypatch.setattr(main_plots, "load_time_widths", lambda: widths)
+    code, summary = run_cli(capsys, "run", "--recording", recording, "--start", "recording.begin",
+                            "--end", "recording.end", "--bin", "all", "--workers", "1",
+                            "--output", str(tmp_path / "plots"))
+    assert code == 0, summary["error"]
+    assert {f"fixation_means_{width}s.png" for width in ("2.5", "5", "10")} <= set(summary["plots"])
+
+def test_stats_only_does_not_import_matplotlib(recording, tmp_path):
+    code = ("import sys, neopupil; code = neopupil.main_cli(sys.argv[1:]); "
+            "print(sorted(m for m in ('matplotlib', 'main_plots', 'rendering') if m in sys.modules), file=sys.stderr); "
+            "sys.exit(code)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code, "run", "--recording", recording, "--start", "recording.begin",
+                          "--end", "recording.end", "--bin", "10", "--stats-only", "--output", str(tmp_path / "stats")],
+                         capture_output=True, text=True, cwd=root)
+    assert out.returncode == 0, out.stderr
+    assert out.stderr.strip().splitlines()[-1] == "[]"
+    assert (tmp_path / "stats" / "interval_statistics.csv").exists()
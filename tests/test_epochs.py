@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from epochs import epoch_grid, event_epochs, baseline_correct, epoch_summary, pupil_epochs
+from intervals import NS_PER_S
+
+MS = NS_PER_S // 1000
+
+def test_epoch_grid():
+    offsets = epoch_grid(0.5, 1, rate_hz=10)
+    assert len(offsets) == 16
+    assert offsets[0] == -0.5 and offsets[-1] == 1.0 and 0.0 in offsets
+    with pytest.raises(ValueError):
+        epoch_grid(0.5, -0.5)
+    with pytest.raises(ValueError):
+        epoch_grid(1, 1, rate_hz=0)
+
+def test_event_epochs_shape_and_values():
+    ts = np.arange(0, 10_000, 10) * MS
+    values = ts / NS_PER_S
+    offsets = epoch_grid(1, 2, rate_hz=20)
+    onsets = np.array([2_000, 5_005, 7_500]) * MS
+    epochs = event_epochs(ts, values, onsets, offsets)
+    assert epochs.shape == (3, len(offsets))
+    assert epochs.dtype == np.float32
+    # A linear signal is resampled exactly, between the samples too
+    np.testing.assert_allclose(epochs, onsets[:, None] / NS_PER_S + offsets, atol=1e-5)
+
+    assert event_epochs(ts, values, [], offsets).shape == (0, len(offsets))
+    assert np.isnan(event_epochs([], [], onsets, offsets)).all()
+
+def test_event_epochs_nans():
+    # 10 ms samples with a 1 s gap between 2 s and 3 s and a blink (NaN) at 5 s
+    ts = np.concatenate([np.arange(0, 2_000, 10), np.arange(3_000, 6_000, 10)]) * MS
+    values = np.ones(len(ts))
+    values[np.searchsorted(ts, 5_000 * MS)] = np.nan
+    offsets = np.array([-0.6, -0.005, 0.0, 0.005, 0.6])
+    epochs = event_epochs(ts, values, np.array([2_500, 3_000, 5_000, 5_700]) * MS, offsets)
+
+    # Inside the gap, and outside the recording
+    assert np.isnan(epochs[0, 1:4]).all() and epochs[0, 0] == 1 and epochs[0, 4] == 1
+    assert np.isnan(epochs[3, 4])
+    # A grid point exactly on the first sample after the gap keeps its value
+    assert np.isnan(epochs[1, 1]) and epochs[1, 2] == 1 and epochs[1, 3] == 1
+    # The blink makes its neighbours NaN
+    assert np.isnan(epochs[2, 1:4]).all() and epochs[2, 0] == 1 and epochs[2, 4] == 1
+
+    bridged = event_epochs(ts, values, [2_500 * MS], offsets, max_gap_s=None)
+    assert not np.isnan(bridged).any()
+
+def test_baseline_and_summary():
+    offsets = np.array([-0.2, -0.1, 0.0, 0.1, 0.2])
+    epochs = np.array([[1, 1, 1, 2, 3], [2, 2, 2, 2, 2], [np.nan] * 5], dtype=np.float32)
+    corrected = baseline_correct(epochs, offsets, (-0.2, 0))
+    np.testing.assert_allclose(corrected[0], [0, 0, 0, 1, 2])
+    np.testing.assert_allclose(corrected[1], 0)
+    assert np.isnan(corrected[2]).all()
+    with pytest.raises(ValueError):
+        baseline_correct(epochs, offsets, (1, 2))
+
+    summary = epoch_summary(corrected, offsets)
+    assert summary["n"].tolist() == [2] * 5
+    np.testing.assert_allclose(summary["mean"], [0, 0, 0, 0.5, 1])
+    assert (summary["ci_low"] <= summary["mean"]).all() and (summary["mean"] <= summary["ci_high"]).all()
+    with pytest.raises(ValueError):
+        epoch_summary(corrected, offsets, ci=1)
+
+def test_pupil_epochs():
+    ts = np.arange(0, 10_000, 5) * MS
+    offsets, epochs = pupil_epochs(ts, np.full(len(ts), 3.0), [3_000 * MS, 6_000 * MS], 1, 2)
+    assert epochs.shape == (2, len(offsets))
+    np.testing.assert_allclose(epochs, 0, atol=1e-6)
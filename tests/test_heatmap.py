@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main_plots
+from config import STREAM_COLUMNS
+from heatmap import HeatmapAccumulator
+from intervals import EventIndex
+from loaders import iter_stream_window, read_stream_window
+
+def test_smoothed_keeps_the_mass():
+    accumulator = HeatmapAccumulator(cell_px=10, width=400, height=400)
+    accumulator.add(np.array([200.0]), np.array([200.0]))
+    grid = accumulator.smoothed(20)
+    assert grid.sum() == pytest.approx(1.0)
+    assert grid.argmax() == accumulator.grid.argmax()
+
+def test_smoothed_warns_when_the_kernel_is_truncated():
+    accumulator = HeatmapAccumulator(cell_px=10, width=200, height=100)
+    accumulator.add(np.array([100.0]), np.array([50.0]))
+    with pytest.warns(UserWarning, match="limited to 40 px"):
+        accumulator.smoothed(200)
+
+def test_add_windows_counts_each_window():
+    ts = np.arange(10)
+    x = np.arange(10) * 10.0 + 5
+    accumulator = HeatmapAccumulator(cell_px=10, width=100, height=10)
+    # Overlapping windows add their shared samples twice; chunks split the positions
+    accumulator.add_windows(ts, x, np.zeros(10), [0, 2, 8], [4, 5, 20], chunk=3)
+    assert accumulator.grid[0].tolist() == [1, 1, 2, 2, 1, 0, 0, 0, 1, 1]
+    assert accumulator.samples == 9
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_streamed_heatmap_matches_the_loaded_one(recording, monkeypatch, use_cache):
+    grids = []
+    monkeypatch.setattr(main_plots, "render", lambda scheduler, name, func, path, grid, *args: grids.append(grid))
+    events = pd.read_csv(os.path.join(recording, "events.csv"))
+    index = EventIndex(events)
+    pairs = index.pairs(index.windows("recording.begin", "recording.end"))
+    start_ts, end_ts = pairs["start"].min(), pairs["end"].max()
+    gaze = os.path.join(recording, "gaze.csv")
+    args = (gaze, STREAM_COLUMNS["gaze"], "timestamp [ns]", start_ts, end_ts, use_cache)
+
+    chunks = list(iter_stream_window(*args, chunk_rows=97))
+    assert len(chunks) > 1 and all(0 < len(chunk) <= 97 for chunk in chunks)
+    window = read_stream_window(*args)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), window)
+
+    main_plots.gaze_heatmap(window, events, start_ts, end_ts, "gaze", "", pairs=pairs)
+    main_plots.gaze_heatmap(None, events, start_ts, end_ts, "gaze", "", pairs=pairs,
+                            chunks=iter_stream_window(*args, chunk_rows=97))
+    assert grids[0].sum() > 0
+    np.testing.assert_array_equal(grids[0], grids[1])
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from intervals import (EventIndex, PrefixIndex, NS_PER_S, event_pairs, slice_bounds, interval_stats, time_bins,
+                       binned_stats, aggregate_intervals)
+from main_plots import format_bin_labels, duration_stream
+
+T0 = 1_700_000_000 * NS_PER_S
+
+@pytest.fixture
+def stream():
+    """Fixations-like stream over 60 s, with ties and missing durations."""
+    rng = np.random.default_rng(7)
+    ts = np.sort(T0 + rng.integers(0, 60 * NS_PER_S, 400))
+    ts[10:14] = ts[10]
+    durations = rng.gamma(4, 60, len(ts))
+    durations[rng.choice(len(ts), 20, replace=False)] = np.nan
+    return pd.DataFrame({"start timestamp [ns]": ts, "duration [ms]": durations})
+
+@pytest.fixture
+def events():
+    names = ["recording.begin", "cue", "target", "cue", "target", "rest", "recording.end"]
+    offsets_s = [0, 3.5, 9.25, 20, 21, 40, 60]
+    return pd.DataFrame({"timestamp [ns]": [T0 + int(s * NS_PER_S) for s in offsets_s], "name": names})
+
+def original_between_events(df, events_df, start_ts, end_ts):
+    """Statistics between consecutive events, computed as the original plots did."""
+    interval_events = events_df[(events_df["timestamp [ns]"] >= start_ts) &
+                                (events_df["timestamp [ns]"] <= end_ts)].reset_index(drop=True)
+    results = []
+    for i in range(len(interval_events) - 1):
+        e1, e2 = interval_events.iloc[i], interval_events.iloc[i + 1]
+        mask = (df["start timestamp [ns]"] >= e1["timestamp [ns]"]) & (df["start timestamp [ns]"] < e2["timestamp [ns]"])
+        subset = df[mask]
+        delta_s = (e2["timestamp [ns]"] - e1["timestamp [ns]"]) / 1_000_000_000
+        results.append({"label": f"{e1['name']} ➝ {e2['name']}", "mean": subset["duration [ms]"].mean(),
+                        "std": subset["duration [ms]"].std(), "count": subset["duration [ms]"].count(),
+                        "frequency": subset["duration [ms]"].count() / delta_s})
+    return pd.DataFrame(results)
+
+def test_aggregate_intervals_matches_the_original_plots(stream, events):
+    start_ts, end_ts = T0, T0 + 60 * NS_PER_S
+    shifted = stream.assign(**{"start timestamp [ns]": stream["start timestamp [ns]"] + 5 * NS_PER_S})
+    streams = {"fixations": duration_stream(stream.sample(frac=1, random_state=0)),
+               "saccades": duration_stream(shifted)}
+    table = aggregate_intervals(streams, event_pairs(events, start_ts, end_ts))
+
+    for label, df in (("fixations", stream), ("saccades", shifted)):
+        expected = original_between_events(df, events, start_ts, end_ts)
+        stats = table[table["stream"] == label]
+        assert stats["label"].tolist() == expected["label"].tolist()
+        assert stats["count"].tolist() == expected["count"].tolist()
+        np.testing.assert_allclose(stats["mean"], expected["mean"])
+        np.testing.assert_allclose(stats["std"], expected["std"])
+        np.testing.assert_allclose(stats["frequency"], expected["frequency"])
+        for row in stats.itertuples():
+            window = df[(df["start timestamp [ns]"] >= row.start) & (df["start timestamp [ns]"] < row.end)]
+            durations = window["duration [ms]"].dropna()
+            expected_p = np.percentile(durations, [25, 50, 75]) if len(durations) else [np.nan] * 3
+            np.testing.assert_allclose([row.p25, row.p50, row.p75], expected_p)
+
+def original_time_bins(df, start_ts, end_ts, time):
+    """Bins of the original time-binned plots, with their labels and statistics."""
+    def format_time(sec):
+        if sec < 60:
+            return f"{int(sec)}s"
+        m, s = int(sec // 60), int(sec % 60)
+        return f"{m}m{s}s" if s else f"{m}m"
+
+    interval_ns = int(time) * 1_000_000_000
+    results = []
+    current_start = start_ts
+    while current_start < end_ts:
+        current_end = min(current_start + interval_ns, end_ts)
+        mask = (df["start timestamp [ns]"] >= current_start) & (df["start timestamp [ns]"] < current_end)
+        subset = df[mask]
+        start_sec = (current_start - start_ts) / 1_000_000_000
+        end_sec = (current_end - start_ts) / 1_000_000_000
+        results.append({"start": current_start, "end": current_end,
+                        "interval": f"{format_time(start_sec)}–{format_time(end_sec)}",
+                        "mean_duration": subset["duration [ms]"].mean(), "count": subset["duration [ms]"].count()})
+        current_start = current_end
+    return pd.DataFrame(results)
+
+def test_slice_bounds():
+    ts = np.array([1, 2, 2, 2, 5, 9])
+    lo, hi = slice_bounds(ts, [2, 0, 5, 9], [5, 2, 3, 10])
+    # [start, end): the ties at 2 open the first slice, the reversed interval is empty
+    assert lo.tolist() == [1, 0, 4, 5]
+    assert hi.tolist() == [4, 1, 4, 6]
+
+def test_interval_stats_match_the_original_loop(stream, events):
+    start_ts, end_ts = T0 + 2 * NS_PER_S, T0 + 60 * NS_PER_S
+    expected = original_between_events(stream, events, start_ts, end_ts)
+    pairs = event_pairs(events, start_ts, end_ts)
+    stats = interval_stats(stream["start timestamp [ns]"].to_numpy(), stream["duration [ms]"].to_numpy(),
+                           pairs["start"], pairs["end"])
+    assert pairs["label"].tolist() == expected["label"].tolist()
+    assert stats["count"].tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(stats["mean"], expected["mean"])
+    np.testing.assert_allclose(stats["std"], expected["std"])
+
+@pytest.mark.parametrize("width", [1, 7, 10, 45])
+def test_time_bins_match_the_original_loop(stream, width):
+    start_ts, end_ts = T0 + NS_PER_S // 2, T0 + 130 * NS_PER_S
+    expected = original_time_bins(stream, start_ts, end_ts, width)
+    bin_starts, bin_ends = time_bins(start_ts, end_ts, width * NS_PER_S)
+    stats = binned_stats(stream["start timestamp [ns]"].to_numpy(), stream["duration [ms]"].to_numpy(),
+                         bin_starts, bin_ends)
+    assert bin_starts.tolist() == expected["start"].tolist()
+    assert bin_ends.tolist() == expected["end"].tolist()
+    assert format_bin_labels(bin_starts, bin_ends, start_ts) == expected["interval"].tolist()
+    assert stats["count"].tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(stats["mean"], expected["mean_duration"])
+
+def test_time_bins_rejects_empty_width():
+    with pytest.raises(ValueError):
+        time_bins(0, 10, 0)
+
+def test_prefix_index_variance_matches_numpy():
+    rng = np.random.default_rng(3)
+    ts = np.sort(rng.integers(0, 10_000, 2_000))
+    # A large offset with a small spread, where naive sums of squares lose the variance
+    values = 1e6 + rng.normal(0, 0.01, len(ts))
+    values[::50] = np.nan
+    index = PrefixIndex(ts, values)
+    starts = rng.integers(0, 10_000, 200)
+    ends = starts + rng.integers(0, 2_000, 200)
+    stats = index.window_stats(starts, ends)
+    for start, end, row in zip(starts, ends, stats.itertuples()):
+        window = values[(ts >= start) & (ts < end)]
+        window = window[~np.isnan(window)]
+        assert row.count == len(window)
+        if len(window):
+            assert row.mean == pytest.approx(window.mean(), abs=1e-9)
+        if len(window) > 1:
+            assert row.std == pytest.approx(np.sqrt(np.var(window, ddof=1)), rel=1e-6)
+        else:
+            assert np.isnan(row.std)
+
+def test_prefix_index_binned_matches_binned_stats(stream):
+    ts, values = stream["start timestamp [ns]"].to_numpy(), stream["duration [ms]"].to_numpy()
+    index = PrefixIndex(ts[::-1], values[::-1])
+    for width in (1, 7, 10):
+        bin_starts, bin_ends, stats = index.binned(T0, T0 + 61 * NS_PER_S, width * NS_PER_S)
+        expected = binned_stats(ts, values, bin_starts, bin_ends)
+        assert stats["count"].tolist() == expected["count"].tolist()
+        np.testing.assert_allclose(stats["mean"], expected["mean"])
+
+def test_prefix_index_binned_windows_pools_the_nth_bins():
+    ts = np.arange(0, 100)
+    index = PrefixIndex(ts, ts.astype(float))
+    offsets, ends, stats = index.binned_windows([0, 50], [25, 60], 10)
+    assert offsets.tolist() == [0, 10, 20]
+    assert ends.tolist() == [10, 20, 25]
+    assert stats["windows"].tolist() == [2, 1, 1]
+    assert stats["count"].tolist() == [20, 10, 5]
+    assert stats["mean"].tolist() == [np.mean(list(range(10)) + list(range(50, 60))), 14.5, 22.0]
+
+def make_events(*marks):
+    """Events table from (timestamp, name) tuples."""
+    ts, names = zip(*marks)
+    return pd.DataFrame({"timestamp [ns]": np.array(ts, dtype=np.int64), "name": list(names)})
+
+def window_list(windows):
+    return list(zip(windows["start"].tolist(), windows["end"].tolist()))
+
+def test_windows_first_occurrence():
+    index = EventIndex(make_events((0, "start"), (10, "end"), (20, "start"), (30, "end")))
+    assert window_list(index.windows("start", "end")) == [(0, 10)]
+    with pytest.raises(ValueError):
+        index.windows("end", "start")
+    with pytest.raises(ValueError):
+        index.windows("start", "missing", "all")
+
+def test_windows_repeated_markers():
+    index = EventIndex(make_events((0, "trial_start"), (10, "trial_end"), (20, "trial_start"), (25, "cue"),
+                                   (30, "trial_end"), (40, "trial_end"), (50, "trial_start")))
+    # The end without an open start and the start never closed are ignored
+    assert window_list(index.windows("trial_start", "trial_end", "all")) == [(0, 10), (20, 30)]
+
+def test_windows_overlapping_trials():
+    index = EventIndex(make_events((0, "s"), (5, "s"), (10, "e"), (15, "e")))
+    assert window_list(index.windows("s", "e", "all")) == [(0, 10), (5, 15)]
+
+def test_windows_end_on_a_start_does_not_close_it():
+    index = EventIndex(make_events((0, "s"), (10, "e"), (10, "s"), (20, "e")))
+    assert window_list(index.windows("s", "e", "all")) == [(0, 10), (10, 20)]
+
+def test_windows_same_name():
+    index = EventIndex(make_events((0, "beep"), (10, "beep"), (25, "beep")))
+    assert window_list(index.windows("beep", "beep", "all")) == [(0, 10), (10, 25)]
+
+def test_pairs_inside_every_window():
+    index = EventIndex(make_events((0, "s"), (4, "cue"), (10, "e"), (20, "s"), (30, "e")))
+    pairs = index.pairs(index.windows("s", "e", "all"))
+    assert pairs["window"].tolist() == [0, 0, 1]
+    assert pairs["label"].tolist() == ["s ➝ cue #1", "cue ➝ e #1", "s ➝ e #2"]
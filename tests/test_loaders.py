@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import loaders
+from config import RECORDING_FILES, STREAM_COLUMNS
+from loaders import (cache_dir, ensure_cache, read_csv_cached, file_fingerprint, fingerprint_matches,
+                     read_stream_window, iter_stream_window, compact_stream, memory_footprint)
+
+def write_csv(path, n=10, start=0):
+    ts = np.arange(start, start + n, dtype=np.int64) * 1_000
+    pd.DataFrame({"timestamp [ns]": ts, "value": ts / 1_000.0, "name": [f"e{i % 3}" for i in range(n)]}).to_csv(
+        path, index=False)
+    return str(path)
+
+def test_fingerprint_matches(tmp_path):
+    path = write_csv(tmp_path / "blinks.csv")
+    fingerprint = file_fingerprint(path)
+    assert fingerprint_matches(fingerprint, path)
+
+    # Touched but unchanged: the hash is checked and the file still matches
+    os.utime(path, ns=(fingerprint["mtime_ns"] + 10**9,) * 2)
+    assert fingerprint_matches(fingerprint, path)
+
+    # Same size, new content and time
+    with open(path, "r+b") as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b"e9")
+    os.utime(path, ns=(fingerprint["mtime_ns"] + 2 * 10**9,) * 2)
+    assert not fingerprint_matches(fingerprint, path)
+
+    write_csv(path, n=11)
+    assert not fingerprint_matches(fingerprint, path)
+    assert not fingerprint_matches(fingerprint, str(tmp_path / "missing.csv"))
+
+def test_cache_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    path = write_csv(tmp_path / "events.csv")
+    expected = pd.read_csv(path)
+    first = ensure_cache(path)
+
+    # A touched file keeps its cache, whose time is refreshed
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_mtime_ns + 10**9,) * 2)
+    assert ensure_cache(path)["build"] == first["build"]
+    assert loaders._read_meta(path)["source"]["mtime_ns"] == stat.st_mtime_ns + 10**9
+
+    # Reloads map the cached columns without parsing the CSV
+    def no_parse(*args, **kwargs):
+        raise AssertionError("the CSV was parsed again")
+    with monkeypatch.context() as patch:
+        patch.setattr(pd, "read_csv", no_parse)
+        cached = read_csv_cached(path)
+    assert cached["name"].dtype == "category"
+    pd.testing.assert_frame_equal(cached.drop(columns="name"), expected.drop(columns="name"))
+    assert cached["name"].tolist() == expected["name"].tolist()
+
+    write_csv(path, n=12)
+    assert ensure_cache(path)["build"] != first["build"]
+    assert len(read_csv_cached(path)) == 12
+
+def test_failed_rebuild_keeps_the_previous_cache(tmp_path, monkeypatch):
+    path = write_csv(tmp_path / "gaze.csv")
+    first = ensure_cache(path)
+    write_csv(path, n=20)
+
+    def crash(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(loaders, "_write_json", crash)
+    with pytest.raises(OSError):
+        loaders.build_cache(path)
+    # Nothing but the previous build is left, and it is still current
+    assert sorted(os.listdir(cache_dir(path))) == sorted([first["build"], loaders.CURRENT_BUILD])
+    assert loaders._read_meta(path) is None
+    assert len(loaders.load_cache(path, first)) == 10
+
+def test_rebuild_keeps_mapped_columns_valid(tmp_path):
+    path = write_csv(tmp_path / "gaze.csv")
+    meta = ensure_cache(path)
+    mapped = loaders._load_column(os.path.join(cache_dir(path), meta["build"]), 0, meta["columns"][0], meta["rows"])
+    write_csv(path, n=20, start=100)
+    new = ensure_cache(path)
+    assert new["build"] != meta["build"]
+    assert mapped[-1] == 9_000
+    assert read_csv_cached(path)["timestamp [ns]"].iloc[-1] == 119_000
+
+COLUMNS = {"timestamp [ns]": "int64", "value": "float32"}
+
+@pytest.mark.parametrize("use_cache", [False, True])
+@pytest.mark.parametrize("shuffled", [False, True])
+def test_read_stream_window_bounds(tmp_path, use_cache, shuffled):
+    path = write_csv(tmp_path / "gaze.csv", n=25)
+    if shuffled:
+        pd.read_csv(path).sample(frac=1, random_state=0).to_csv(path, index=False)
+    # Both ends are inclusive, and the window spans several chunks
+    window = read_stream_window(path, COLUMNS, "timestamp [ns]", 5_000, 12_000, use_cache, chunk_rows=4)
+    assert list(window.columns) == list(COLUMNS)
+    assert window.dtypes.astype(str).to_dict() == COLUMNS
+    assert sorted(window["timestamp [ns]"].tolist()) == list(range(5_000, 13_000, 1_000))
+    chunks = list(iter_stream_window(path, COLUMNS, "timestamp [ns]", 5_000, 12_000, use_cache, chunk_rows=4))
+    assert all(0 < len(chunk) <= 4 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), window)
+
+    whole = read_stream_window(path, COLUMNS, "timestamp [ns]", use_cache=use_cache, chunk_rows=4)
+    assert len(whole) == 25
+    empty = read_stream_window(path, COLUMNS, "timestamp [ns]", 100_000, 200_000, use_cache, chunk_rows=4)
+    assert len(empty) == 0
+    assert empty.dtypes.astype(str).to_dict() == COLUMNS
+
+@pytest.mark.parametrize("stream", sorted(STREAM_COLUMNS))
+def test_compact_stream_dtypes(recording, stream):
+    raw = pd.read_csv(os.path.join(recording, RECORDING_FILES[stream]))
+    compact = compact_stream(raw, STREAM_COLUMNS[stream])
+    assert list(compact.columns) == list(STREAM_COLUMNS[stream])
+    assert compact.dtypes.astype(str).to_dict() == STREAM_COLUMNS[stream]
+    assert memory_footprint(compact) < memory_footprint(raw)
+    for name, dtype in STREAM_COLUMNS[stream].items():
+        if dtype == "float32":
+            np.testing.assert_allclose(compact[name], raw[name], rtol=1e-6)
+        else:
+            assert compact[name].astype(str).tolist() == raw[name].astype(str).tolist()
+
+def test_compact_stream_missing_column():
+    with pytest.raises(ValueError, match="duration"):
+        compact_stream(pd.DataFrame({"start timestamp [ns]": [1]}), STREAM_COLUMNS["blinks"])
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+
+from memo import MemoCache, source_key
+
+def test_least_recently_used_entries_are_evicted():
+    memo = MemoCache(max_entries=2)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    assert memo.get("a") == 1
+    memo.put("c", 3)
+    assert "b" not in memo
+    assert memo.get("a") == 1 and memo.get("c") == 3
+    assert (memo.hits, memo.misses) == (3, 0)
+
+def test_byte_cap():
+    array = np.zeros(100, dtype=np.float64)
+    memo = MemoCache(max_bytes=2_000)
+    memo.put("a", array)
+    memo.put("b", array.copy())
+    assert memo.nbytes == 1_600
+    memo.put("c", array.copy())
+    assert "a" not in memo and len(memo) == 2 and memo.nbytes == 1_600
+    # Replacing a value releases its size, and a value over the cap is not kept
+    memo.put("b", np.zeros(10))
+    assert memo.nbytes == 880
+    memo.put("big", np.zeros(1_000))
+    assert "big" not in memo and memo.nbytes == 880
+
+def test_cached_computes_once():
+    memo = MemoCache()
+    calls = []
+    assert memo.cached("key", lambda: calls.append(1) or "value") == "value"
+    assert memo.cached("key", lambda: calls.append(1) or "other") == "value"
+    assert calls == [1]
+
+def test_disabled_memo_keeps_nothing():
+    memo = MemoCache(max_entries=0)
+    assert memo.cached("key", lambda: 1) == 1
+    assert len(memo) == 0 and memo.get("key") is None
+
+def test_source_key_follows_the_file(tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text("a\n")
+    key = source_key(str(path))
+    assert source_key(str(path)) == key
+    path.write_text("ab\n")
+    assert source_key(str(path)) != key
+    os.utime(path, ns=(1, 1))
+    assert source_key(str(path))[2] == 1
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from main_plots import GenerationCancelled
+from plan import run_graph
+
+def test_run_graph_follows_the_dependencies():
+    order = []
+    lock = threading.Lock()
+
+    def task(name, value):
+        def run(results):
+            with lock:
+                order.append(name)
+            return value(results)
+        return run
+
+    results = run_graph({
+        "total": (["a", "b"], task("total", lambda r: r["a"] + r["b"])),
+        "b": (["a"], task("b", lambda r: r["a"] * 10)),
+        "a": ([], task("a", lambda r: 2)),
+        "alone": ([], task("alone", lambda r: "x")),
+    }, max_workers=4)
+    assert results == {"a": 2, "b": 20, "total": 22, "alone": "x"}
+    assert order.index("a") < order.index("b") < order.index("total")
+
+def test_run_graph_runs_independent_tasks_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    # Each task waits for the other: they only finish if they run at the same time
+    results = run_graph({"a": ([], lambda r: barrier.wait()), "b": ([], lambda r: barrier.wait())}, max_workers=2)
+    assert sorted(results.values()) == [0, 1]
+
+def test_run_graph_raises_the_first_error():
+    ran = []
+
+    def fail(results):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_graph({"load": ([], fail), "plot": (["load"], lambda r: ran.append("plot")),
+                   "slow": ([], lambda r: time.sleep(0.05))}, max_workers=2)
+    # The tasks depending on the failed one never start
+    assert ran == []
+
+def test_run_graph_rejects_bad_dependencies():
+    with pytest.raises(ValueError, match="unknown"):
+        run_graph({"a": (["missing"], lambda r: 1)})
+    with pytest.raises(ValueError, match="Cyclic"):
+        run_graph({"start": ([], lambda r: 1), "a": (["b"], lambda r: 1), "b": (["a"], lambda r: 1)})
+
+def test_run_graph_cancelled():
+    cancel = threading.Event()
+    ran = []
+
+    def first(results):
+        cancel.set()
+        return 1
+    with pytest.raises(GenerationCancelled):
+        run_graph({"a": ([], first), "b": (["a"], lambda r: ran.append("b"))}, cancel_event=cancel)
+    assert ran == []
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import rendering
+from config import DEFAULT_RENDER_WORKERS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_rendering_selects_agg_before_pyplot():
+    # Figures rendered in-process (one worker, or a single job) must never use an
+    # interactive backend, e.g. from the worker thread of the GUI
+    code = "import rendering, matplotlib; print(matplotlib.get_backend())"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT,
+                         env={**os.environ, "MPLBACKEND": "TkAgg"})
+    assert out.stdout.strip().lower() == "agg"
+
+def test_scheduler_measures_each_job(tmp_path):
+    with rendering.RenderScheduler() as scheduler:
+        assert scheduler.workers == DEFAULT_RENDER_WORKERS <= 4
+    with rendering.RenderScheduler(workers=1) as scheduler:
+        for name in ("a.png", "b.png"):
+            scheduler.submit(name, rendering.render_line_plot, str(tmp_path / name), np.arange(5), np.arange(5),
+                             "blue", "y", name)
+        assert scheduler.run() == []
+    for name in ("a.png", "b.png"):
+        stats = scheduler.stats[name]
+        # The timings are those of the job alone, not a running total
+        assert 0 < stats["layout_s"] + stats["save_s"] <= stats["seconds"]
+        assert stats["bytes"] == os.path.getsize(tmp_path / name)
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from session import RecordingSession
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_session_import_is_light():
+    # The window imports the session on the Tk thread at the first file pick
+    code = ("import sys, session; session.RecordingSession().close(); "
+            "print(sorted(m for m in ('pandas', 'numpy', 'main_plots') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    assert out.stdout.strip() == "[]"
+
+def test_open_checks_schema(recording):
+    session = RecordingSession()
+    events = os.path.join(recording, "events.csv")
+    try:
+        with pytest.raises(ValueError, match="Unknown stream"):
+            session.open("heartbeat", events)
+        # The check runs in the background and its failure leaves the stream without a file
+        with pytest.raises(ValueError, match="not a Neon gaze export"):
+            session.open("gaze", events).result(timeout=10)
+        session.wait()
+        assert "gaze" not in session.files
+
+        assert session.open("events", events).result(timeout=10) == events
+        assert session.missing() == ["blinks", "pupil", "fixations", "gaze", "saccades"]
+        session.wait()
+        assert session.loaded("events")
+        assert "event_0" in session.event_names()
+
+        # A file failing the check puts the previous one back
+        with pytest.raises(ValueError):
+            session.open("events", os.path.join(recording, "gaze.csv")).result(timeout=10)
+        session.wait()
+        assert session.files["events"] == events
+        assert "event_0" in session.event_names()
+        with pytest.raises(KeyError):
+            session.loaded("gaze")
+    finally:
+        session.close()